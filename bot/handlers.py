@@ -0,0 +1,190 @@
+import logging
+
+from django.conf import settings
+
+from bot.models import TgUser
+from bot.paging import fit_page, keyset_page, page_keyboard
+from bot.state import StateStore, get_state_store
+from bot.tg.dc import CallbackQuery, Message, UpdateObj
+from goals.models import Goal, GoalCategory, BoardParticipant
+
+logger = logging.getLogger(__name__)
+
+STEP_CATEGORY = "category"
+STEP_TITLE = "title"
+
+
+class BotHandler:
+    # paged listings: callback prefix -> (queryset method, item renderer, text for an empty list)
+    listings = {
+        "goals": ("goals_queryset", "render_goal", "Список целей пуст"),
+        "board": ("boards_queryset", "render_board", "У вас нет досок"),
+    }
+
+    def __init__(self, tg_client, states: StateStore | None = None):
+        self.tg_client = tg_client
+        self.states = states or get_state_store()
+
+    def handle_update(self, update: UpdateObj):
+        if update.message:
+            self.handle_message(update.message)
+        elif update.callback_query:
+            self.handle_callback(update.callback_query)
+
+    def handle_message(self, msg: Message):
+        tg_user, created = TgUser.objects.get_or_create(user_ud=msg.from_.id, defaults={"chat_id": msg.chat.id,
+                                                                                        "username": msg.from_.username})
+        if "/start" in msg.text:
+            self.tg_client.send_message(
+                msg.chat.id, "Привет! {msg.chat.first_name}\n"
+                             'Бот может обрабатывает следующие команды:\n'
+                             '/board -> список досок\n'
+                             '/category -> список категорий\n'
+                             '/goals -> список целей\n'
+                             '/create -> создать цель\n'
+                             '/cancel -> отменить создание цели\n')
+
+        if tg_user.user:
+            self.handle_verified_user(msg, tg_user)
+        else:
+            self.handle_user_without_verification(msg, tg_user)
+
+    #
+    def handle_user_without_verification(self, msg: Message, tg_user: TgUser):
+        self.tg_client.send_message(
+            msg.chat.id,
+            'Добро пожаловать!\n'
+            'Для продолжения работы необходимо привязать\n'
+            'Ваш аккаунт\n',
+        )
+        code = tg_user.issue_verification_code()
+        self.tg_client.send_message(msg.chat.id, f"Верификационный  код: {code}")
+
+    def handle_verified_user(self, msg: Message, tg_user: TgUser):
+        if not msg.text:
+            return
+        if "/start" in msg.text:
+            return
+        if "/board" in msg.text:
+            self.fetch_board(msg, tg_user)
+        elif '/goal_category' in msg.text:
+            self.fetch_category(msg, tg_user)
+        elif '/goals' in msg.text:
+            self.fetch_tasks(msg, tg_user)
+        elif '/create' in msg.text:
+            self.handle_categories(msg, tg_user)
+        elif '/cancel' in msg.text:
+            self.get_cancel(msg, tg_user)
+        else:
+            self.handle_dialog(msg, tg_user)
+
+    def handle_dialog(self, msg: Message, tg_user: TgUser):
+        state = self.states.get(tg_user.chat_id)
+        if state is None:
+            self.tg_client.send_message(tg_user.chat_id, 'Неизвестная команда')
+
+        elif state["step"] == STEP_CATEGORY:
+            category = self.handle_save_category(msg.text, tg_user)
+            if category:
+                self.states.set(tg_user.chat_id, {"step": STEP_TITLE, "category_id": category.id})
+                self.tg_client.send_message(tg_user.chat_id,
+                                            f'Выбрана категория:\n {category}.\nВведите заголовок цели')
+            else:
+                self.tg_client.send_message(tg_user.chat_id, 'Категория не найдена, выберите номер из списка')
+
+        elif state["step"] == STEP_TITLE:
+            category = self.handle_save_category(str(state["category_id"]), tg_user)
+            self.states.clear(tg_user.chat_id)
+            if not category:
+                self.tg_client.send_message(tg_user.chat_id, 'Категория больше недоступна')
+                return
+            goal = Goal.objects.create(title=msg.text, user=tg_user.user, category=category)
+            self.tg_client.send_message(tg_user.chat_id, f'Цель: {goal} создана в БД')
+
+    def fetch_board(self, msg: Message, tg_user: TgUser):
+        self.send_listing("board", tg_user)
+
+    def fetch_category(self, msg: Message, tg_user: TgUser):
+        resp_categories: list[str] = [
+            f'{category.id} {category.title}'
+            for category in GoalCategory.objects.filter(
+                board__participants__user=tg_user.user_id, is_deleted=False)]
+        if resp_categories:
+            self.tg_client.send_messages(msg.chat.id, ["Ваши категории:", *resp_categories])
+        else:
+            self.tg_client.send_message(msg.chat.id, 'У Вас нет ни одной категории!')
+
+    def handle_categories(self, msg: Message, tg_user: TgUser):
+
+        categories = GoalCategory.objects.filter(user=tg_user.user, is_deleted=False)
+        if categories.count() > 0:
+            self.tg_client.send_messages(tg_user.chat_id, [
+                'Выберите номер категории для новой цели:\n========================',
+                *(f'{cat.id}: {cat.title}' for cat in categories),
+            ])
+            self.states.set(tg_user.chat_id, {"step": STEP_CATEGORY})
+        else:
+            self.tg_client.send_message(msg.chat.id, 'список категорий пуст')
+
+    def fetch_tasks(self, msg: Message, tg_user: TgUser):
+        self.send_listing("goals", tg_user)
+
+    def handle_callback(self, callback: CallbackQuery):
+        self.tg_client.answer_callback_query(callback.id)
+        if callback.message is None or not callback.data:
+            return
+        listing, _, cursor = callback.data.partition(":")
+        if listing not in self.listings:
+            return
+        tg_user = TgUser.objects.select_related("user").filter(user_ud=callback.from_.id).first()
+        if tg_user is None or tg_user.user is None:
+            return
+        self.send_listing(listing, tg_user, cursor, message_id=callback.message.message_id)
+
+    def send_listing(self, listing: str, tg_user: TgUser, cursor: str | None = None, message_id: int | None = None):
+        """Render one page of a listing into a single message with next/previous buttons.
+
+        Pages after the first replace the previous page in place instead of
+        sending a new message. A page is cut short when its items would not
+        fit into one message.
+        """
+        queryset_method, render_method, empty_text = self.listings[listing]
+        page = keyset_page(getattr(self, queryset_method)(tg_user), cursor, settings.BOT_PAGE_SIZE)
+        page, text = fit_page(page, [getattr(self, render_method)(item) for item in page.items])
+        text = text or empty_text
+        reply_markup = page_keyboard(listing, page)
+        if message_id is None:
+            self.tg_client.send_message(tg_user.chat_id, text, reply_markup=reply_markup)
+        else:
+            self.tg_client.edit_message_text(tg_user.chat_id, message_id, text, reply_markup=reply_markup)
+
+    @staticmethod
+    def goals_queryset(tg_user: TgUser):
+        return Goal.objects.filter(user=tg_user.user).select_related("category", "user")
+
+    @staticmethod
+    def render_goal(goal: Goal) -> str:
+        return (f'Название: {goal.title},\n'
+                f'Категория: {goal.category},\n'
+                f'Статус: {goal.get_status_display()},\n'
+                f'Пользователь: {goal.user},\n'
+                f'Дедлайн {goal.due_date if goal.due_date else "Нет"} \n')
+
+    @staticmethod
+    def boards_queryset(tg_user: TgUser):
+        return BoardParticipant.objects.filter(user=tg_user.user).select_related("board")
+
+    @staticmethod
+    def render_board(participant: BoardParticipant) -> str:
+        return f"Название: {participant.board}\n"
+
+    @staticmethod
+    def handle_save_category(text: str, tg_user: TgUser) -> GoalCategory | None:
+        try:
+            return GoalCategory.objects.filter(user=tg_user.user, is_deleted=False).get(pk=int(text))
+        except (ValueError, GoalCategory.DoesNotExist):
+            return None
+
+    def get_cancel(self, msg: Message, tg_user: TgUser):
+        self.states.clear(tg_user.chat_id)
+        self.tg_client.send_message(tg_user.chat_id, 'Операция отменена')
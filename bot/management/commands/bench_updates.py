@@ -0,0 +1,47 @@
+import time
+
+from django.core.management import BaseCommand
+
+from bot.tg.dc import GetUpdatesResponse, SendMessageResponse
+
+
+def sample_updates(count: int) -> dict:
+    """getUpdates payload mixing messages, button presses and updates the bot ignores, with unused fields."""
+    user = {"id": 101, "is_bot": False, "first_name": "Test", "last_name": "User", "username": "user101",
+            "language_code": "ru"}
+    chat = {"id": 101, "type": "private", "first_name": "Test", "last_name": "User", "username": "user101"}
+    message = {"message_id": 1, "from": user, "chat": chat, "date": 1690000000, "text": "/goals",
+               "entities": [{"offset": 0, "length": 6, "type": "bot_command"}]}
+    kinds = [
+        {"message": message},
+        {"callback_query": {"id": "42", "from": user, "message": message, "chat_instance": "1", "data": "goals:n10"}},
+        {"edited_message": message},
+        {"my_chat_member": {"chat": chat, "from": user, "date": 1690000000}},
+    ]
+    return {"ok": True, "result": [{"update_id": i, **kinds[i % len(kinds)]} for i in range(count)]}
+
+
+class Command(BaseCommand):
+    help = "measure how many Telegram updates per second the bot decodes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=100, help="updates per getUpdates payload")
+        parser.add_argument("--seconds", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        payload = sample_updates(options["updates"])
+        reply = {"ok": True, "result": payload["result"][0]["message"]}
+        self.report("getUpdates", lambda: GetUpdatesResponse.from_dict(payload), options["updates"],
+                    options["seconds"])
+        self.report("sendMessage", lambda: SendMessageResponse.from_dict(reply), 1, options["seconds"])
+
+    def report(self, name: str, parse, per_call: int, seconds: float):
+        calls = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            parse()
+            calls += 1
+        elapsed = time.perf_counter() - start
+        self.stdout.write("{:<12} {:>12,.0f} objects/s  {:>8.2f} us per call".format(
+            name, calls * per_call / elapsed, elapsed / calls * 1e6))
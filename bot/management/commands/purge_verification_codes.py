@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from bot.models import TgUser
+
+
+class Command(BaseCommand):
+    help = "clear expired verification codes, meant to run periodically (e.g. from cron every few minutes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        purged = 0
+        while True:
+            ids = list(TgUser.objects.filter(verification_code_expires__lte=timezone.now())
+                       .values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            purged += TgUser.objects.filter(id__in=ids).update(verification_code=None,
+                                                               verification_code_expires=None)
+        self.stdout.write(f"purged {purged} expired verification codes")
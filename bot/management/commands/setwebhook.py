@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from bot.tg.client import TgClient
+
+
+class Command(BaseCommand):
+    help = "register the bot webhook, or remove it to go back to runbot long polling"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", nargs="?", help="public https address of bot:webhook")
+        parser.add_argument("--delete", action="store_true", help="remove the webhook")
+        parser.add_argument("--max-connections", type=int, default=40)
+
+    def handle(self, *args, **options):
+        client = TgClient(settings.BOT_TOKEN, base_url=settings.BOT_API_URL)
+        if options["delete"]:
+            response = client.delete_webhook()
+        else:
+            if not options["url"]:
+                raise CommandError("url is required")
+            if not settings.BOT_WEBHOOK_SECRET:
+                raise CommandError("BOT_WEBHOOK_SECRET is not set")
+            response = client.set_webhook(options["url"], settings.BOT_WEBHOOK_SECRET,
+                                          max_connections=options["max_connections"])
+        if not response.get("ok"):
+            raise CommandError(response.get("description", response))
+        self.stdout.write(self.style.SUCCESS(response.get("description", "ok")))
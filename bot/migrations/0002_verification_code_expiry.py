@@ -0,0 +1,49 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:32
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def prepare_codes(apps, schema_editor):
+    TgUser = apps.get_model('bot', 'TgUser')
+    # linked accounts don't need their code anymore, and a code shared by several rows can't identify one of them
+    TgUser.objects.filter(user__isnull=False).update(verification_code=None)
+    TgUser.objects.filter(verification_code='').update(verification_code=None)
+    duplicates = (TgUser.objects.filter(verification_code__isnull=False).values('verification_code')
+                  .annotate(rows=Count('id')).filter(rows__gt=1).values('verification_code'))
+    TgUser.objects.filter(verification_code__in=duplicates).update(verification_code=None)
+    TgUser.objects.filter(verification_code__isnull=False).update(
+        verification_code_expires=timezone.now() + timedelta(minutes=10))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tguser',
+            name='verification_code_expires',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='tguser',
+            name='verification_code',
+            field=models.CharField(blank=True, default=None, max_length=32, null=True),
+        ),
+        migrations.RunPython(prepare_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tguser',
+            name='verification_code',
+            field=models.CharField(blank=True, default=None, max_length=32, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='tguser',
+            index=models.Index(condition=models.Q(('verification_code_expires__isnull', False)), fields=['verification_code_expires'], name='tguser_code_expires_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
-import random
+import secrets
 import string
+from datetime import timedelta
 
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 
 from core.models import User
 
@@ -13,11 +16,35 @@ class TgUser(models.Model):
     user_ud = models.BigIntegerField(unique=True)
     username = models.CharField(max_length=512, verbose_name="tg username", null=True, blank=True, default=None)
     user = models.ForeignKey(User, models.PROTECT, null=True, blank=True, default=None)
-    verification_code = models.CharField(max_length=32)
+    verification_code = models.CharField(max_length=32, unique=True, null=True, blank=True, default=None)
+    verification_code_expires = models.DateTimeField(null=True, blank=True, default=None)
 
     def set_verification_code(self):
-        code = "".join([random.choice(CODE_VOCABULARY) for _ in range(12)])
+        code = "".join([secrets.choice(CODE_VOCABULARY) for _ in range(12)])
         self.verification_code = code
+        self.verification_code_expires = timezone.now() + timedelta(seconds=settings.BOT_VERIFICATION_CODE_TTL)
+
+    def has_valid_code(self) -> bool:
+        return bool(self.verification_code) and self.verification_code_expires is not None \
+            and self.verification_code_expires > timezone.now()
+
+    def issue_verification_code(self) -> str:
+        """Return the current code while it is valid, otherwise store a new one."""
+        if self.has_valid_code():
+            return self.verification_code
+        for _ in range(3):
+            self.set_verification_code()
+            try:
+                with transaction.atomic():
+                    self.save(update_fields=["verification_code", "verification_code_expires"])
+            except IntegrityError:
+                continue
+            return self.verification_code
+        raise IntegrityError("could not generate a unique verification code")
+
+    def clear_verification_code(self):
+        self.verification_code = None
+        self.verification_code_expires = None
 
     def __str__(self):
         return '{}'.format(self.user)
@@ -25,3 +52,7 @@ class TgUser(models.Model):
     class Meta:
         verbose_name = "tg User"
         verbose_name_plural = "tg Users"
+        indexes = [
+            models.Index(fields=["verification_code_expires"], name="tguser_code_expires_idx",
+                         condition=models.Q(verification_code_expires__isnull=False)),
+        ]
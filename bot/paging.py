@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+
+from django.db.models import QuerySet
+
+from bot.tg.batching import MESSAGE_LIMIT
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+@dataclass
+class Page:
+    items: list
+    has_previous: bool
+    has_next: bool
+
+    def cursor(self, direction: str) -> str:
+        item = self.items[-1] if direction == NEXT else self.items[0]
+        return f"{direction}{item.pk}"
+
+
+def keyset_page(queryset: QuerySet, cursor: str | None, size: int) -> Page:
+    """One page of ``queryset`` ordered by pk, positioned by a ``n<pk>`` / ``p<pk>`` cursor.
+
+    Only ``size + 1`` rows are fetched, so neither counting nor skipping
+    rows depends on how long the list is.
+    """
+    direction, position = (cursor[:1], cursor[1:]) if cursor else (NEXT, "")
+    try:
+        position = int(position) if position else None
+    except ValueError:
+        position = None
+
+    if direction == PREVIOUS and position is not None:
+        items = list(queryset.filter(pk__lt=position).order_by("-pk")[:size + 1])
+        has_more = len(items) > size
+        items = items[:size][::-1]
+        return Page(items, has_previous=has_more, has_next=True)
+
+    if position is not None:
+        queryset = queryset.filter(pk__gt=position)
+    items = list(queryset.order_by("pk")[:size + 1])
+    return Page(items[:size], has_previous=position is not None, has_next=len(items) > size)
+
+
+def fit_page(page: Page, texts: list[str], limit: int = MESSAGE_LIMIT, separator: str = "\n") -> tuple[Page, str]:
+    """Join the item ``texts`` of ``page`` into one message of at most ``limit`` characters.
+
+    Items that don't fit are dropped from the page and start the next one.
+    """
+    text, count = "", 0
+    for item_text in texts:
+        joined = text + separator + item_text if count else item_text
+        if len(joined) > limit:
+            break
+        text, count = joined, count + 1
+    if not count and texts:
+        text, count = texts[0][:limit], 1
+    if count < len(page.items):
+        page = Page(page.items[:count], page.has_previous, has_next=True)
+    return page, text
+
+
+def page_keyboard(listing: str, page: Page) -> dict | None:
+    buttons = []
+    if page.has_previous and page.items:
+        buttons.append({"text": "« Назад", "callback_data": f"{listing}:{page.cursor(PREVIOUS)}"})
+    if page.has_next and page.items:
+        buttons.append({"text": "Далее »", "callback_data": f"{listing}:{page.cursor(NEXT)}"})
+    return {"inline_keyboard": [buttons]} if buttons else None
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from bot.handlers import BotHandler
+from bot.tg.async_client import AsyncTgClient
+from bot.tg.batching import batch_lines
+from bot.tg.dc import UpdateObj
+from bot.tg.outbox import Outbox, get_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class CollectingSender:
+    """Stands in for TgClient inside handlers and keeps replies for async sending."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, dict]] = []
+
+    def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None):
+        self.calls.append(("send_message", {"chat_id": chat_id, "text": text, "reply_markup": reply_markup}))
+
+    def send_messages(self, chat_id: int, lines, separator: str = "\n"):
+        for text in batch_lines(lines, separator=separator):
+            self.send_message(chat_id, text)
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str, reply_markup: dict | None = None):
+        self.calls.append(("edit_message_text", {"chat_id": chat_id, "message_id": message_id, "text": text,
+                                                 "reply_markup": reply_markup}))
+
+    def answer_callback_query(self, callback_query_id: str, text: str | None = None):
+        self.calls.append(("answer_callback_query", {"callback_query_id": callback_query_id, "text": text}))
+
+
+def update_chat_id(update: UpdateObj) -> int | None:
+    if update.message:
+        return update.message.chat.id
+    if update.callback_query:
+        message = update.callback_query.message
+        return message.chat.id if message else update.callback_query.from_.id
+    return None
+
+
+def collect_calls(update: UpdateObj) -> list[tuple[str, dict]]:
+    sender = CollectingSender()
+    BotHandler(sender).handle_update(update)
+    return sender.calls
+
+
+def process_update(update: UpdateObj) -> list[tuple[str, dict]]:
+    """``collect_calls`` for threads outside the request cycle, which must manage their own connections."""
+    close_old_connections()
+    try:
+        return collect_calls(update)
+    finally:
+        close_old_connections()
+
+
+class BotRunner:
+    """Long-polls Telegram and processes updates on a bounded pool of workers.
+
+    Updates of one chat always land on the same worker queue, so they are
+    handled in arrival order while different chats proceed concurrently.
+    Replies go through the outbox, which sends them by priority within the
+    rate limits.
+    """
+
+    def __init__(self, client: AsyncTgClient, workers: int = 8, queue_size: int = 100, poll_timeout: int = 60,
+                 outbox: Outbox | None = None):
+        self.client = client
+        self.outbox = outbox or get_outbox()
+        self.poll_timeout = poll_timeout
+        self.queues = [asyncio.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.stopping = asyncio.Event()
+        self.offset = 0
+
+    async def run(self):
+        workers = [asyncio.create_task(self.work(queue)) for queue in self.queues]
+        try:
+            while not self.stopping.is_set():
+                await self.poll()
+        finally:
+            for queue in self.queues:
+                await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await asyncio.to_thread(self.outbox.join, 30)
+
+    def stop(self):
+        self.stopping.set()
+
+    async def poll(self):
+        try:
+            response = await self.client.get_updates(offset=self.offset, timeout=self.poll_timeout)
+        except Exception:
+            logger.exception("getUpdates failed")
+            await asyncio.sleep(1)
+            return
+        for update in response.result:
+            self.offset = update.update_id + 1
+            await self.dispatch(update)
+
+    async def dispatch(self, update: UpdateObj):
+        chat_id = update_chat_id(update)
+        if chat_id is None:
+            return
+        await self.queues[chat_id % len(self.queues)].put(update)
+
+    async def work(self, queue: asyncio.Queue):
+        while True:
+            update = await queue.get()
+            try:
+                calls = await sync_to_async(process_update, thread_sensitive=False)(update)
+                self.outbox.submit_calls(calls)
+            except Exception:
+                logger.exception("update %s failed", update.update_id)
+            finally:
+                queue.task_done()
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -14,7 +15,8 @@ class TgUserSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         verification_code = attrs.get("verification_code")
-        tg_user = TgUser.objects.filter(verification_code=verification_code).first()
+        tg_user = TgUser.objects.filter(verification_code=verification_code,
+                                        verification_code_expires__gt=timezone.now()).first()
         if not tg_user:
             raise ValidationError({"verification_code": "field is incorrect"})
         attrs["tg_user"] = tg_user
@@ -0,0 +1,89 @@
+import abc
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class StateStore(abc.ABC):
+    """Per-chat dialog state keyed by ``TgUser.chat_id``; states are plain JSON-able dicts."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    @abc.abstractmethod
+    def get(self, chat_id: int) -> dict | None:
+        ...
+
+    @abc.abstractmethod
+    def set(self, chat_id: int, state: dict):
+        ...
+
+    @abc.abstractmethod
+    def clear(self, chat_id: int):
+        ...
+
+
+class MemoryStateStore(StateStore):
+    """Process-local LRU store; entries expire ``ttl`` seconds after the last write."""
+
+    def __init__(self, ttl: int, max_size: int = 10_000, clock=time.monotonic):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.states: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+
+    def get(self, chat_id: int) -> dict | None:
+        with self.lock:
+            entry = self.states.get(chat_id)
+            if entry is None:
+                return None
+            expires, state = entry
+            if expires <= self.clock():
+                del self.states[chat_id]
+                return None
+            self.states.move_to_end(chat_id)
+            return dict(state)
+
+    def set(self, chat_id: int, state: dict):
+        with self.lock:
+            self.states[chat_id] = (self.clock() + self.ttl, dict(state))
+            self.states.move_to_end(chat_id)
+            while len(self.states) > self.max_size:
+                self.states.popitem(last=False)
+
+    def clear(self, chat_id: int):
+        with self.lock:
+            self.states.pop(chat_id, None)
+
+
+class CacheStateStore(StateStore):
+    """Store shared between bot processes through a Django cache (Redis, database, memcached)."""
+
+    def __init__(self, ttl: int, alias: str = "default", prefix: str = "bot_state"):
+        super().__init__(ttl)
+        self.cache = caches[alias]
+        self.prefix = prefix
+
+    def key(self, chat_id: int) -> str:
+        return f"{self.prefix}:{chat_id}"
+
+    def get(self, chat_id: int) -> dict | None:
+        return self.cache.get(self.key(chat_id))
+
+    def set(self, chat_id: int, state: dict):
+        self.cache.set(self.key(chat_id), state, self.ttl)
+
+    def clear(self, chat_id: int):
+        self.cache.delete(self.key(chat_id))
+
+
+@lru_cache(maxsize=None)
+def get_state_store() -> StateStore:
+    store_class = import_string(settings.BOT_STATE_STORE)
+    return store_class(ttl=settings.BOT_STATE_TTL, **settings.BOT_STATE_STORE_OPTIONS)
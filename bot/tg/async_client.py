@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+import httpx
+
+from bot.tg.client import DEFAULT_API_URL, NOT_RETRIED_AFTER_READ_TIMEOUT, retry_delay
+from bot.tg.dc import GetUpdatesResponse
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTgClient:
+    """Telegram Bot API client sharing one pooled keep-alive connection set.
+
+    It only long-polls, replies are sent by the outbox.
+    """
+
+    def __init__(self, token, base_url: str = DEFAULT_API_URL, timeout: float = 10, retries: int = 3,
+                 backoff: float = 0.5, max_connections: int = 20):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    def get_url(self, method: str) -> str:
+        return f"{self.base_url}/bot{self.token}/{method}"
+
+    async def request(self, http_method: str, method: str, params: dict, timeout: float | None = None) -> dict:
+        for attempt in range(self.retries + 1):
+            try:
+                body = {"params": params} if http_method == "GET" else {"json": params}
+                resp = await self.http.request(http_method, self.get_url(method), timeout=timeout or self.timeout,
+                                               **body)
+            except httpx.TransportError as e:
+                if attempt == self.retries or \
+                        isinstance(e, httpx.ReadTimeout) and method in NOT_RETRIED_AFTER_READ_TIMEOUT:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            try:
+                payload = resp.json()
+            except ValueError:
+                payload = None
+            delay = retry_delay(resp.status_code, payload, attempt, self.backoff)
+            if delay is None or attempt == self.retries:
+                if payload is None:
+                    resp.raise_for_status()
+                    return resp.json()
+                return payload
+            logger.warning("%s answered %s, retrying in %.1fs", method, resp.status_code, delay)
+            await asyncio.sleep(delay)
+
+    async def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
+        payload = await self.request("GET", "getUpdates",
+                                     {"offset": offset, "timeout": timeout,
+                                      "allowed_updates": ["message", "callback_query"]},
+                                     timeout=timeout + self.timeout)
+        return GetUpdatesResponse.from_dict(payload)
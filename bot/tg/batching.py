@@ -0,0 +1,26 @@
+MESSAGE_LIMIT = 4096
+
+
+def batch_lines(lines, limit: int = MESSAGE_LIMIT, separator: str = "\n") -> list[str]:
+    """Join lines into as few texts as fit into one Telegram message each.
+
+    A single line longer than ``limit`` is cut into ``limit``-sized pieces.
+    """
+    batches, current = [], ""
+    for line in lines:
+        while len(line) > limit:
+            if current:
+                batches.append(current)
+                current = ""
+            batches.append(line[:limit])
+            line = line[limit:]
+        if not current:
+            current = line
+        elif len(current) + len(separator) + len(line) <= limit:
+            current += separator + line
+        else:
+            batches.append(current)
+            current = line
+    if current:
+        batches.append(current)
+    return batches
@@ -1,24 +1,126 @@
+import logging
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 
+from bot.tg.batching import batch_lines
 from bot.tg.dc import GetUpdatesResponse, SendMessageResponse
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.telegram.org"
+# a read timeout may come after Telegram did the work, retrying these would repeat it
+NOT_RETRIED_AFTER_READ_TIMEOUT = frozenset({"sendMessage"})
+
+
+class RetryAfter(Exception):
+    """Flood control answer passed to the caller instead of being waited out."""
+
+    def __init__(self, method: str, retry_after: float):
+        super().__init__(f"{method} throttled for {retry_after:.1f}s")
+        self.method = method
+        self.retry_after = retry_after
+
+
+def retry_delay(status_code: int, payload: dict | None, attempt: int, backoff: float) -> float | None:
+    """Seconds to wait before retrying a response, or None when it must not be retried.
+
+    Telegram answers flood control with 429 and ``parameters.retry_after``.
+    ``payload`` is None when the body isn't JSON, e.g. a proxy's error page.
+    """
+    if status_code == 429:
+        retry_after = ((payload or {}).get("parameters") or {}).get("retry_after")
+        return float(retry_after) if retry_after is not None else backoff * 2 ** attempt
+    if status_code >= 500:
+        return backoff * 2 ** attempt
+    return None
+
 
 class TgClient:
-    def __init__(self, token):
+    """Bot API client over one pooled keep-alive session.
+
+    With ``wait_flood=False`` a 429 raises ``RetryAfter`` instead of sleeping,
+    so a caller serving many chats can hold back only the throttled one.
+    """
+
+    def __init__(self, token, base_url: str = DEFAULT_API_URL, timeout: float = 10, retries: int = 3,
+                 backoff: float = 0.5, pool_size: int = 10, wait_flood: bool = True):
         self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.wait_flood = wait_flood
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def get_url(self, method: str) -> str:
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return f"{self.base_url}/bot{self.token}/{method}"
+
+    def request(self, http_method: str, method: str, params: dict, timeout: float | None = None) -> dict:
+        for attempt in range(self.retries + 1):
+            try:
+                body = {"params": params} if http_method == "GET" else {"json": params}
+                resp = self.session.request(http_method, self.get_url(method), timeout=timeout or self.timeout,
+                                            **body)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries or \
+                        isinstance(e, requests.ReadTimeout) and method in NOT_RETRIED_AFTER_READ_TIMEOUT:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            try:
+                payload = resp.json()
+            except ValueError:
+                payload = None
+            delay = retry_delay(resp.status_code, payload, attempt, self.backoff)
+            if resp.status_code == 429 and not self.wait_flood:
+                raise RetryAfter(method, delay)
+            if delay is None or attempt == self.retries:
+                if payload is None:
+                    resp.raise_for_status()
+                    return resp.json()
+                return payload
+            logger.warning("%s answered %s, retrying in %.1fs", method, resp.status_code, delay)
+            time.sleep(delay)
 
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
-        url = self.get_url("getUpdates")
-        resp = requests.get(url, params={"offset": offset, "timeout": timeout,
-                                         "allowed_updates": ["update_id", "message"]})
-        print(resp.json())
-        print(self.token)
-        return GetUpdatesResponse.Schema().load(resp.json())
-
-    def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
-        url = self.get_url("sendMessage")
-        resp = requests.post(url, params={"chat_id": chat_id, "text": text})
-        return SendMessageResponse.Schema().load(resp.json())
+        payload = self.request("GET", "getUpdates",
+                               {"offset": offset, "timeout": timeout, "allowed_updates": ["message", "callback_query"]},
+                               timeout=timeout + self.timeout)
+        return GetUpdatesResponse.from_dict(payload)
+
+    def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None) -> SendMessageResponse:
+        params = {"chat_id": chat_id, "text": text}
+        if reply_markup is not None:
+            params["reply_markup"] = reply_markup
+        payload = self.request("POST", "sendMessage", params)
+        return SendMessageResponse.from_dict(payload)
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str,
+                          reply_markup: dict | None = None) -> SendMessageResponse:
+        params = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if reply_markup is not None:
+            params["reply_markup"] = reply_markup
+        payload = self.request("POST", "editMessageText", params)
+        return SendMessageResponse.from_dict(payload)
+
+    def answer_callback_query(self, callback_query_id: str, text: str | None = None) -> dict:
+        params = {"callback_query_id": callback_query_id}
+        if text is not None:
+            params["text"] = text
+        return self.request("POST", "answerCallbackQuery", params)
+
+    def set_webhook(self, url: str, secret_token: str, max_connections: int = 40) -> dict:
+        return self.request("POST", "setWebhook", {"url": url, "secret_token": secret_token,
+                                                   "max_connections": max_connections,
+                                                   "allowed_updates": ["message", "callback_query"]})
+
+    def delete_webhook(self) -> dict:
+        return self.request("POST", "deleteWebhook", {})
+
+    def send_messages(self, chat_id: int, lines, separator: str = "\n") -> list[SendMessageResponse]:
+        return [self.send_message(chat_id, text) for text in batch_lines(lines, separator=separator)]
@@ -1,22 +1,45 @@
-from dataclasses import field
-from typing import ClassVar, Type, List, Optional
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
 
-from marshmallow_dataclass import dataclass
-from marshmallow import Schema, EXCLUDE
+logger = logging.getLogger(__name__)
 
 
-@dataclass
+class DecodeError(ValueError):
+    pass
+
+
+def _require(data, key: str, kind: type):
+    try:
+        value = data[key]
+    except (KeyError, TypeError):
+        raise DecodeError(f"{key} is required")
+    if not isinstance(value, kind):
+        raise DecodeError(f"{key} must be {kind.__name__}")
+    return value
+
+
+def _optional_str(data: dict, key: str) -> Optional[str]:
+    value = data.get(key)
+    return value if isinstance(value, str) else None
+
+
+# Decoders read only the fields the bot uses and ignore everything else in the payload.
+
+@dataclass(slots=True)
 class MessageFrom:
     id: int
     first_name: str
-    last_name: Optional[str]
-    username: str
+    last_name: Optional[str] = None
+    username: Optional[str] = None
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "MessageFrom":
+        return cls(id=_require(data, "id", int), first_name=_optional_str(data, "first_name") or "",
+                   last_name=_optional_str(data, "last_name"), username=_optional_str(data, "username"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Chat:
     id: int
     type: str
@@ -25,43 +48,80 @@ class Chat:
     username: Optional[str] = None
     title: Optional[str] = None
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "Chat":
+        return cls(id=_require(data, "id", int), type=_require(data, "type", str),
+                   first_name=_optional_str(data, "first_name"), last_name=_optional_str(data, "last_name"),
+                   username=_optional_str(data, "username"), title=_optional_str(data, "title"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     message_id: int
-    from_: MessageFrom = field(metadata={"data_key": "from"})
+    from_: MessageFrom
     chat: Chat
     text: Optional[str] = None
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "Message":
+        return cls(message_id=_require(data, "message_id", int),
+                   from_=MessageFrom.from_dict(_require(data, "from", dict)),
+                   chat=Chat.from_dict(_require(data, "chat", dict)), text=_optional_str(data, "text"))
 
 
-@dataclass
-class UpdateObj:
-    update_id: int
-    message: Message
+@dataclass(slots=True)
+class CallbackQuery:
+    id: str
+    from_: MessageFrom
+    message: Optional[Message] = None
+    data: Optional[str] = None
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "CallbackQuery":
+        message = data.get("message")
+        return cls(id=_require(data, "id", str), from_=MessageFrom.from_dict(_require(data, "from", dict)),
+                   message=Message.from_dict(message) if isinstance(message, dict) else None,
+                   data=_optional_str(data, "data"))
 
 
-@dataclass
+@dataclass(slots=True)
+class UpdateObj:
+    update_id: int
+    message: Optional[Message] = None
+    callback_query: Optional[CallbackQuery] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UpdateObj":
+        """Only ``update_id`` is required: any other kind of update decodes with both fields empty."""
+        update = cls(update_id=_require(data, "update_id", int))
+        try:
+            if isinstance(data.get("message"), dict):
+                update.message = Message.from_dict(data["message"])
+            elif isinstance(data.get("callback_query"), dict):
+                update.callback_query = CallbackQuery.from_dict(data["callback_query"])
+        except DecodeError as e:
+            logger.debug("update %s skipped: %s", update.update_id, e)
+        return update
+
+
+@dataclass(slots=True)
 class GetUpdatesResponse:
     ok: bool
     result: List[UpdateObj]
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "GetUpdatesResponse":
+        return cls(ok=_require(data, "ok", bool),
+                   result=[UpdateObj.from_dict(update) for update in data.get("result") or ()])
 
 
-@dataclass
+@dataclass(slots=True)
 class SendMessageResponse:
     ok: bool
-    result: Message
+    result: Optional[Message] = None
 
-    class Meta:
-        unknown = EXCLUDE
+    @classmethod
+    def from_dict(cls, data: dict) -> "SendMessageResponse":
+        result = data.get("result")
+        return cls(ok=_require(data, "ok", bool),
+                   result=Message.from_dict(result) if isinstance(result, dict) else None)
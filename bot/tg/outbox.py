@@ -0,0 +1,289 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+
+from django.conf import settings
+
+from bot.tg.client import RetryAfter, TgClient
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    high = 0
+    normal = 1
+    low = 2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.paused_until = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        self.refill(now)
+        if self.paused_until > now:
+            return self.paused_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Global and per-chat token buckets sized to Telegram's sending limits.
+
+    The buckets live in the memory of one process: every process that sends
+    (each web worker, ``runbot``) gets the full budget, so the rates must be
+    divided by the number of sending processes to stay within Telegram's limits.
+    """
+
+    def __init__(self, global_rate: float, chat_rate: float, chat_burst: float, max_chats: int = 10_000,
+                 clock=time.monotonic):
+        self.clock = clock
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.global_bucket = TokenBucket(global_rate, global_rate, clock())
+        self.chat_buckets: OrderedDict[int, TokenBucket] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, now)
+            if len(self.chat_buckets) > self.max_chats:
+                self.chat_buckets.popitem(last=False)
+        self.chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    def chat_wait(self, chat_id: int) -> float:
+        with self.lock:
+            now = self.clock()
+            return self.chat_bucket(chat_id, now).wait_time(now)
+
+    def pause(self, chat_id: int, seconds: float):
+        """Hold back a chat that Telegram throttled, other chats keep their budget."""
+        with self.lock:
+            now = self.clock()
+            bucket = self.chat_bucket(chat_id, now)
+            bucket.paused_until = max(bucket.paused_until, now + seconds)
+
+    def reserve(self, chat_id: int) -> float:
+        """Take a token from both buckets, or return how long to wait before trying again."""
+        with self.lock:
+            now = self.clock()
+            chat = self.chat_bucket(chat_id, now)
+            wait = max(chat.wait_time(now), self.global_bucket.wait_time(now))
+            if not wait:
+                chat.consume()
+                self.global_bucket.consume()
+            return wait
+
+
+@dataclass(order=True)
+class OutgoingMessage:
+    priority: int
+    seq: int
+    method: str = field(compare=False)
+    kwargs: dict = field(compare=False)
+    enqueued: float = field(compare=False)
+    throttled: int = field(default=0, compare=False)
+
+    @property
+    def chat_id(self) -> int | None:
+        return self.kwargs.get("chat_id")
+
+
+def call_priority(method: str, kwargs: dict) -> Priority:
+    """Callback answers stop the button spinner, list pages are the bulkiest replies and can wait."""
+    if method == "answer_callback_query":
+        return Priority.high
+    if method == "edit_message_text" or kwargs.get("reply_markup"):
+        return Priority.low
+    return Priority.normal
+
+
+class Outbox:
+    """Background sender: callers enqueue and return, a few threads drain by priority within rate limits.
+
+    Queued items are client calls, ``getattr(client, method)(**kwargs)``.
+    A call whose chat is out of tokens is parked until its bucket refills
+    so it doesn't hold back calls for other chats. When Telegram answers
+    ``RetryAfter`` only that chat is paused. A chat has at most one call
+    in flight, so its replies arrive in order while other chats are sent
+    concurrently. Calls without a chat (callback answers) are not rate
+    limited.
+    """
+
+    def __init__(self, client, limiter: RateLimiter, clock=time.monotonic, workers: int = 4,
+                 max_throttled: int = 5):
+        self.client = client
+        self.limiter = limiter
+        self.clock = clock
+        self.workers = workers
+        self.max_throttled = max_throttled
+        self.queue: list[OutgoingMessage] = []
+        self.parked: list[tuple[float, OutgoingMessage]] = []
+        # calls of a chat that already has one in flight, pushed back when it completes
+        self.held: dict[int, list[OutgoingMessage]] = {}
+        self.in_flight: set[int] = set()
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.threads: list[threading.Thread] = []
+        self.pending = 0
+        self.sent = 0
+        self.failed = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def start(self):
+        if not self.threads:
+            self.threads = [threading.Thread(target=self.run, name=f"tg-outbox-{i}", daemon=True)
+                            for i in range(self.workers)]
+            for thread in self.threads:
+                thread.start()
+
+    def enqueue(self, chat_id: int, text: str, priority: Priority = Priority.normal):
+        self.submit("send_message", {"chat_id": chat_id, "text": text}, priority)
+
+    def submit(self, method: str, kwargs: dict, priority: Priority = Priority.normal):
+        with self.cond:
+            heapq.heappush(self.queue, OutgoingMessage(priority, next(self.seq), method, kwargs, self.clock()))
+            self.pending += 1
+            self.cond.notify_all()
+
+    def submit_calls(self, calls: list[tuple[str, dict]]):
+        """Queue the replies collected for one update, each at the priority of its kind."""
+        for method, kwargs in calls:
+            self.submit(method, kwargs, call_priority(method, kwargs))
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every queued call is delivered or has failed."""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending, timeout)
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {
+                "depth": len(self.queue) + len(self.parked) + sum(map(len, self.held.values())),
+                "sent": self.sent,
+                "failed": self.failed,
+                "latency_avg_seconds": self.latency_total / self.sent if self.sent else 0.0,
+                "latency_max_seconds": self.latency_max,
+            }
+
+    def next_message(self) -> tuple[OutgoingMessage | None, float | None]:
+        now = self.clock()
+        while self.parked and self.parked[0][0] <= now:
+            heapq.heappush(self.queue, heapq.heappop(self.parked)[1])
+        while self.queue:
+            message = self.queue[0]
+            if message.chat_id is None:
+                return heapq.heappop(self.queue), None
+            if message.chat_id in self.in_flight:
+                self.held.setdefault(message.chat_id, []).append(heapq.heappop(self.queue))
+                continue
+            wait = self.limiter.chat_wait(message.chat_id)
+            if wait:
+                heapq.heappop(self.queue)
+                heapq.heappush(self.parked, (now + wait, message))
+                continue
+            wait = self.limiter.reserve(message.chat_id)
+            if wait:
+                return None, wait
+            self.in_flight.add(message.chat_id)
+            return heapq.heappop(self.queue), None
+        return None, self.parked[0][0] - now if self.parked else None
+
+    def run(self):
+        while True:
+            with self.cond:
+                message, wait = self.next_message()
+                if message is None:
+                    self.cond.wait(timeout=wait)
+                    continue
+            self.deliver(message)
+
+    def release(self, chat_id: int | None):
+        """Let the next call of the chat go, called with ``cond`` held."""
+        if chat_id is not None:
+            self.in_flight.discard(chat_id)
+            for message in self.held.pop(chat_id, []):
+                heapq.heappush(self.queue, message)
+        self.cond.notify_all()
+
+    def deliver(self, message: OutgoingMessage):
+        try:
+            getattr(self.client, message.method)(**message.kwargs)
+        except RetryAfter as e:
+            if message.throttled < self.max_throttled:
+                logger.warning("chat %s throttled for %.1fs", message.chat_id, e.retry_after)
+                message.throttled += 1
+                with self.cond:
+                    if message.chat_id is not None:
+                        self.limiter.pause(message.chat_id, e.retry_after)
+                    heapq.heappush(self.parked, (self.clock() + e.retry_after, message))
+                    self.release(message.chat_id)
+                return
+            self.fail(message)
+            return
+        except Exception:
+            self.fail(message)
+            return
+        latency = self.clock() - message.enqueued
+        with self.cond:
+            self.sent += 1
+            self.pending -= 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.release(message.chat_id)
+        logger.debug("%s to chat %s after %.3fs, %s queued", message.method, message.chat_id, latency,
+                     len(self.queue))
+
+    def fail(self, message: OutgoingMessage):
+        logger.exception("%s to chat %s failed", message.method, message.chat_id)
+        with self.cond:
+            self.failed += 1
+            self.pending -= 1
+            self.release(message.chat_id)
+
+    def metrics(self) -> list[tuple[str, str, str, float]]:
+        stats = self.stats()
+        return [
+            ("todolist_bot_outbox_depth", "gauge", "Bot API calls waiting to be sent.", stats["depth"]),
+            ("todolist_bot_outbox_sent_total", "counter", "Bot API calls sent.", stats["sent"]),
+            ("todolist_bot_outbox_failed_total", "counter", "Bot API calls that failed.", stats["failed"]),
+            ("todolist_bot_outbox_latency_seconds_total", "counter", "Time sent calls spent queued.",
+             self.latency_total),
+            ("todolist_bot_outbox_latency_max_seconds", "gauge", "Longest time a sent call spent queued.",
+             stats["latency_max_seconds"]),
+        ]
+
+
+def build_rate_limiter() -> RateLimiter:
+    return RateLimiter(settings.BOT_SEND_GLOBAL_RATE, settings.BOT_SEND_CHAT_RATE, settings.BOT_SEND_CHAT_BURST)
+
+
+@lru_cache(maxsize=None)
+def get_outbox() -> Outbox:
+    client = TgClient(settings.BOT_TOKEN, base_url=settings.BOT_API_URL, pool_size=settings.BOT_SEND_WORKERS,
+                      wait_flood=False)
+    outbox = Outbox(client, build_rate_limiter(), workers=settings.BOT_SEND_WORKERS)
+    outbox.start()
+    registry.add_collector(outbox.metrics)
+    return outbox
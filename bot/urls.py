@@ -4,4 +4,5 @@ from bot import views
 
 urlpatterns = [
     path("verify", views.VerificationView.as_view(), name='verify'),
+    path("webhook", views.WebhookView.as_view(), name='webhook'),
 ]
\ No newline at end of file
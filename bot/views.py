@@ -1,11 +1,19 @@
+import hmac
+import logging
+
 from django.conf import settings
-from rest_framework import permissions
+from rest_framework import permissions, status
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from bot.models import TgUser
 from bot.serializers import TgUserSerializer
-from bot.tg.client import TgClient
+from bot.tg.dc import DecodeError, UpdateObj
+from bot.tg.outbox import Priority, get_outbox
+from bot.webhook import claim_update, get_dispatcher, release_update
+
+logger = logging.getLogger(__name__)
 
 
 class VerificationView(GenericAPIView):
@@ -19,10 +27,33 @@ class VerificationView(GenericAPIView):
 
         tg_user: TgUser = s.validated_data["tg_user"]
         tg_user.user = self.request.user
-        tg_user.save(update_fields=["user"])
+        tg_user.clear_verification_code()
+        tg_user.save(update_fields=["user", "verification_code", "verification_code_expires"])
         instance_s: TgUserSerializer = self.get_serializer(tg_user)
-        tg_client = TgClient(settings.BOT_TOKEN)
-        tg_client.send_message(tg_user.chat_id, "[verification has been completed]")
+        get_outbox().enqueue(tg_user.chat_id, "[verification has been completed]", priority=Priority.high)
 
         return Response(instance_s.data)
-    
\ No newline at end of file
+    
+
+class WebhookView(APIView):
+    """Accepts Telegram updates and acknowledges them before they are processed."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    secret_header = "HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN"
+
+    def post(self, request, *args, **kwargs):
+        secret = settings.BOT_WEBHOOK_SECRET
+        if not secret or not hmac.compare_digest(request.META.get(self.secret_header, ""), secret):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            update = UpdateObj.from_dict(request.data)
+        except DecodeError as e:
+            # answering with an error would only make Telegram redeliver the same payload
+            logger.warning("malformed update skipped: %s", e)
+            return Response()
+        if not claim_update(update.update_id):
+            return Response()
+        if not get_dispatcher().submit(update):
+            release_update(update.update_id)
+            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response()
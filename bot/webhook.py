@@ -0,0 +1,77 @@
+import logging
+import queue
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from bot.runner import collect_calls, process_update, update_chat_id
+from bot.tg.dc import UpdateObj
+from bot.tg.outbox import Outbox, get_outbox
+
+logger = logging.getLogger(__name__)
+
+
+def claim_update(update_id: int) -> bool:
+    """False when the update was already accepted, Telegram redelivers until it gets a 2xx."""
+    return cache.add(f"bot:update:{update_id}", 1, settings.BOT_WEBHOOK_DEDUPE_TTL)
+
+
+def release_update(update_id: int):
+    cache.delete(f"bot:update:{update_id}")
+
+
+class WebhookDispatcher:
+    """Processes webhook updates on background threads, one queue per thread.
+
+    Updates of one chat always go to the same queue, so they are handled in
+    arrival order. With ``workers=0`` updates are processed inline. Replies
+    are queued on the outbox, a worker never waits for a rate limit.
+    """
+
+    def __init__(self, outbox: Outbox, workers: int = 4, queue_size: int = 100):
+        self.outbox = outbox
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.threads = [threading.Thread(target=self.work, args=(q,), name=f"tg-webhook-{i}", daemon=True)
+                        for i, q in enumerate(self.queues)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, update: UpdateObj, timeout: float = 1) -> bool:
+        """Hand the update over, or return False when its worker stays busy for ``timeout`` seconds."""
+        chat_id = update_chat_id(update)
+        if chat_id is None:
+            return True
+        if not self.queues:
+            self.process(update, collect_calls)
+            return True
+        try:
+            self.queues[chat_id % len(self.queues)].put(update, timeout=timeout)
+        except queue.Full:
+            return False
+        return True
+
+    def join(self):
+        for q in self.queues:
+            q.join()
+
+    def work(self, updates: queue.Queue):
+        while True:
+            update = updates.get()
+            try:
+                self.process(update, process_update)
+            finally:
+                updates.task_done()
+
+    def process(self, update: UpdateObj, handle):
+        try:
+            self.outbox.submit_calls(handle(update))
+        except Exception:
+            logger.exception("update %s failed", update.update_id)
+
+
+@lru_cache(maxsize=None)
+def get_dispatcher() -> WebhookDispatcher:
+    return WebhookDispatcher(get_outbox(), workers=settings.BOT_WEBHOOK_WORKERS,
+                             queue_size=settings.BOT_WEBHOOK_QUEUE_SIZE)
@@ -0,0 +1,24 @@
+import hashlib
+import json
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over ``parts``: equal for the same representation, not byte for byte."""
+    digest = hashlib.md5(json.dumps(parts, default=str).encode(), usedforsecurity=False).hexdigest()
+    return f"W/{quote_etag(digest)}"
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Whether a GET or HEAD carries ``etag`` in If-None-Match, compared weakly as RFC 9110 requires."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    tags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+LOCAL_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+
+
+def shared_state_problems(workers: int) -> list[str]:
+    """Settings that keep per-process state which must be shared once ``workers`` processes serve requests."""
+    if workers < 2:
+        return []
+    problems = []
+    local_cache = settings.CACHES["default"]["BACKEND"] == LOCAL_CACHE
+    if settings.BOT_WEBHOOK_SECRET:
+        if local_cache:
+            problems.append("the bot webhook dedupes updates in the local memory cache, set CACHE_URL")
+        if settings.BOT_STATE_STORE == "bot.state.MemoryStateStore":
+            problems.append("bot dialogs are kept in process memory, set BOT_STATE_STORE=bot.state.CacheStateStore")
+    if settings.GOALS_EVENTS_BROKER == "goals.events.MemoryBroker":
+        problems.append("board events only reach the worker that made the change, "
+                        "set GOALS_EVENTS_BROKER=goals.events.PostgresBroker")
+    if settings.BOARD_ROLES_CACHE_TIMEOUT and local_cache:
+        problems.append("board roles are cached in the local memory cache, set CACHE_URL")
+    return problems
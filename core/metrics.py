@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+
+from rest_framework import serializers
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Costs of one sampled request, filled while it is handled."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("current_metrics", default=None)
+
+
+class _ViewStats:
+    __slots__ = ("requests", "sampled", "queries", "db_seconds", "serializer_seconds", "response_bytes",
+                 "duration_seconds", "duration_buckets")
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.sampled = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.response_bytes = 0
+        self.duration_seconds = 0.0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    """Per-process totals by URL name and method, rendered in the Prometheus text format.
+
+    Collectors add values kept elsewhere: callables returning
+    ``(name, type, help, value)`` tuples, read on every render.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views: dict[tuple[str, str], _ViewStats] = defaultdict(_ViewStats)
+        self.collectors: list = []
+
+    def add_collector(self, collect):
+        with self.lock:
+            self.collectors.append(collect)
+
+    def count(self, view: str, method: str, status: int):
+        with self.lock:
+            self.views[view, method].requests[status] += 1
+
+    def observe(self, view: str, method: str, metrics: RequestMetrics, duration: float, size: int):
+        with self.lock:
+            stats = self.views[view, method]
+            stats.sampled += 1
+            stats.queries += metrics.queries
+            stats.db_seconds += metrics.db_time
+            stats.serializer_seconds += metrics.serializer_time
+            stats.response_bytes += size
+            stats.duration_seconds += duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.duration_buckets[i] += 1
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP todolist_http_requests_total Requests by URL name, method and status.",
+            "# TYPE todolist_http_requests_total counter",
+        ]
+        sums = [
+            ("todolist_http_sampled_requests_total", "sampled", "Requests measured in detail."),
+            ("todolist_http_db_queries_total", "queries", "SQL queries of sampled requests."),
+            ("todolist_http_db_seconds_total", "db_seconds", "Database time of sampled requests."),
+            ("todolist_http_serializer_seconds_total", "serializer_seconds", "Serializer time of sampled requests."),
+            ("todolist_http_response_bytes_total", "response_bytes", "Response body size of sampled requests."),
+        ]
+        with self.lock:
+            views = sorted(self.views.items())
+            for (view, method), stats in views:
+                for status, count in sorted(stats.requests.items()):
+                    lines.append(f'todolist_http_requests_total{{view="{view}",method="{method}",'
+                                 f'status="{status}"}} {count}')
+            for name, attr, help_text in sums:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (view, method), stats in views:
+                    lines.append(f'{name}{{view="{view}",method="{method}"}} {getattr(stats, attr)}')
+            lines += ["# HELP todolist_http_duration_seconds Duration of sampled requests.",
+                      "# TYPE todolist_http_duration_seconds histogram"]
+            for (view, method), stats in views:
+                labels = f'view="{view}",method="{method}"'
+                for bound, count in zip(DURATION_BUCKETS, stats.duration_buckets):
+                    lines.append(f'todolist_http_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'todolist_http_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.sampled}')
+                lines.append(f"todolist_http_duration_seconds_sum{{{labels}}} {stats.duration_seconds}")
+                lines.append(f"todolist_http_duration_seconds_count{{{labels}}} {stats.sampled}")
+            collectors = list(self.collectors)
+        for collect in collectors:
+            for name, kind, help_text, value in collect():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _timed_data(prop: property) -> property:
+    @wraps(prop.fget)
+    def data(serializer):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return prop.fget(serializer)
+        metrics.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += time.perf_counter() - start
+    data.timed = True
+    return property(data)
+
+
+def instrument_serializers():
+    """Time ``.data`` of DRF serializers, the only place DRF turns instances into primitives.
+
+    Nested ``.data`` calls are counted once. Requests that aren't sampled
+    only pay for one context variable lookup.
+    """
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        prop = cls.__dict__["data"]
+        if not getattr(prop.fget, "timed", False):
+            cls.data = _timed_data(prop)
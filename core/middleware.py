@@ -0,0 +1,102 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from core.metrics import RequestMetrics, current_metrics, registry
+
+logger = logging.getLogger("todolist.metrics")
+
+
+class InstrumentationMiddleware:
+    """Counts every request and measures a sample of them in detail.
+
+    A sampled request records its SQL query count and time, serializer time,
+    response size and duration under the resolved URL name. It is logged as
+    one JSON line and answered with a ``Server-Timing`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = self.get_response(request)
+            registry.count(self.view_name(request), request.method, response.status_code)
+            return response
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.watch_queries(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            response = await self.get_response(request)
+            registry.count(self.view_name(request), request.method, response.status_code)
+            return response
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # queries run on the request's sync_to_async thread, whose connections are the ones to wrap
+            await sync_to_async(self.watch_queries)(stack, metrics)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current_metrics.reset(token)
+        return self.record(request, response, metrics, time.perf_counter() - start)
+
+    @staticmethod
+    def watch_queries(stack: ExitStack, metrics: RequestMetrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def record(self, request, response, metrics: RequestMetrics, duration: float):
+        view = self.view_name(request)
+        size = 0 if response.streaming else len(response.content)
+        registry.count(view, request.method, response.status_code)
+        registry.observe(view, request.method, metrics, duration, size)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f"serializer;dur={metrics.serializer_time * 1000:.1f}",
+            f"total;dur={duration * 1000:.1f}",
+        ])
+        logger.info(json.dumps({
+            "view": view,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "serializer_ms": round(metrics.serializer_time * 1000, 2),
+            "duration_ms": round(duration * 1000, 2),
+            "bytes": size,
+        }))
+        return response
+
+    @staticmethod
+    def view_name(request) -> str:
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unresolved"
+        return match.view_name or match._func_path
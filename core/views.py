@@ -1,4 +1,7 @@
-from django.http import JsonResponse
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.views import View
 from django.contrib.auth import get_user_model, login, logout
@@ -8,6 +11,8 @@ from rest_framework.response import Response
 # Create your views here.
 
 
+from core.conditional import etag_matches, make_etag, not_modified
+from core.metrics import registry
 from core.serializers import *
 
 USER_MODEL = get_user_model()
@@ -39,6 +44,14 @@ class ProfileView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return self.request.user
 
+    def retrieve(self, request, *args, **kwargs):
+        # users have no modification time, so the ETag hashes the serialized profile
+        data = self.get_serializer(self.get_object()).data
+        etag = make_etag("profile", request.accepted_media_type, data)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(data, headers={"ETag": etag})
+
     def delete(self, request, *args, **kwargs):
         logout(request)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -50,3 +63,13 @@ class UpdatePasswordView(generics.UpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+class MetricsView(View):
+    """Request metrics of this process in the Prometheus text format."""
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICS_TOKEN
+        if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,232 @@
+import abc
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import lru_cache
+
+import psycopg2
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+# sent in place of the events a subscriber fell too far behind on; the client catches up through goals/sync
+RESYNC_EVENT = {"kind": "resync"}
+
+
+class Subscription:
+    """Events of some boards for one consumer, read on the event loop that subscribed.
+
+    ``put()`` may be called from any thread. When ``max_queued`` events wait,
+    they are dropped for a single ``RESYNC_EVENT``.
+    """
+
+    def __init__(self, broker: "Broker", board_ids: list[int], max_queued: int):
+        self.broker = broker
+        self.board_ids = board_ids
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queued)
+
+    def put(self, event: dict):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # the loop is gone without the subscription being closed
+            self.close()
+
+    def _put(self, event: dict):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC_EVENT
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(abc.ABC):
+    """Delivers change events of a board to the subscriptions of that board."""
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+
+    @abc.abstractmethod
+    def publish(self, board_id: int, event: dict):
+        ...
+
+    @abc.abstractmethod
+    def subscribe(self, board_ids: list[int]) -> Subscription:
+        ...
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription: Subscription):
+        ...
+
+
+class MemoryBroker(Broker):
+    """Process-local broker: events reach the subscribers of the process that published them."""
+
+    def __init__(self, max_queued: int = 100):
+        super().__init__(max_queued)
+        self.lock = threading.Lock()
+        self.subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+
+    def publish(self, board_id: int, event: dict):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(board_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, board_ids: list[int]) -> Subscription:
+        subscription = Subscription(self, board_ids, self.max_queued)
+        with self.lock:
+            for board_id in board_ids:
+                self.subscriptions[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            for board_id in subscription.board_ids:
+                subscribers = self.subscriptions.get(board_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscriptions[board_id]
+
+
+class PostgresBroker(MemoryBroker):
+    """Broker shared by every process through Postgres ``NOTIFY``.
+
+    Each process ``LISTEN``s on its own connection, opened with the
+    parameters of ``database`` updated by ``connection_options``. It has to
+    reach Postgres directly: notifications don't survive PgBouncer's
+    transaction pooling. Subscribers get ``RESYNC_EVENT`` in place of an
+    event too large for a notification and after the connection was lost.
+    """
+    channel = "goals_events"
+    # Postgres refuses payloads of 8000 bytes and more
+    max_payload = 7900
+
+    def __init__(self, max_queued: int = 100, database: str = "default", reconnect_delay: float = 1,
+                 **connection_options):
+        super().__init__(max_queued)
+        self.database = database
+        self.connection_options = connection_options
+        self.reconnect_delay = reconnect_delay
+        self.listening = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def publish(self, board_id: int, event: dict):
+        payload = json.dumps({"board": board_id, "event": event}, separators=(",", ":"))
+        if len(payload.encode()) > self.max_payload:
+            payload = json.dumps({"board": board_id, "event": RESYNC_EVENT})
+        with connections[self.database].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, board_ids: list[int]) -> Subscription:
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.listen, name="goals-events", daemon=True)
+                self.thread.start()
+        return super().subscribe(board_ids)
+
+    def close(self):
+        self.stopping.set()
+
+    def connect(self):
+        params = connections[self.database].get_connection_params()
+        params.update(self.connection_options)
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def listen(self):
+        lost = False
+        while not self.stopping.is_set():
+            try:
+                conn = self.connect()
+            except psycopg2.Error:
+                logger.exception("can't listen for board events")
+                self.stopping.wait(self.reconnect_delay)
+                continue
+            if lost:
+                self.resync()
+            self.listening.set()
+            try:
+                self.receive(conn)
+            except psycopg2.Error:
+                logger.exception("board events connection lost")
+                self.listening.clear()
+                lost = True
+            finally:
+                conn.close()
+
+    def receive(self, conn):
+        while not self.stopping.is_set():
+            if not select.select([conn], [], [], 1)[0]:
+                continue
+            conn.poll()
+            while conn.notifies:
+                message = json.loads(conn.notifies.pop(0).payload)
+                super().publish(message["board"], message["event"])
+
+    def resync(self):
+        with self.lock:
+            subscriptions = set().union(*self.subscriptions.values())
+        for subscription in subscriptions:
+            subscription.put(RESYNC_EVENT)
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> Broker:
+    return import_string(settings.GOALS_EVENTS_BROKER)(**settings.GOALS_EVENTS_BROKER_OPTIONS)
+
+
+def publish_changes(kind: str, action: str, rows: Iterable[tuple[int | None, int]]):
+    """Publish ``action`` on the (board_id, id) ``rows`` of ``kind`` once the transaction commits.
+
+    Subscribers get one event per board with the ids only; they read the rows
+    themselves, through goals/sync or the detail endpoints.
+    """
+    ids = defaultdict(list)
+    for board_id, pk in rows:
+        if board_id is not None:
+            ids[board_id].append(pk)
+    if not ids:
+        return
+
+    def send():
+        broker = get_broker()
+        for board_id, pks in ids.items():
+            broker.publish(board_id, {"kind": kind, "action": action, "board": board_id, "ids": sorted(pks)})
+    transaction.on_commit(send, robust=True)
+
+
+def format_event(event: dict) -> str:
+    """``event`` as a Server-Sent Events message."""
+    return f"event: {event['kind']}\ndata: {json.dumps(event, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients ask for ``text/event-stream``; an error response is sent as one ``error`` event."""
+    media_type = "text/event-stream"
+    format = "event-stream"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event({"kind": "error", "errors": data}).encode(self.charset)
@@ -2,10 +2,12 @@ import django_filters
 from django.db import models
 from django_filters import rest_framework
 
-from goals.models import Goal
+from goals.models import Goal, Board
 
 
 class GoalDateFilter(rest_framework.FilterSet):
+    category__board = rest_framework.ModelChoiceFilter(field_name="board", queryset=Board.objects.all())
+
     class Meta:
         model = Goal
         fields = {
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
+
+from core.conditional import etag_matches, make_etag, not_modified
+from goals.membership import get_board_versions
+from goals.models import Board
+
+
+class AsyncDispatchMixin:
+    """``APIView.dispatch()`` for views with async handlers.
+
+    Authentication, permissions and content negotiation are the usual DRF
+    ones and run through ``sync_to_async``, as they may block on the session
+    lookup or board roles. Under WSGI Django runs the view with ``async_to_sync``.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # APIView.dispatch() with the handler awaited
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListAPIView(AsyncDispatchMixin, ListAPIView):
+    """``ListAPIView`` that reads its page with the async ORM.
+
+    Filters and serializers are the usual DRF ones; filter forms run through
+    ``sync_to_async``. The pagination class must provide ``apaginate_queryset``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+
+
+class ConditionalListMixin:
+    """List answering ``If-None-Match`` with 304 once its page is read, before it is serialized.
+
+    The ETag covers ``updated`` of the page's rows, what the paginator knows
+    of the rest of the set (row count, or whether more pages follow) and the
+    user's board versions, which also change with the nested authors.
+    """
+
+    def list_etag(self, rows: list) -> str:
+        paginator = getattr(self.paginator, "keyset", None) or self.paginator
+        return make_etag(type(self).__name__, self.request.accepted_media_type, self.request.user.pk,
+                         [(row.pk, row.updated) for row in rows],
+                         [getattr(paginator, name, None) for name in ("count", "has_next", "has_previous")],
+                         sorted(get_board_versions(self.request).items()))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else list(queryset)
+        return self.conditional_response(rows, page is not None, self.list_etag(rows))
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        rows = page if page is not None else [obj async for obj in queryset]
+        return self.conditional_response(rows, page is not None, await sync_to_async(self.list_etag)(rows))
+
+    def conditional_response(self, rows: list, paginated: bool, etag: str) -> Response:
+        if etag_matches(self.request, etag):
+            return not_modified(etag)
+        data = self.get_serializer(rows, many=True).data
+        response = self.get_paginated_response(data) if paginated else Response(data)
+        response["ETag"] = etag
+        return response
+
+
+class ConditionalRetrieveMixin:
+    """``retrieve()`` answering ``If-None-Match`` with 304 before the object is serialized."""
+
+    def object_etag(self, instance) -> str:
+        if isinstance(instance, Board):
+            version = instance.version
+        else:
+            version = get_board_versions(self.request).get(instance.board_id)
+        return make_etag(type(self).__name__, self.request.accepted_media_type, instance.pk, instance.updated,
+                         version)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.object_etag(instance)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(self.get_serializer(instance).data, headers={"ETag": etag})
+
+
+class CachedListMixin:
+    """Keeps list pages in the cache under the versions of the user's boards.
+
+    ``Board.version`` is raised by database triggers in the same transaction
+    as any write to the board, its goals, categories, comments or participants
+    (``.update()`` and bulk writes included). A page is stored under the versions
+    read before it was built, so once a write commits no key leads to a page
+    built before it. A hit costs one query on the boards table. The page's ETag
+    is kept with it, so conditional requests are answered from the cache too.
+    """
+
+    def list_cache_key(self, request) -> str | None:
+        if not settings.LIST_CACHE_TIMEOUT:
+            return None
+        versions = sorted(get_board_versions(request).items())
+        params = sorted((key, values) for key, values in request.query_params.lists())
+        raw = json.dumps([request.user.pk, versions, request.get_host(), request.path, params,
+                          request.accepted_media_type], default=str)
+        return f"list_page:{type(self).__name__}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.list_cache_key(request)
+        entry = cache.get(key) if key else None
+        if entry is not None:
+            return self.cached_response(request, *entry)
+        response = super().list(request, *args, **kwargs)
+        if key and response.status_code == 200:
+            cache.set(key, (response.get("ETag"), response.data), settings.LIST_CACHE_TIMEOUT)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        key = await sync_to_async(self.list_cache_key)(request)
+        entry = await cache.aget(key) if key else None
+        if entry is not None:
+            return self.cached_response(request, *entry)
+        response = await super().alist(request, *args, **kwargs)
+        if key and response.status_code == 200:
+            await cache.aset(key, (response.get("ETag"), response.data), settings.LIST_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def cached_response(request, etag: str | None, data) -> Response:
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(data, headers={"ETag": etag} if etag else None)
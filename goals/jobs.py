@@ -0,0 +1,90 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from goals.models import ArchiveJob, Goal
+from goals.stats import archive_goals
+
+logger = logging.getLogger(__name__)
+
+
+class InlineJobRunner:
+    """Runs jobs right away in the calling thread, for tests and management commands."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class ThreadJobRunner:
+    """Runs jobs on a small in-process thread pool with its own database connections."""
+
+    def __init__(self, workers: int = 2):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="goals-job")
+
+    def submit(self, fn, *args):
+        self.executor.submit(self.run, fn, *args)
+
+    @staticmethod
+    def run(fn, *args):
+        close_old_connections()
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("job %s%s failed", fn.__name__, args)
+        finally:
+            close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def get_job_runner():
+    return import_string(settings.GOALS_JOB_RUNNER)(**settings.GOALS_JOB_RUNNER_OPTIONS)
+
+
+def start_archive_job(board, category=None) -> ArchiveJob:
+    """Create an archival job and hand it to the job runner once the transaction commits."""
+    job = ArchiveJob.objects.create(board=board, category=category)
+    transaction.on_commit(lambda: get_job_runner().submit(run_archive_job, job.id))
+    return job
+
+
+def job_goals(job: ArchiveJob) -> QuerySet:
+    goals = Goal.objects.filter(category_id=job.category_id) if job.category_id else \
+        Goal.objects.filter(board_id=job.board_id)
+    return goals.exclude(status=Goal.Status.archived)
+
+
+def run_archive_job(job_id: int, batch_size: int | None = None):
+    """Archive the job's goals in short transactions of ``batch_size`` goals each.
+
+    A job is claimed by moving it from pending to running, so a job submitted
+    twice runs once. Each batch locks only its own rows.
+    """
+    if not ArchiveJob.objects.filter(pk=job_id, status=ArchiveJob.Status.pending).update(
+            status=ArchiveJob.Status.running, updated=timezone.now()):
+        return
+    job = ArchiveJob.objects.get(pk=job_id)
+    batch_size = batch_size or settings.GOALS_ARCHIVE_BATCH_SIZE
+    goals = job_goals(job)
+    try:
+        ArchiveJob.objects.filter(pk=job_id).update(total=F("processed") + goals.count(), updated=timezone.now())
+        while True:
+            with transaction.atomic():
+                ids = list(goals.order_by("id").values_list("id", flat=True)[:batch_size])
+                if not ids:
+                    break
+                archived = archive_goals(Goal.objects.filter(id__in=ids))
+                ArchiveJob.objects.filter(pk=job_id).update(processed=F("processed") + archived,
+                                                            updated=timezone.now())
+    except Exception as e:
+        logger.exception("archive job %s failed", job_id)
+        ArchiveJob.objects.filter(pk=job_id).update(status=ArchiveJob.Status.failed, error=str(e),
+                                                    updated=timezone.now(), finished=timezone.now())
+        return
+    ArchiveJob.objects.filter(pk=job_id).update(status=ArchiveJob.Status.done, updated=timezone.now(),
+                                                finished=timezone.now())
@@ -0,0 +1,170 @@
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from django.db import connection
+from django.utils import timezone
+
+from core.models import User
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment
+
+WORDS = (
+    "купить молоко хлеб книга прочитать отчёт написать письмо позвонить врачу записаться спортзал "
+    "оплатить счета квартира ремонт машина сервис подарок маме день рождения отпуск билеты гостиница "
+    "проект релиз тесты документация встреча команда презентация клиент договор бюджет план неделя "
+    "английский курс лекция экзамен статья блог фото альбом сад цветы полить уборка кухня"
+).split()
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"min": min(samples), "median": statistics.median(samples), "max": max(samples)}
+
+
+def summarize(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {"min": ordered[0], "median": statistics.median(ordered),
+            "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))], "max": ordered[-1]}
+
+
+def format_timing(name: str, timing: dict) -> str:
+    return "{:<28} min {:>9.2f} ms  median {:>9.2f} ms  max {:>9.2f} ms".format(
+        name, timing["min"], timing["median"], timing["max"])
+
+
+def analyze(*models):
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+
+def seed_boards(boards: int, participants: int, categories: int, goals: int, comments: int = 0,
+                batch_size: int = 5000) -> User:
+    """Bulk-create boards shared by ``participants`` users and return one of them."""
+    now = timezone.now()
+    prefix = uuid.uuid4().hex[:8]
+    users = User.objects.bulk_create(
+        [User(username=f"bench_{prefix}_{i}", password="!") for i in range(participants)],
+        batch_size=batch_size,
+    )
+    board_objs = Board.objects.bulk_create(
+        [Board(title=f"bench board {i}", created=now, updated=now) for i in range(boards)],
+        batch_size=batch_size,
+    )
+    BoardParticipant.objects.bulk_create(
+        [BoardParticipant(board=board, user=user, created=now, updated=now,
+                          role=BoardParticipant.Role.owner if n == 0 else BoardParticipant.Role.writer)
+         for board in board_objs for n, user in enumerate(users)],
+        batch_size=batch_size,
+    )
+    category_objs = GoalCategory.objects.bulk_create(
+        [GoalCategory(board=board, user=users[0], title=f"bench category {i}", created=now, updated=now)
+         for board in board_objs for i in range(categories)],
+        batch_size=batch_size,
+    )
+    rng = random.Random(goals)
+    for start in range(0, goals, batch_size):
+        goal_objs = Goal.objects.bulk_create(
+            [Goal(category=category_objs[i % len(category_objs)],
+                  board_id=category_objs[i % len(category_objs)].board_id,
+                  user=users[i % len(users)], title=" ".join(rng.sample(WORDS, 3)),
+                  description=" ".join(rng.sample(WORDS, 12)),
+                  status=i % 4 + 1, priority=i % 4 + 1, created=now, updated=now,
+                  due_date=(now + timezone.timedelta(days=i % 365)).date())
+             for i in range(start, min(start + batch_size, goals))],
+        )
+        GoalComment.objects.bulk_create(
+            [GoalComment(goal=goal, board_id=goal.board_id, user=goal.user, text="bench comment",
+                         created=now, updated=now)
+             for goal in goal_objs[:comments]],
+        )
+        comments = max(comments - len(goal_objs), 0)
+    analyze(User, Board, BoardParticipant, GoalCategory, Goal, GoalComment)
+    return users[0]
+
+
+@dataclass
+class Dataset:
+    user: User
+    users: list[int] = field(default_factory=list)
+    boards: list[int] = field(default_factory=list)
+    categories: list[int] = field(default_factory=list)
+    goals: int = 0
+    comments: int = 0
+
+
+def seed_dataset(users: int, boards: int, participants: int, categories: int, goals: int, comments: int,
+                 member_boards: int = 20, seed: int = 0, batch_size: int = 5000, log=None) -> Dataset:
+    """Bulk-create a production-shaped dataset, the same one for the same arguments and ``seed``.
+
+    Every board has ``participants`` random members. The returned ``user`` owns
+    the first ``member_boards`` boards and sees nothing else. Goals and comments
+    are spread randomly over categories and goals. Board goal counters are
+    rebuilt at the end.
+    """
+    from goals.stats import rebuild_counters
+
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+    prefix = f"bench{seed}_{uuid.uuid4().hex[:6]}"
+    user_ids = [user.id for user in User.objects.bulk_create(
+        [User(username=f"{prefix}_{i}", password="!") for i in range(users)], batch_size=batch_size)]
+    board_ids = [board.id for board in Board.objects.bulk_create(
+        [Board(title=" ".join(rng.sample(WORDS, 2)), created=now, updated=now) for _ in range(boards)],
+        batch_size=batch_size)]
+    log(f"{users} users, {boards} boards")
+
+    members = []
+    for n, board_id in enumerate(board_ids):
+        owner = user_ids[0] if n < member_boards else rng.choice(user_ids[1:] or user_ids)
+        others = rng.sample([user_id for user_id in user_ids[1:] if user_id != owner],
+                            min(max(participants - 1, 0), len(user_ids) - 2))
+        members.append(BoardParticipant(board_id=board_id, user_id=owner, role=BoardParticipant.Role.owner,
+                                        created=now, updated=now))
+        members += [BoardParticipant(board_id=board_id, user_id=user_id, created=now, updated=now,
+                                     role=rng.choice(BoardParticipant.editable_choices)[0]) for user_id in others]
+    BoardParticipant.objects.bulk_create(members, batch_size=batch_size)
+    category_objs = GoalCategory.objects.bulk_create(
+        [GoalCategory(board_id=board_id, user_id=user_ids[0], title=" ".join(rng.sample(WORDS, 2)),
+                      created=now, updated=now)
+         for board_id in board_ids for _ in range(categories)],
+        batch_size=batch_size,
+    )
+    log(f"{len(members)} participants, {len(category_objs)} categories")
+
+    comments_left = comments
+    for start in range(0, goals, batch_size):
+        size = min(batch_size, goals - start)
+        batch = []
+        for _ in range(size):
+            category = rng.choice(category_objs)
+            batch.append(Goal(
+                category_id=category.id, board_id=category.board_id, user_id=rng.choice(user_ids),
+                title=" ".join(rng.sample(WORDS, 3)), description=" ".join(rng.sample(WORDS, 12)),
+                status=rng.choice(Goal.Status.values), priority=rng.choice(Goal.Priority.values),
+                due_date=(now + timezone.timedelta(days=rng.randint(-30, 365))).date() if rng.random() < 0.8
+                else None,
+                created=now, updated=now))
+        batch = Goal.objects.bulk_create(batch)
+        count = min(comments_left, round(comments * size / goals))
+        GoalComment.objects.bulk_create(
+            [GoalComment(goal_id=goal.id, board_id=goal.board_id, user_id=rng.choice(user_ids),
+                         text=" ".join(rng.sample(WORDS, 6)), created=now, updated=now)
+             for goal in rng.choices(batch, k=count)],
+            batch_size=batch_size,
+        )
+        comments_left -= count
+        log(f"{start + size} goals")
+
+    rebuild_counters(board_ids)
+    analyze(User, Board, BoardParticipant, GoalCategory, Goal, GoalComment)
+    return Dataset(user=User.objects.get(pk=user_ids[0]), users=user_ids, boards=board_ids,
+                   categories=[category.id for category in category_objs], goals=goals,
+                   comments=comments - comments_left)
@@ -0,0 +1,358 @@
+import json
+import subprocess
+import time
+from dataclasses import dataclass
+from itertools import count
+from unittest import mock
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bot.models import TgUser
+from bot.runner import CollectingSender, collect_calls
+from bot.tg.dc import UpdateObj
+from bot.tg.outbox import Outbox, RateLimiter
+from bot.webhook import WebhookDispatcher
+from core.models import User
+from goals.management.commands._bench import seed_dataset, summarize
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.sync import STREAMS, SyncCursor, encode_cursor
+
+BENCH_PASSWORD = "bench-Passw0rd"
+NAMESPACES = ("core", "goals", "bot")
+WEBHOOK_HEADERS = {"HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN": "bench"}
+
+
+@dataclass
+class BenchContext:
+    """Objects of the bench user the scenarios point at, all on a board the user owns."""
+    user: User
+    board: Board
+    category: GoalCategory
+    goal: Goal
+    comment: GoalComment
+    tg_user: TgUser
+    goal_ids: list[int]
+    serial: count
+    archive_job_id: int | None = None
+    client: APIClient | None = None
+
+    @classmethod
+    def for_user(cls, user: User) -> "BenchContext":
+        board = Board.objects.filter(participants__user=user, participants__role=BoardParticipant.Role.owner,
+                                     is_deleted=False).order_by("id").first()
+        if board is None:
+            raise CommandError(f"{user.username} owns no board")
+        category = GoalCategory.objects.filter(board=board, is_deleted=False).order_by("id").first() \
+            or GoalCategory.objects.create(board=board, user=user, title="bench")
+        goal = Goal.objects.filter(category=category).order_by("id").first() \
+            or Goal.objects.create(category=category, user=user, title="bench")
+        comment = GoalComment.objects.filter(goal=goal, user=user).order_by("id").first() \
+            or GoalComment.objects.create(goal=goal, user=user, text="bench")
+        user.set_password(BENCH_PASSWORD)
+        user.save(update_fields=["password"])
+        tg_user, _ = TgUser.objects.update_or_create(user_ud=10 ** 12 + user.id,
+                                                     defaults={"chat_id": 10 ** 12 + user.id, "user": user})
+        goal_ids = list(Goal.objects.filter(board=board).exclude(status=Goal.Status.archived)
+                        .order_by("id").values_list("id", flat=True)[:100])
+        return cls(user, board, category, goal, comment, tg_user, goal_ids, count())
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}_{self.user.id}_{next(self.serial)}"
+
+
+@dataclass
+class Scenario:
+    route: str
+    method: str
+    url: object  # callable(ctx) -> str
+    data: object = None  # callable(ctx) -> dict | list
+    headers: dict | None = None
+    anonymous: bool = False
+    logout: bool = False
+    name: str = ""
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.route}{' ' + self.name if self.name else ''}"
+
+    @property
+    def mutating(self) -> bool:
+        return self.method != "GET"
+
+
+def url(name: str, pk: str | None = None, query=""):
+    """URL builder of a scenario; ``pk`` names a BenchContext object, ``query`` may depend on the context."""
+    def build(ctx: BenchContext) -> str:
+        args = [getattr(ctx, pk).pk] if pk else []
+        params = query(ctx) if callable(query) else query
+        return reverse(name, args=args) + (f"?{params}" if params else "")
+    return build
+
+
+def synced_cursor(ctx: BenchContext) -> str:
+    """Sync cursor of a client that has seen every change of the bench user's boards."""
+    board_ids = sorted(BoardParticipant.objects.filter(user=ctx.user).values_list("board_id", flat=True))
+    position = timezone.now(), 0
+    return "cursor=" + encode_cursor(SyncCursor({name: position for name in STREAMS}, board_ids))
+
+
+def update(ctx: BenchContext, **fields) -> dict:
+    return {"update_id": 10 ** 9 + next(ctx.serial), **fields}
+
+
+def message(ctx: BenchContext, text: str) -> dict:
+    sender = {"id": ctx.tg_user.user_ud, "is_bot": False, "first_name": "Bench"}
+    chat = {"id": ctx.tg_user.chat_id, "type": "private"}
+    return {"message_id": 1, "from": sender, "chat": chat, "date": 1690000000, "text": text}
+
+
+def callback(ctx: BenchContext, data: str) -> dict:
+    sender = {"id": ctx.tg_user.user_ud, "is_bot": False, "first_name": "Bench"}
+    return {"id": str(next(ctx.serial)), "from": sender, "message": message(ctx, "/goals"), "chat_instance": "1",
+            "data": data}
+
+
+# Every named route of the core, goals and bot URLconfs needs at least one scenario;
+# the command reports routes left without one.
+SCENARIOS = [
+    Scenario("core:signup", "POST", url("core:signup"), anonymous=True, data=lambda ctx: {
+        "username": ctx.unique("signup"), "password": BENCH_PASSWORD, "password_repeat": BENCH_PASSWORD}),
+    Scenario("core:login", "POST", url("core:login"), anonymous=True,
+             data=lambda ctx: {"username": ctx.user.username, "password": BENCH_PASSWORD}),
+    Scenario("core:profile", "GET", url("core:profile")),
+    Scenario("core:profile", "PATCH", url("core:profile"), data=lambda ctx: {"first_name": "Bench"}),
+    Scenario("core:profile", "DELETE", url("core:profile"), logout=True),
+    Scenario("core:update_password", "PATCH", url("core:update_password"),
+             data=lambda ctx: {"old_password": BENCH_PASSWORD, "new_password": "bench-N3w-passw0rd"}),
+
+    Scenario("goals:board_list", "GET", url("goals:board_list")),
+    Scenario("goals:board_create", "POST", url("goals:board_create"), data=lambda ctx: {"title": "bench"}),
+    Scenario("goals:board_pk", "GET", url("goals:board_pk", "board")),
+    Scenario("goals:board_pk", "PUT", url("goals:board_pk", "board"), data=lambda ctx: {
+        "title": ctx.board.title,
+        "participants": [{"user": participant.user.username, "role": participant.role}
+                         for participant in ctx.board.participants.select_related("user")
+                         .exclude(role=BoardParticipant.Role.owner)]}),
+    Scenario("goals:board_pk", "DELETE", url("goals:board_pk", "board")),
+    Scenario("goals:board_stats", "GET", url("goals:board_stats", "board")),
+    # the stream is closed right after subscribing, see GOALS_EVENTS_STREAM_SECONDS below
+    Scenario("goals:board_events", "GET", url("goals:board_events", query=lambda ctx: f"boards={ctx.board.id}"),
+             headers={"HTTP_ACCEPT": "text/event-stream"}),
+    Scenario("goals:category_list", "GET", url("goals:category_list", query="limit=100")),
+    Scenario("goals:category_create", "POST", url("goals:category_create"),
+             data=lambda ctx: {"title": "bench", "board": ctx.board.id}),
+    Scenario("goals:category_pk", "GET", url("goals:category_pk", "category")),
+    Scenario("goals:category_pk", "PATCH", url("goals:category_pk", "category"), data=lambda ctx: {"title": "bench"}),
+    Scenario("goals:category_pk", "DELETE", url("goals:category_pk", "category")),
+    Scenario("goals:goal_list", "GET", url("goals:goal_list", query="limit=100"), name="offset"),
+    Scenario("goals:goal_list", "GET", url("goals:goal_list", query="limit=100&offset=5000"), name="deep offset"),
+    Scenario("goals:goal_list", "GET", url("goals:goal_list", query="cursor="), name="keyset"),
+    Scenario("goals:goal_list", "GET", url("goals:goal_list", query="search=отчёт&limit=100"), name="search"),
+    Scenario("goals:goal_create", "POST", url("goals:goal_create"),
+             data=lambda ctx: {"title": "bench", "category": ctx.category.id}),
+    Scenario("goals:goal_bulk_create", "POST", url("goals:goal_bulk_create"),
+             data=lambda ctx: [{"title": f"bench {i}", "category": ctx.category.id} for i in range(100)]),
+    Scenario("goals:goal_bulk_update", "PATCH", url("goals:goal_bulk_update"),
+             data=lambda ctx: [{"id": goal_id, "priority": Goal.Priority.high} for goal_id in ctx.goal_ids]),
+    Scenario("goals:goal_bulk_archive", "POST", url("goals:goal_bulk_archive"), data=lambda ctx: {"ids": ctx.goal_ids}),
+    Scenario("goals:goal_pk", "GET", url("goals:goal_pk", "goal")),
+    Scenario("goals:goal_pk", "PATCH", url("goals:goal_pk", "goal"), data=lambda ctx: {"status": Goal.Status.done}),
+    Scenario("goals:goal_pk", "DELETE", url("goals:goal_pk", "goal")),
+    Scenario("goals:comment_list", "GET", url("goals:comment_list", query=lambda ctx: f"goal={ctx.goal.id}&limit=100"),
+             name="goal"),
+    Scenario("goals:comment_create", "POST", url("goals:comment_create"),
+             data=lambda ctx: {"goal": ctx.goal.id, "text": "bench"}),
+    Scenario("goals:comment_pk", "GET", url("goals:comment_pk", "comment")),
+    Scenario("goals:comment_pk", "PATCH", url("goals:comment_pk", "comment"), data=lambda ctx: {"text": "bench"}),
+    Scenario("goals:comment_pk", "DELETE", url("goals:comment_pk", "comment")),
+    Scenario("goals:archive_job_pk", "GET", lambda ctx: reverse("goals:archive_job_pk", args=[ctx.archive_job_id])),
+    Scenario("goals:sync", "GET", url("goals:sync", query="limit=200"), name="full"),
+    Scenario("goals:sync", "GET", url("goals:sync", query=synced_cursor), name="up to date"),
+
+    Scenario("bot:verify", "PATCH", url("bot:verify"), data=lambda ctx: {"verification_code": ctx.tg_user.code}),
+    Scenario("bot:webhook", "POST", url("bot:webhook"), anonymous=True, name="/goals", headers=WEBHOOK_HEADERS,
+             data=lambda ctx: update(ctx, message=message(ctx, "/goals"))),
+    Scenario("bot:webhook", "POST", url("bot:webhook"), anonymous=True, name="page", headers=WEBHOOK_HEADERS,
+             data=lambda ctx: update(ctx, callback_query=callback(ctx, f"goals:n{ctx.goal_ids[len(ctx.goal_ids) // 2]}"))),
+]
+
+# bot handler throughput, update payloads of a verified user
+BOT_UPDATES = {
+    "/start": lambda ctx: update(ctx, message=message(ctx, "/start")),
+    "/board": lambda ctx: update(ctx, message=message(ctx, "/board")),
+    "/goals": lambda ctx: update(ctx, message=message(ctx, "/goals")),
+    "/goal_category": lambda ctx: update(ctx, message=message(ctx, "/goal_category")),
+    "goals page": lambda ctx: update(ctx, callback_query=callback(ctx, f"goals:n{ctx.goal_ids[len(ctx.goal_ids) // 2]}")),
+}
+
+
+def route_names() -> set[str]:
+    resolver = get_resolver()
+    return {f"{namespace}:{pattern.name}"
+            for namespace in NAMESPACES
+            for pattern in resolver.namespace_dict[namespace][1].url_patterns if pattern.name}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "measure latency and queries of every API route and the bot handler throughput on a large dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="bench user of a dataset made by seed_data, "
+                                               "otherwise a dataset is seeded and rolled back")
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--boards", type=int, default=200)
+        parser.add_argument("--participants", type=int, default=20)
+        parser.add_argument("--categories", type=int, default=5)
+        parser.add_argument("--goals", type=int, default=50_000)
+        parser.add_argument("--comments", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--bot-seconds", type=float, default=2.0)
+        parser.add_argument("--only", nargs="+", default=[], help="route names to run, e.g. goals:goal_list")
+        parser.add_argument("--output", help="write the report as JSON")
+        parser.add_argument("--compare", help="JSON report to compare against")
+        parser.add_argument("--threshold", type=float, default=0.2,
+                            help="median slowdown counted as a regression, 0.2 = 20%%")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        report = {
+            "commit": git_commit(),
+            "created": timezone.now().isoformat(),
+            "options": {key: options[key] for key in ("username", "users", "boards", "participants", "categories",
+                                                      "goals", "comments", "seed", "repeat", "warmup")},
+            "routes": {},
+            "bot": {},
+        }
+        with transaction.atomic(), override_settings(BOT_WEBHOOK_SECRET="bench", METRICS_SAMPLE_RATE=0,
+                                                 GOALS_EVENTS_STREAM_SECONDS=0):
+            if options["username"]:
+                user = User.objects.get(username=options["username"])
+            else:
+                start = time.perf_counter()
+                user = seed_dataset(options["users"], options["boards"], options["participants"],
+                                    options["categories"], options["goals"], options["comments"],
+                                    seed=options["seed"]).user
+                self.stdout.write(f"seeded in {time.perf_counter() - start:.1f}s")
+            ctx = self.prepare(user)
+            self.run_routes(ctx, options, report["routes"])
+            self.run_bot(ctx, options, report["bot"])
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                regressions = self.compare(json.load(f), report, options["threshold"])
+            if regressions and options["fail_on_regression"]:
+                raise CommandError(f"{regressions} regressions")
+
+    def prepare(self, user: User) -> BenchContext:
+        ctx = BenchContext.for_user(user)
+        ctx.tg_user.code = ctx.tg_user.issue_verification_code()
+        ctx.archive_job_id = ctx.board.archive_jobs.create(total=0).id
+        ctx.client = APIClient(raise_request_exception=False)
+        ctx.client.force_login(user)
+        return ctx
+
+    def run_routes(self, ctx: BenchContext, options: dict, results: dict):
+        missing = route_names() - {scenario.route for scenario in SCENARIOS}
+        for route in sorted(missing):
+            self.stdout.write(self.style.WARNING(f"no scenario for {route}"))
+
+        outbox = Outbox(CollectingSender(), RateLimiter(1e9, 1e9, 1e9))
+        outbox.start()
+        dispatcher = WebhookDispatcher(outbox, workers=0)
+        with mock.patch("bot.views.get_dispatcher", return_value=dispatcher), \
+                mock.patch("bot.views.get_outbox", return_value=outbox):
+            for scenario in SCENARIOS:
+                if options["only"] and scenario.route not in options["only"]:
+                    continue
+                results[scenario.label] = result = self.run_scenario(ctx, scenario, options)
+                self.stdout.write("{:<44} {:>4} queries  min {:>8.2f}  median {:>8.2f}  p95 {:>8.2f}  "
+                                  "max {:>8.2f} ms  status {}".format(scenario.label, result["queries"],
+                                                                      result["min"], result["median"], result["p95"],
+                                                                      result["max"], result["status"]))
+
+    def run_scenario(self, ctx: BenchContext, scenario: Scenario, options: dict) -> dict:
+        samples, queries, status = [], 0, None
+        for i in range(options["warmup"] + options["repeat"]):
+            client = APIClient(raise_request_exception=False) if scenario.anonymous else ctx.client
+            path = scenario.url(ctx)
+            data = scenario.data(ctx) if scenario.data else None
+            # mutations run in a savepoint that is rolled back, so every repetition sees the same data
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries_ctx:
+                start = time.perf_counter()
+                response = getattr(client, scenario.method.lower())(path, data, format="json",
+                                                                    **(scenario.headers or {}))
+                elapsed = (time.perf_counter() - start) * 1000
+                if scenario.mutating:
+                    transaction.set_rollback(True)
+            if scenario.logout:
+                ctx.client.force_login(ctx.user)
+            if i >= options["warmup"]:
+                samples.append(elapsed)
+                queries, status = len(queries_ctx), response.status_code
+        return {"route": scenario.route, "method": scenario.method, "status": status, "queries": queries,
+                **summarize(samples)}
+
+    def run_bot(self, ctx: BenchContext, options: dict, results: dict):
+        for name, build in BOT_UPDATES.items():
+            handled, queries = 0, 0
+            start = time.perf_counter()
+            deadline = start + options["bot_seconds"]
+            while time.perf_counter() < deadline:
+                update = UpdateObj.from_dict(build(ctx))
+                with CaptureQueriesContext(connection) as queries_ctx:
+                    collect_calls(update)
+                queries = len(queries_ctx)
+                handled += 1
+            elapsed = time.perf_counter() - start
+            results[name] = {"updates_per_second": handled / elapsed, "queries": queries}
+            self.stdout.write("bot {:<20} {:>10,.0f} updates/s  {:>4} queries".format(
+                name, handled / elapsed, queries))
+
+    def compare(self, baseline: dict, report: dict, threshold: float) -> int:
+        self.stdout.write(f"\ncompared with {baseline.get('commit') or 'baseline'} "
+                          f"({baseline.get('created', '?')})")
+        regressions = 0
+        for label, result in report["routes"].items():
+            before = baseline.get("routes", {}).get(label)
+            if before is None:
+                continue
+            ratio = result["median"] / before["median"] if before["median"] else 1
+            worse = ratio > 1 + threshold or result["queries"] > before["queries"] \
+                or result["status"] != before["status"]
+            regressions += worse
+            line = "{:<44} median {:>8.2f} -> {:>8.2f} ms ({:+.0%})  queries {:>4} -> {:>4}  status {} -> {}".format(
+                label, before["median"], result["median"], ratio - 1, before["queries"], result["queries"],
+                before["status"], result["status"])
+            self.stdout.write(self.style.ERROR(line) if worse else line)
+        for name, result in report["bot"].items():
+            before = baseline.get("bot", {}).get(name)
+            if before is None:
+                continue
+            ratio = result["updates_per_second"] / before["updates_per_second"]
+            worse = ratio < 1 / (1 + threshold) or result["queries"] > before["queries"]
+            regressions += worse
+            line = "bot {:<40} {:>10,.0f} -> {:>10,.0f} updates/s  queries {:>4} -> {:>4}".format(
+                name, before["updates_per_second"], result["updates_per_second"], before["queries"],
+                result["queries"])
+            self.stdout.write(self.style.ERROR(line) if worse else line)
+        self.stdout.write(f"{regressions} regressions")
+        return regressions
@@ -0,0 +1,34 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from goals.management.commands._bench import seed_boards, timed, format_timing
+from goals.membership import participant_board_ids
+from goals.models import Goal, GoalComment
+
+
+class Command(BaseCommand):
+    help = "compare join-based and board_id-based membership filtering on seeded data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boards", type=int, default=200)
+        parser.add_argument("--participants", type=int, default=20)
+        parser.add_argument("--goals", type=int, default=200_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--keep", action="store_true", help="commit seeded data instead of rolling back")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = seed_boards(options["boards"], options["participants"], categories=3,
+                               goals=options["goals"], comments=options["goals"] // 10)
+            querysets = {
+                "goals (join)": Goal.objects.filter(category__board__participants__user=user),
+                "goals (board_id)": Goal.objects.filter(board_id__in=participant_board_ids(user)),
+                "comments (join)": GoalComment.objects.filter(goal__category__board__participants__user=user),
+                "comments (board_id)": GoalComment.objects.filter(board_id__in=participant_board_ids(user)),
+            }
+            for name, qs in querysets.items():
+                page = qs.order_by("-id")[:100]
+                self.stdout.write(f"== {name}\n{page.explain(analyze=True)}\n")
+                self.stdout.write(format_timing(name, timed(lambda: list(page.all()), options["repeat"])) + "\n\n")
+            if not options["keep"]:
+                transaction.set_rollback(True)
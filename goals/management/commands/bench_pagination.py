@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from goals.management.commands._bench import seed_boards, timed, format_timing
+from goals.membership import participant_board_ids
+from goals.models import Goal
+from goals.pagination import KeysetPagination
+
+
+class Command(BaseCommand):
+    help = "compare limit/offset and keyset page latency at increasing depth on seeded goals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--goals", type=int, default=300_000)
+        parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = SimpleNamespace(keyset_ordering=["priority", "due_date", "id"])
+        limit = options["limit"]
+
+        with transaction.atomic():
+            user = seed_boards(1, 1, categories=5, goals=options["goals"])
+            queryset = Goal.objects.filter(board_id__in=participant_board_ids(user))
+            ordered = queryset.order_by("priority", "due_date", "id")
+
+            for depth in (0, options["goals"] // 10, options["goals"] // 2, options["goals"] - limit):
+                offset_request = Request(factory.get("/", {"limit": limit, "offset": depth}))
+                cursor_params = {"limit": limit}
+                if depth:
+                    paginator = KeysetPagination()
+                    paginator.request = Request(factory.get("/"))
+                    paginator.fields = paginator.get_fields(queryset, view)
+                    link = paginator.encode_cursor(ordered[depth - 1], reverse=False)
+                    cursor_params["cursor"] = parse_qs(urlparse(link).query)["cursor"][0]
+                keyset_request = Request(factory.get("/", cursor_params))
+
+                offset = timed(lambda: LimitOffsetPagination().paginate_queryset(ordered, offset_request),
+                               options["repeat"])
+                keyset = timed(lambda: KeysetPagination().paginate_queryset(queryset, keyset_request, view),
+                               options["repeat"])
+                self.stdout.write(format_timing(f"offset   @ {depth}", offset))
+                self.stdout.write(format_timing(f"keyset   @ {depth}", keyset))
+            transaction.set_rollback(True)
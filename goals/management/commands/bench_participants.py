@@ -0,0 +1,50 @@
+import time
+
+from django.db import connection, transaction
+from django.core.management import BaseCommand
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.management.commands._bench import seed_boards
+from goals.models import Board, BoardParticipant
+from goals.views import BoardView
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = "measure queries and time of sharing a board with large participant lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 300, 1000])
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = BoardView.as_view()
+        with transaction.atomic():
+            owner = seed_boards(1, 1, categories=0, goals=0)
+            board = Board.objects.get(participants__user=owner)
+            users = list(User.objects.bulk_create(
+                [User(username=f"{owner.username}_team_{i}", password="!") for i in range(max(options["sizes"]))]))
+
+            for size in options["sizes"]:
+                team = users[:size]
+                steps = {
+                    "add": [(user, BoardParticipant.Role.writer) for user in team],
+                    "change half": [(user, BoardParticipant.Role.reader if i % 2 else BoardParticipant.Role.writer)
+                                    for i, user in enumerate(team)],
+                    "remove half": [(user, BoardParticipant.Role.writer) for user in team[:size // 2]],
+                    "remove all": [],
+                }
+                for step, participants in steps.items():
+                    data = {"title": board.title,
+                            "participants": [{"user": user.username, "role": role} for user, role in participants]}
+                    request = factory.put(f"/goals/board/{board.id}", data, format="json")
+                    force_authenticate(request, owner)
+                    with CaptureQueriesContext(connection) as ctx:
+                        start = time.perf_counter()
+                        response = view(request, pk=board.id)
+                        response.render()
+                        elapsed = (time.perf_counter() - start) * 1000
+                    self.stdout.write("{:>6} participants  {:<12} {:>4} queries {:>9.2f} ms  status {}".format(
+                        size, step, len(ctx), elapsed, response.status_code))
+            transaction.set_rollback(True)
@@ -0,0 +1,39 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from goals.management.commands._bench import seed_boards, timed, format_timing
+from goals.membership import participant_board_ids
+from goals.models import Goal
+from goals.search import GoalSearchFilter
+
+
+class Command(BaseCommand):
+    help = "compare ILIKE and full-text goal search over seeded goals"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--goals", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--terms", nargs="+", default=["молоко", "презентац", "отпуск билеты"])
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            user = seed_boards(10, 5, categories=5, goals=options["goals"])
+            queryset = Goal.objects.filter(board_id__in=participant_board_ids(user)).order_by("priority", "due_date")
+
+            for term in options["terms"]:
+                icontains = Q()
+                for word in term.split():
+                    icontains &= Q(title__icontains=word) | Q(description__icontains=word)
+                ilike = queryset.filter(icontains)[:50]
+                request = Request(factory.get("/", {"search": term}))
+                fts = GoalSearchFilter().filter_queryset(request, queryset, view=None)[:50]
+
+                self.stdout.write(format_timing(f"ilike  '{term}'", timed(lambda: list(ilike.all()),
+                                                                           options["repeat"])))
+                self.stdout.write(format_timing(f"fts    '{term}'", timed(lambda: list(fts.all()),
+                                                                           options["repeat"])))
+            transaction.set_rollback(True)
@@ -0,0 +1,71 @@
+import datetime
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import User
+from goals.filters import GoalDateFilter
+from goals.management.commands._bench import seed_boards
+from goals.membership import participant_board_ids
+from goals.models import Goal, BoardParticipant
+
+INDEX_RE = re.compile(r"(?:Index|Index Only|Bitmap Index) Scan(?: Backward)? (?:using|on) (\w+)")
+
+
+class Command(BaseCommand):
+    help = "run EXPLAIN ANALYZE for the common goal/list filter combinations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="participant whose goal list is explained")
+        parser.add_argument("--seed", type=int, default=0,
+                            help="seed this many goals in a rolled-back transaction first")
+        parser.add_argument("--verbose-plans", action="store_true", help="print full plans")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.get_user(options)
+            for name, data in self.get_combinations(user).items():
+                queryset = GoalDateFilter(data=data, queryset=Goal.objects.filter(
+                    board_id__in=participant_board_ids(user))).qs
+                plan = queryset.order_by("priority", "due_date")[:50].explain(analyze=True)
+                indexes = sorted(set(INDEX_RE.findall(plan)))
+                time = re.search(r"Execution Time: ([\d.]+) ms", plan).group(1)
+                self.stdout.write(f"{name:<32} {time:>9} ms  {', '.join(indexes) or 'seq scan'}")
+                if options["verbose_plans"]:
+                    self.stdout.write(plan + "\n")
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def get_user(options) -> User:
+        if options["seed"]:
+            seed_boards(80, 5, categories=5, goals=options["seed"] * 4 // 5)
+            return seed_boards(20, 5, categories=5, goals=options["seed"] // 5)
+        if options["username"]:
+            try:
+                return User.objects.get(username=options["username"])
+            except User.DoesNotExist:
+                raise CommandError(f"user {options['username']} not found")
+        participant = BoardParticipant.objects.order_by("-board__goals__id").first()
+        if participant is None:
+            raise CommandError("no boards found, pass --seed to generate data")
+        return participant.user
+
+    @staticmethod
+    def get_combinations(user) -> dict[str, dict]:
+        board = BoardParticipant.objects.filter(user=user).values_list("board_id", flat=True).first()
+        categories = list(Goal.objects.filter(board_id=board).values_list("category_id", flat=True).distinct()[:2])
+        today = datetime.date.today()
+        return {
+            "default": {},
+            "board": {"category__board": board},
+            "category__in": {"category__in": ",".join(map(str, categories))},
+            "status__in": {"status__in": "1,2"},
+            "priority__in": {"priority__in": "3,4"},
+            "due_date range": {"due_date__gte": today.isoformat(),
+                               "due_date__lte": (today + datetime.timedelta(days=30)).isoformat()},
+            "board + status + due_date": {"category__board": board, "status__in": "1,2",
+                                          "due_date__lte": (today + datetime.timedelta(days=30)).isoformat()},
+            "category + status + priority": {"category": categories[0] if categories else 0,
+                                             "status": 1, "priority__in": "3,4"},
+        }
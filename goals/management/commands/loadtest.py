@@ -0,0 +1,69 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import BaseCommand
+
+from core.models import User
+from goals.management.commands._bench import summarize
+
+DEFAULT_PATHS = ["/goals/goal/list?limit=50", "/goals/board/list?limit=50", "/goals/goal_comment/list?limit=50"]
+
+
+def session_cookie(user: User) -> str:
+    """Session key logged in as ``user``, the way django.contrib.auth.login() stores it."""
+    session = SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+class Command(BaseCommand):
+    help = "load a running server with concurrent requests and report requests per second and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--username", required=True, help="requests are sent logged in as this user")
+        parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--seconds", type=float, default=10)
+        parser.add_argument("--warmup", type=float, default=1)
+
+    def handle(self, *args, **options):
+        cookies = {settings.SESSION_COOKIE_NAME: session_cookie(User.objects.get(username=options["username"]))}
+        self.stdout.write(f"{options['url']}  concurrency {options['concurrency']}  {options['seconds']}s per path")
+        for path in options["paths"]:
+            latencies, statuses, elapsed = asyncio.run(self.load(path, cookies, options))
+            errors = sum(count for status, count in statuses.items() if not isinstance(status, int) or status >= 400)
+            timing = summarize(latencies) if latencies else {"median": 0, "p95": 0, "max": 0}
+            self.stdout.write("{:<40} {:>8.1f} req/s  median {:>8.2f}  p95 {:>8.2f}  max {:>8.2f} ms  "
+                              "errors {}  {}".format(path, len(latencies) / elapsed, timing["median"], timing["p95"],
+                                                     timing["max"], errors, dict(statuses)))
+
+    async def load(self, path: str, cookies: dict, options: dict) -> tuple[list[float], Counter, float]:
+        latencies, statuses = [], Counter()
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        async with httpx.AsyncClient(base_url=options["url"], cookies=cookies, limits=limits, timeout=60) as client:
+            async def worker(deadline: float, record: bool):
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        status = (await client.get(path)).status_code
+                    except httpx.HTTPError as e:
+                        status = type(e).__name__
+                    if record:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        statuses[status] += 1
+
+            warmup = time.perf_counter() + options["warmup"]
+            await asyncio.gather(*(worker(warmup, False) for _ in range(options["concurrency"])))
+            start = time.perf_counter()
+            deadline = start + options["seconds"]
+            await asyncio.gather(*(worker(deadline, True) for _ in range(options["concurrency"])))
+        return latencies, statuses, time.perf_counter() - start
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from goals.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "delete sync tombstones older than SYNC_TOMBSTONE_DAYS, meant to run periodically (e.g. from cron daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        expired = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        purged = 0
+        while True:
+            ids = list(Tombstone.objects.filter(updated__lt=expired).values_list("id", flat=True)
+                       [:options["batch_size"]])
+            if not ids:
+                break
+            purged += Tombstone.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(f"purged {purged} tombstones")
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from goals.stats import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "recount BoardGoalCounter rows from goals, to repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--board", type=int, action="append", dest="boards", help="only this board, repeatable")
+
+    def handle(self, *args, **options):
+        rows = rebuild_counters(options["boards"])
+        self.stdout.write(f"rebuilt {rows} goal counters")
@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from goals.jobs import run_archive_job
+from goals.models import ArchiveJob
+
+
+class Command(BaseCommand):
+    help = "run pending archive jobs, and resume running ones abandoned by a stopped process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-after", type=int, default=10, help="minutes without progress")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=int, default=None,
+                            help="keep running, looking for jobs every this many seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_jobs(options["stale_after"], options["batch_size"])
+            if options["interval"] is None:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    def run_jobs(self, stale_after: int, batch_size: int | None):
+        stale = timezone.now() - timedelta(minutes=stale_after)
+        ArchiveJob.objects.filter(status=ArchiveJob.Status.running, updated__lt=stale).update(
+            status=ArchiveJob.Status.pending)
+        job_ids = list(ArchiveJob.objects.filter(status=ArchiveJob.Status.pending).order_by("id")
+                       .values_list("id", flat=True))
+        for job_id in job_ids:
+            run_archive_job(job_id, batch_size=batch_size)
+        self.stdout.write(f"ran {len(job_ids)} archive jobs")
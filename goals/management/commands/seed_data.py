@@ -0,0 +1,32 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from goals.management.commands._bench import seed_dataset
+
+
+class Command(BaseCommand):
+    help = "bulk-create a reproducible large dataset for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--boards", type=int, default=2_000)
+        parser.add_argument("--participants", type=int, default=20, help="members per board")
+        parser.add_argument("--categories", type=int, default=5, help="categories per board")
+        parser.add_argument("--goals", type=int, default=1_000_000)
+        parser.add_argument("--comments", type=int, default=2_000_000)
+        parser.add_argument("--member-boards", type=int, default=20, help="boards of the returned bench user")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            dataset = seed_dataset(options["users"], options["boards"], options["participants"],
+                                   options["categories"], options["goals"], options["comments"],
+                                   member_boards=options["member_boards"], seed=options["seed"],
+                                   log=self.stdout.write)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"seeded {dataset.goals} goals and {dataset.comments} comments in {elapsed:.1f}s, "
+            f"bench user {dataset.user.username}"))
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from goals.models import Board, BoardParticipant
+
+WRITE_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+
+def participant_board_ids(user) -> QuerySet:
+    """Subquery of board ids the user participates in.
+
+    Used as a single ``board_id IN (...)`` predicate over the denormalized
+    ``board`` columns instead of joining through categories and participants.
+    """
+    return BoardParticipant.objects.filter(user=user).values("board_id")
+
+
+class BoardRoles:
+    def __init__(self, roles: dict[int, int]):
+        self._roles = roles
+
+    @property
+    def board_ids(self) -> list[int]:
+        return list(self._roles)
+
+    def role(self, board_id) -> int | None:
+        return self._roles.get(board_id)
+
+    def is_participant(self, board_id) -> bool:
+        return board_id in self._roles
+
+    def is_owner(self, board_id) -> bool:
+        return self._roles.get(board_id) == BoardParticipant.Role.owner
+
+    def can_write(self, board_id) -> bool:
+        return self._roles.get(board_id) in WRITE_ROLES
+
+
+def _cache_key(user_id) -> str:
+    return f"board_roles:{user_id}"
+
+
+def load_board_roles(user) -> BoardRoles:
+    if not user.is_authenticated:
+        return BoardRoles({})
+    timeout = settings.BOARD_ROLES_CACHE_TIMEOUT
+    roles = cache.get(_cache_key(user.pk)) if timeout else None
+    if roles is None:
+        roles = dict(BoardParticipant.objects.filter(user=user).values_list("board_id", "role"))
+        if timeout:
+            cache.set(_cache_key(user.pk), roles, timeout)
+    return BoardRoles(roles)
+
+
+def get_board_roles(request) -> BoardRoles:
+    """Board roles of ``request.user``, loaded at most once per request."""
+    http_request = getattr(request, "_request", request)
+    roles = getattr(http_request, "_board_roles", None)
+    if roles is None:
+        roles = load_board_roles(request.user)
+        http_request._board_roles = roles
+    return roles
+
+
+def get_board_versions(request) -> dict[int, int]:
+    """``Board.version`` of every board of ``request.user``, read at most once per request."""
+    http_request = getattr(request, "_request", request)
+    versions = getattr(http_request, "_board_versions", None)
+    if versions is None:
+        versions = dict(Board.objects.filter(id__in=get_board_roles(request).board_ids).values_list("id", "version"))
+        http_request._board_versions = versions
+    return versions
+
+
+def invalidate_board_roles(*user_ids):
+    if settings.BOARD_ROLES_CACHE_TIMEOUT:
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
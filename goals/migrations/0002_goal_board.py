@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 16:59
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_board(apps, schema_editor):
+    GoalCategory = apps.get_model('goals', 'GoalCategory')
+    Goal = apps.get_model('goals', 'Goal')
+    GoalComment = apps.get_model('goals', 'GoalComment')
+    Goal.objects.update(board_id=Subquery(
+        GoalCategory.objects.filter(pk=OuterRef('category_id')).values('board_id')[:1]))
+    GoalComment.objects.update(board_id=Subquery(
+        Goal.objects.filter(pk=OuterRef('goal_id')).values('board_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goal_comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunPython(fill_board, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.russian', coalesce({row}.title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.russian', coalesce({row}.description, '')), 'B')"
+)
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION goals_goal_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR.format(row='NEW')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON goals_goal
+    FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS goals_goal_search_vector ON goals_goal;
+DROP FUNCTION IF EXISTS goals_goal_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0003_goal_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # existing rows are filled by 0012 in batches, the index is built concurrently by 0013
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
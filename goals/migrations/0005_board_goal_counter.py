@@ -0,0 +1,42 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:34
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    BoardGoalCounter = apps.get_model('goals', 'BoardGoalCounter')
+    rows = (Goal.objects.filter(board_id__isnull=False).values('board_id', 'status', 'priority')
+            .annotate(count=Count('id')).order_by())
+    BoardGoalCounter.objects.bulk_create([BoardGoalCounter(**row) for row in rows.iterator()], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0004_goal_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardGoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_counters', to='goals.board', verbose_name='Доска')),
+            ],
+            options={
+                'verbose_name': 'Счётчик целей',
+                'verbose_name_plural': 'Счётчики целей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='boardgoalcounter',
+            constraint=models.UniqueConstraint(fields=('board', 'status', 'priority'), name='board_goal_counter_unique'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
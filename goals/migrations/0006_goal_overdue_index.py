@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:35
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0005_board_goal_counter'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), ('status__in', [1, 2])), fields=['board', 'due_date'], name='goal_board_overdue_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.1 on 2026-10-18 17:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0006_goal_overdue_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает'), (2, 'Выполняется'), (3, 'Завершено'), (4, 'Ошибка')], default=1, verbose_name='Статус')),
+                ('total', models.IntegerField(default=0, verbose_name='Всего целей')),
+                ('processed', models.IntegerField(default=0, verbose_name='Архивировано целей')),
+                ('error', models.TextField(blank=True, default=None, null=True, verbose_name='Ошибка')),
+                ('finished', models.DateTimeField(blank=True, default=None, null=True, verbose_name='Дата завершения')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archive_jobs', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archive_jobs', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Архивация',
+                'verbose_name_plural': 'Архивации',
+                'indexes': [models.Index(condition=models.Q(('status__in', [1, 2])), fields=['status', 'updated'], name='archive_job_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+from django.db import migrations, models
+
+# Tables whose rows carry a board_id shown in the goal, category, comment and board lists
+BOARD_TABLES = ["goals_goal", "goals_goalcategory", "goals_goalcomment", "goals_boardparticipant"]
+
+CREATE_TRIGGERS = """
+CREATE FUNCTION goals_board_version_bump(board_ids bigint[]) RETURNS void AS $$
+BEGIN
+    -- lock in id order, so statements touching several boards can't deadlock each other
+    PERFORM 1 FROM goals_board WHERE id = ANY(board_ids) ORDER BY id FOR UPDATE;
+    UPDATE goals_board SET version = version + 1 WHERE id = ANY(board_ids);
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_board_version_rows() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM goals_board_version_bump(ARRAY(SELECT DISTINCT board_id FROM new_rows WHERE board_id IS NOT NULL));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM goals_board_version_bump(ARRAY(SELECT DISTINCT board_id FROM old_rows WHERE board_id IS NOT NULL));
+    ELSE
+        PERFORM goals_board_version_bump(ARRAY(
+            SELECT board_id FROM new_rows WHERE board_id IS NOT NULL
+            UNION SELECT board_id FROM old_rows WHERE board_id IS NOT NULL));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- any other update of a board raises its version too, and a stale version saved by the ORM can't lower it
+CREATE FUNCTION goals_board_version_row() RETURNS trigger AS $$
+BEGIN
+    IF NEW.version <= OLD.version THEN
+        NEW.version := OLD.version + 1;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_board_version BEFORE UPDATE ON goals_board
+    FOR EACH ROW EXECUTE FUNCTION goals_board_version_row();
+
+-- authors are nested into goals, categories and comments
+CREATE FUNCTION goals_board_version_user() RETURNS trigger AS $$
+BEGIN
+    PERFORM goals_board_version_bump(ARRAY(
+        SELECT board_id FROM goals_boardparticipant WHERE user_id = NEW.id
+        UNION SELECT board_id FROM goals_goalcategory WHERE user_id = NEW.id AND board_id IS NOT NULL
+        UNION SELECT board_id FROM goals_goal WHERE user_id = NEW.id AND board_id IS NOT NULL
+        UNION SELECT board_id FROM goals_goalcomment WHERE user_id = NEW.id AND board_id IS NOT NULL));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_board_version_user AFTER UPDATE ON core_user FOR EACH ROW
+    WHEN (OLD.username IS DISTINCT FROM NEW.username OR OLD.first_name IS DISTINCT FROM NEW.first_name
+          OR OLD.last_name IS DISTINCT FROM NEW.last_name OR OLD.email IS DISTINCT FROM NEW.email)
+    EXECUTE FUNCTION goals_board_version_user();
+""" + "".join(f"""
+CREATE TRIGGER {table}_board_version_insert AFTER INSERT ON {table}
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION goals_board_version_rows();
+CREATE TRIGGER {table}_board_version_update AFTER UPDATE ON {table}
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION goals_board_version_rows();
+CREATE TRIGGER {table}_board_version_delete AFTER DELETE ON {table}
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION goals_board_version_rows();
+""" for table in BOARD_TABLES)
+
+DROP_TRIGGERS = "".join(f"""
+DROP TRIGGER IF EXISTS {table}_board_version_insert ON {table};
+DROP TRIGGER IF EXISTS {table}_board_version_update ON {table};
+DROP TRIGGER IF EXISTS {table}_board_version_delete ON {table};
+""" for table in BOARD_TABLES) + """
+DROP TRIGGER IF EXISTS goals_board_version_user ON core_user;
+DROP TRIGGER IF EXISTS goals_board_version ON goals_board;
+DROP FUNCTION IF EXISTS goals_board_version_user();
+DROP FUNCTION IF EXISTS goals_board_version_row();
+DROP FUNCTION IF EXISTS goals_board_version_rows();
+DROP FUNCTION IF EXISTS goals_board_version_bump(bigint[]);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('goals', '0007_archive_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1, editable=False, verbose_name='Версия'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
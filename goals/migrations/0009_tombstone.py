@@ -0,0 +1,30 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0008_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Комментарий')], verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор')),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата удаления')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='goals.board', verbose_name='Доска')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+                'indexes': [models.Index(fields=['board', 'updated', 'id'], name='tombstone_board_sync_idx')],
+            },
+        ),
+    ]
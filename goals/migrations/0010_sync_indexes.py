@@ -0,0 +1,27 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:17
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0009_tombstone'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goal_board_sync_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'updated', 'id'], name='category_board_sync_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', 'updated', 'id'], name='comment_board_sync_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tombstone',
+            name='kind',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Комментарий'), (2, 'Категория'), (3, 'Цель')], verbose_name='Тип'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['updated'], name='tombstone_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:05
+
+from django.db import migrations
+from django.db.models import Max
+
+BATCH_SIZE = 5000
+
+
+def backfill_search_vector(apps, schema_editor):
+    # each batch commits on its own, so only BATCH_SIZE rows are locked at a time;
+    # setting the column fires the goals_goal_search_vector trigger, which computes it
+    Goal = apps.get_model('goals', 'Goal')
+    last_id = Goal.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    with schema_editor.connection.cursor() as cursor:
+        for start in range(0, last_id, BATCH_SIZE):
+            cursor.execute(
+                'UPDATE goals_goal SET search_vector = NULL '
+                'WHERE id > %s AND id <= %s AND search_vector IS NULL',
+                [start, start + BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0011_tombstone_kinds'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.utils import timezone
 
 from core.models import User
@@ -24,12 +26,35 @@ class GoalCategory(DatesModelMixin):
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the board the category was on, delta sync buries its rows there when it moves
+        instance._loaded_board_id = instance.__dict__.get("board_id")
+        return instance
+
     def __str__(self):
         return '{}'.format(self.title)
 
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=["board", "title"], condition=models.Q(is_deleted=False),
+                         name="category_active_board_idx"),
+            models.Index(fields=["board", "updated", "id"], name="category_board_sync_idx"),
+        ]
+
+
+class GoalManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+    def locked_stats_keys(self, ids) -> dict[int, tuple[int, int, int]]:
+        """Stored (board, status, priority) of the goals, the rows stay locked until the transaction ends."""
+        rows = self.filter(id__in=ids).order_by("id").select_for_update() \
+            .values_list("id", "board_id", "status", "priority")
+        return {goal_id: (board_id, status, priority) for goal_id, board_id, status, priority in rows}
 
 
 class Goal(DatesModelMixin):
@@ -53,6 +78,39 @@ class Goal(DatesModelMixin):
     title = models.CharField(verbose_name="Заголовок цели", max_length=255)
     description = models.TextField(verbose_name="Описание", null=True, blank=True, default=None)
     due_date = models.DateField(verbose_name="Дата выполнения", null=True, blank=True, default=None)
+    board = models.ForeignKey("Board", verbose_name="Доска", related_name="goals", on_delete=models.PROTECT,
+                              null=True, blank=True, editable=False)
+    # filled by the goals_goal_search_vector trigger, see migration 0004
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = GoalManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_key = instance.stats_key()
+        return instance
+
+    def stats_key(self, stored: tuple[int, int, int] | None = None) -> tuple[int, int, int] | None:
+        """(board, status, priority) the goal is counted under in BoardGoalCounter, None when not loaded.
+
+        Fields that aren't loaded keep their ``stored`` value, a save doesn't write them.
+        """
+        values = self.__dict__
+        if stored is not None:
+            return tuple(values.get(name, value) for name, value in zip(("board_id", "status", "priority"), stored))
+        if "board_id" not in values or "status" not in values or "priority" not in values:
+            return None
+        return values["board_id"], values["status"], values["priority"]
+
+    def save(self, *args, **kwargs):
+        if self.category_id:
+            self.board_id = self.category.board_id
+        with transaction.atomic(using=kwargs.get("using")):
+            if not self._state.adding and self.pk is not None:
+                # the counters move from the stored row, the values loaded earlier may be stale by now
+                self._stats_key = Goal.objects.locked_stats_keys([self.pk]).get(self.pk)
+            return super().save(*args, **kwargs)
 
     def __str__(self):
         return '{}'.format(self.title)
@@ -60,12 +118,29 @@ class Goal(DatesModelMixin):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["category", "status", "priority", "due_date"], name="goal_category_filter_idx"),
+            models.Index(fields=["board", "priority", "due_date", "id"], name="goal_board_ordering_idx"),
+            models.Index(fields=["board", "status", "due_date"], name="goal_board_status_idx"),
+            models.Index(fields=["board", "due_date"], name="goal_board_overdue_idx",
+                         # to_do and in_progress goals, the ones that can be overdue
+                         condition=models.Q(status__in=[1, 2], due_date__isnull=False)),
+            GinIndex(fields=["search_vector"], name="goal_search_vector_idx"),
+            models.Index(fields=["board", "updated", "id"], name="goal_board_sync_idx"),
+        ]
 
 
 class GoalComment(DatesModelMixin):
     goal = models.ForeignKey(Goal, verbose_name="Цель", related_name="goal_comments", on_delete=models.PROTECT)
     user = models.ForeignKey(User, verbose_name="Автор ", related_name="goal_comments", on_delete=models.PROTECT)
     text = models.TextField(verbose_name="Текст")
+    board = models.ForeignKey("Board", verbose_name="Доска", related_name="goal_comments", on_delete=models.PROTECT,
+                              null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        if self.goal_id:
+            self.board_id = self.goal.board_id
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return '{}: {}'.format(self.user, self.goal)
@@ -73,11 +148,18 @@ class GoalComment(DatesModelMixin):
     class Meta:
         verbose_name = "Комментарий к цели"
         verbose_name_plural = "Комментарии к целям"
+        indexes = [
+            models.Index(fields=["goal", "-id"], name="comment_goal_idx"),
+            models.Index(fields=["board", "-id"], name="comment_board_idx"),
+            models.Index(fields=["board", "updated", "id"], name="comment_board_sync_idx"),
+        ]
 
 
 class Board(DatesModelMixin):
     title = models.CharField(verbose_name="Название", max_length=255, blank=True, null=True)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
+    # raised by database triggers on every write to the board, its goals, categories, comments and participants
+    version = models.PositiveBigIntegerField(verbose_name="Версия", default=1, editable=False)
 
     def __str__(self):
         return '{}'.format(self.title)
@@ -85,6 +167,9 @@ class Board(DatesModelMixin):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["title"], condition=models.Q(is_deleted=False), name="board_active_title_idx"),
+        ]
 
 
 class BoardParticipant(DatesModelMixin):
@@ -107,3 +192,70 @@ class BoardParticipant(DatesModelMixin):
         unique_together = ("board", "user")
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
+        indexes = [
+            models.Index(fields=["user", "board", "role"], name="participant_user_role_idx"),
+        ]
+
+
+class BoardGoalCounter(models.Model):
+    """Number of goals per board, status and priority, kept up to date by goals.stats."""
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, related_name="goal_counters")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Goal.Status.choices)
+    priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Goal.Priority.choices)
+    count = models.IntegerField(verbose_name="Количество", default=0)
+
+    class Meta:
+        verbose_name = "Счётчик целей"
+        verbose_name_plural = "Счётчики целей"
+        constraints = [
+            models.UniqueConstraint(fields=["board", "status", "priority"], name="board_goal_counter_unique"),
+        ]
+
+
+class ArchiveJob(DatesModelMixin):
+    """Background archival of the goals of a deleted board or category, see goals.jobs."""
+    class Status(models.IntegerChoices):
+        pending = 1, "Ожидает"
+        running = 2, "Выполняется"
+        done = 3, "Завершено"
+        failed = 4, "Ошибка"
+
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="archive_jobs")
+    category = models.ForeignKey(GoalCategory, verbose_name="Категория", on_delete=models.PROTECT,
+                                 related_name="archive_jobs", null=True, blank=True, default=None)
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Status.choices, default=Status.pending)
+    total = models.IntegerField(verbose_name="Всего целей", default=0)
+    processed = models.IntegerField(verbose_name="Архивировано целей", default=0)
+    error = models.TextField(verbose_name="Ошибка", null=True, blank=True, default=None)
+    finished = models.DateTimeField(verbose_name="Дата завершения", null=True, blank=True, default=None)
+
+    class Meta:
+        verbose_name = "Архивация"
+        verbose_name_plural = "Архивации"
+        indexes = [
+            # pending and running jobs
+            models.Index(fields=["status", "updated"], name="archive_job_status_idx",
+                         condition=models.Q(status__in=[1, 2])),
+        ]
+
+
+class Tombstone(models.Model):
+    """Hard-deleted row of a board, or a row moved to another board, reported by delta sync, see goals.sync."""
+    class Kind(models.IntegerChoices):
+        comment = 1, "Комментарий"
+        category = 2, "Категория"
+        goal = 3, "Цель"
+
+    kind = models.PositiveSmallIntegerField(verbose_name="Тип", choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="Идентификатор")
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.CASCADE, related_name="tombstones")
+    updated = models.DateTimeField(verbose_name="Дата удаления", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Удалённый объект"
+        verbose_name_plural = "Удалённые объекты"
+        indexes = [
+            models.Index(fields=["board", "updated", "id"], name="tombstone_board_sync_idx"),
+            # purge_tombstones
+            models.Index(fields=["updated"], name="tombstone_updated_idx"),
+        ]
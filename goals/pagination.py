@@ -0,0 +1,184 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over ``view.keyset_ordering`` that never counts rows.
+
+    The last ordering field must be unique. Nullable fields are ordered with
+    NULLs last, the same way Postgres orders them by default. Pages always
+    follow ``keyset_ordering``, so ``?ordering=`` is rejected.
+    """
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 1000
+    invalid_cursor_message = "Invalid cursor"
+    ordering_message = "Сортировка недоступна при выводе по курсору"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([obj async for obj in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view):
+        self.request = request
+        if api_settings.ORDERING_PARAM in request.query_params:
+            raise ValidationError({api_settings.ORDERING_PARAM: [self.ordering_message]})
+        self.limit = self.get_limit(request)
+        self.fields = self.get_fields(queryset, view)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        queryset = queryset.order_by(*self.get_order_by(self.reverse))
+        if self.position is not None:
+            queryset = queryset.filter(self.after(self.position, self.reverse))
+        return queryset[:self.limit + 1]
+
+    def set_page(self, results: list) -> list:
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if self.reverse:
+            results.reverse()
+
+        self.has_next = has_more if not self.reverse else True
+        self.has_previous = has_more if self.reverse else self.position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    @staticmethod
+    def get_fields(queryset, view) -> list[tuple[str, bool, bool]]:
+        fields = []
+        for name in view.keyset_ordering:
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            fields.append((name, descending, queryset.model._meta.get_field(name).null))
+        return fields
+
+    def get_order_by(self, reverse: bool) -> list:
+        order_by = []
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        for name, descending, _ in self.fields:
+            order_by.append(F(name).desc(**nulls) if descending != reverse else F(name).asc(**nulls))
+        return order_by
+
+    def after(self, position: list, reverse: bool) -> Q:
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.fields, position):
+            condition |= equal & self.strictly_after(name, descending != reverse, reverse, nullable, value)
+            equal &= Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def strictly_after(name: str, descending: bool, nulls_first: bool, nullable: bool, value) -> Q:
+        if value is None:
+            return Q(**{f"{name}__isnull": False}) if nulls_first else Q(pk__in=[])
+        condition = Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+        if nullable and not nulls_first:
+            condition |= Q(**{f"{name}__isnull": True})
+        return condition
+
+    def decode_cursor(self, request, model) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], bool(cursor.get("r"))
+            if not isinstance(position, list) or len(position) != len(self.fields):
+                raise ValueError("wrong position length")
+            position = [None if value is None else model._meta.get_field(name).to_python(value)
+                        for (name, _, _), value in zip(self.fields, position)]
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeEncodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        position = []
+        for name, _, _ in self.fields:
+            value = getattr(obj, name)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        cursor = {"p": position, "r": 1} if reverse else {"p": position}
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode("ascii"))
+        url = remove_query_param(self.request.build_absolute_uri(), "offset")
+        return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # LimitOffsetPagination.paginate_queryset() with the async ORM
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset:self.offset + self.limit]]
+
+
+class LimitOffsetOrKeysetPagination(AsyncLimitOffsetPagination):
+    """Limit/offset by default, keyset pages on ``?pagination=cursor`` or ``?cursor=``."""
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def use_keyset(self, request) -> bool:
+        self.keyset = None
+        if request.query_params.get(self.mode_query_param) == "cursor" or \
+                self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+        return self.keyset is not None
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
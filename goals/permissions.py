@@ -1,6 +1,6 @@
 from rest_framework import permissions
 
-from goals.models import BoardParticipant
+from goals.membership import get_board_roles
 
 
 class BoardPermissions(permissions.BasePermission):
@@ -8,9 +8,8 @@ class BoardPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj, role=BoardParticipant.Role.owner).exists()
+            return get_board_roles(request).is_participant(obj.id)
+        return get_board_roles(request).is_owner(obj.id)
 
 
 class GoalCategoryPermissions(permissions.BasePermission):
@@ -18,11 +17,8 @@ class GoalCategoryPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).is_participant(obj.board_id)
+        return get_board_roles(request).can_write(obj.board_id)
 
 
 class GoalPermissions(permissions.BasePermission):
@@ -30,11 +26,8 @@ class GoalPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user=request.user, board=obj.category.board).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj.category.board,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-        ).exists()
+            return get_board_roles(request).is_participant(obj.board_id)
+        return get_board_roles(request).can_write(obj.board_id)
 
 
 class CommentPermissions(permissions.BasePermission):
@@ -43,4 +36,4 @@ class CommentPermissions(permissions.BasePermission):
             return False
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.user == request.user
+        return obj.user_id == request.user.id
@@ -0,0 +1,34 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework import filters
+
+WORD_RE = re.compile(r"\w+")
+
+
+class GoalSearchFilter(filters.SearchFilter):
+    """Full-text ``search`` over ``Goal.search_vector`` ranked by relevance.
+
+    Each word is matched as a prefix so results follow the user while typing.
+    Must run after ``OrderingFilter``: without an explicit ``ordering`` the
+    rank becomes the leading sort key.
+    """
+    search_config = "russian"
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if query is None:
+            return queryset
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query))
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by("-search_rank", *queryset.query.order_by)
+        return queryset
+
+    def get_search_query(self, request) -> SearchQuery | None:
+        words = [word for term in self.get_search_terms(request) for word in WORD_RE.findall(term)]
+        if not words:
+            return None
+        return SearchQuery(" & ".join(f"{word}:*" for word in words), config=self.search_config,
+                           search_type="raw")
@@ -1,9 +1,13 @@
-from django.db import transaction
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from core.models import User
 from core.serializers import UserSerializer
-from goals.models import GoalCategory, GoalComment, Goal, Board, BoardParticipant
+from goals.events import publish_changes
+from goals.membership import get_board_roles, invalidate_board_roles
+from goals.models import GoalCategory, GoalComment, Goal, Board, BoardParticipant, ArchiveJob
+from goals.stats import goals_changed, goals_created
 
 
 class GoalCreateSerializer(serializers.ModelSerializer):
@@ -12,18 +16,14 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ("board", "search_vector")
         read_only_fields = ["id", "created", "updated", "user"]
 
     def validate_category(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_write(value.board_id):
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
@@ -33,18 +33,164 @@ class GoalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ("board", "search_vector")
         read_only_fields = ("id", "created", "updated", "user")
 
     def validate_category(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленной категории")
 
-        if self.instance.category.board_id != value.board_id:
+        if self.instance.board_id != value.board_id:
             raise serializers.ValidationError("Вы не создавали эту категорию")
         return value
 
 
+GOAL_BATCH_MAX_SIZE = 500
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves the pk from ``context[preload_key]`` filled by a bulk list serializer."""
+
+    def __init__(self, preload_key: str, **kwargs):
+        self.preload_key = preload_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get(self.preload_key)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            obj = preloaded.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Resolves the slug from ``context[preload_key]`` filled by a list serializer."""
+
+    def __init__(self, preload_key: str, **kwargs):
+        self.preload_key = preload_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get(self.preload_key)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
+            self.fail("invalid")
+        obj = preloaded.get(data)
+        if obj is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+        return obj
+
+
+def preload_ids(data, key: str) -> set[int]:
+    return {int(value) for value in preload_values(data, key) if str(value).lstrip("-").isdigit()}
+
+
+def preload_values(data, key: str) -> set:
+    values = set()
+    for item in data if isinstance(data, list) else []:
+        try:
+            value = item[key]
+        except (KeyError, TypeError):
+            continue
+        if isinstance(value, (str, int)):
+            values.add(value)
+    return values
+
+
+class GoalBulkCreateListSerializer(serializers.ListSerializer):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", GOAL_BATCH_MAX_SIZE)
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        self.context["categories"] = GoalCategory.objects.in_bulk(preload_ids(data, "category"))
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        now = timezone.now()
+        goals = Goal.objects.bulk_create([
+            Goal(**item, board_id=item["category"].board_id, created=now, updated=now) for item in validated_data
+        ])
+        goals_created(goals)
+        publish_changes("goal", "created", [(goal.board_id, goal.id) for goal in goals])
+        return goals
+
+
+class GoalBulkCreateSerializer(GoalCreateSerializer):
+    category = PreloadedPrimaryKeyRelatedField("categories", queryset=GoalCategory.objects.all())
+
+    class Meta(GoalCreateSerializer.Meta):
+        list_serializer_class = GoalBulkCreateListSerializer
+
+
+class GoalBulkUpdateListSerializer(serializers.ListSerializer):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", GOAL_BATCH_MAX_SIZE)
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        self.context["goals"] = Goal.objects.select_related("user").in_bulk(preload_ids(data, "id"))
+        return super().to_internal_value(data)
+
+    def update(self, instance, validated_data):
+        now = timezone.now()
+        fields = {"updated"}
+        goals = []
+        for item in validated_data:
+            goal = item.pop("id")
+            for field, value in item.items():
+                setattr(goal, field, value)
+                fields.add(field)
+            goal.updated = now
+            goals.append(goal)
+        with transaction.atomic():
+            stored = Goal.objects.locked_stats_keys([goal.id for goal in goals])
+            for goal in goals:
+                goal._stats_key = stored.get(goal.id)
+            Goal.objects.bulk_update(goals, fields=sorted(fields))
+            goals_changed(goals)
+        publish_changes("goal", "updated", [(goal.board_id, goal.id) for goal in goals])
+        return goals
+
+
+class GoalBulkUpdateSerializer(serializers.Serializer):
+    id = PreloadedPrimaryKeyRelatedField("goals", queryset=Goal.objects.all())
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateField(required=False, allow_null=True)
+
+    class Meta:
+        list_serializer_class = GoalBulkUpdateListSerializer
+
+    def validate_id(self, value):
+        if not get_board_roles(self.context["request"]).can_write(value.board_id):
+            raise serializers.ValidationError("Вы должны быть владельцем или редактором")
+        return value
+
+
+class GoalBulkArchiveSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=GOAL_BATCH_MAX_SIZE)
+
+    def validate_ids(self, value):
+        roles = get_board_roles(self.context["request"])
+        boards = dict(Goal.objects.filter(id__in=value).values_list("id", "board_id"))
+        errors = {
+            index: ["Вы должны быть владельцем или редактором"]
+            for index, goal_id in enumerate(value) if not roles.can_write(boards.get(goal_id))
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+
+
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
@@ -56,12 +202,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
     def validate_board(self, value):
         if value.is_deleted:
             raise serializers.ValidationError("Не разрешено в удаленном объекте")
-        allow = BoardParticipant.objects.filter(
-            board=value,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-            user=self.context["request"].user,
-        ).exists()
-        if not allow:
+        if not get_board_roles(self.context["request"]).can_write(value.id):
             raise serializers.ValidationError("Вы должны быть владельцем или редактором")
         return value
 
@@ -80,15 +221,11 @@ class CommentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ("board",)
         read_only_fields = ("id", "created", "updated", "user")
 
     def validate_goal(self, value):
-        if not BoardParticipant.objects.filter(
-                board_id=value.category.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
+        if not get_board_roles(self.context["request"]).can_write(value.board_id):
             raise serializers.ValidationError("Вы не являетесь автором этого комментария")
         return value
 
@@ -98,7 +235,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ("board",)
         read_only_fields = ("id", "created", "updated", "user", "goal")
 
 
@@ -107,7 +244,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ("version",)
         read_only_fields = ("id", "created", "updated")
 
     def create(self, validated_data):
@@ -117,14 +254,30 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         return board
 
 
+class BoardParticipantListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        usernames = {value for value in preload_values(data, "user") if isinstance(value, str)}
+        self.context["participant_users"] = User.objects.in_bulk(usernames, field_name="username")
+        return super().to_internal_value(data)
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+            if data._result_cache is None:
+                # not prefetched, e.g. right after an update
+                data = data.select_related("user")
+        return super().to_representation(data)
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.editable_choices)
-    user = serializers.SlugRelatedField(slug_field="username", queryset=User.objects.all())
+    user = PreloadedSlugRelatedField("participant_users", slug_field="username", queryset=User.objects.all())
 
     class Meta:
         model = BoardParticipant
         fields = '__all__'
         read_only_fields = ("id", "created", "updated", "board")
+        list_serializer_class = BoardParticipantListSerializer
 
 
 class BoardSerializer(serializers.ModelSerializer):
@@ -133,21 +286,28 @@ class BoardSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         owner = validated_data.pop("user")
-        new_participants = validated_data.pop("participants")
-        new_by_id = {part["user"].id: part for part in new_participants}
+        new_roles = {part["user"].id: part["role"] for part in validated_data.pop("participants")
+                     if part["user"].id != owner.id}
+        now = timezone.now()
 
-        old_participants = instance.participants.exclude(user=owner)
         with transaction.atomic():
-            for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if old_participant.role != new_by_id[old_participant.user_id]["role"]:
-                        old_participant.role = new_by_id[old_participant.user_id]["role"]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(board=instance, user=new_part["user"], role=new_part["role"])
+            old_participants = {part.user_id: part for part in instance.participants.exclude(user=owner)}
+            removed = [user_id for user_id in old_participants if user_id not in new_roles]
+            changed = []
+            for user_id, role in new_roles.items():
+                participant = old_participants.get(user_id)
+                if participant is not None and participant.role != role:
+                    participant.role = role
+                    participant.updated = now
+                    changed.append(participant)
+            added = [BoardParticipant(board=instance, user_id=user_id, role=role, created=now, updated=now)
+                     for user_id, role in new_roles.items() if user_id not in old_participants]
+
+            if removed:
+                BoardParticipant.objects.filter(board=instance, user_id__in=removed).delete()
+            BoardParticipant.objects.bulk_update(changed, fields=["role", "updated"])
+            BoardParticipant.objects.bulk_create(added)
+            invalidate_board_roles(*removed, *(part.user_id for part in changed), *(part.user_id for part in added))
 
             instance.title = validated_data["title"]
             instance.save()
@@ -156,11 +316,37 @@ class BoardSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Board
-        fields = '__all__'
+        exclude = ("version",)
         read_only_fields = ("id", "created", "updated")
 
 
 class BoardListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Board
+        exclude = ("version",)
+
+
+class BoardEventsSerializer(serializers.Serializer):
+    boards = serializers.CharField(required=False)
+
+    def validate_boards(self, value) -> list[int]:
+        try:
+            board_ids = sorted({int(board_id) for board_id in value.split(",")})
+        except ValueError:
+            raise serializers.ValidationError("Ожидается список id досок через запятую")
+        roles = get_board_roles(self.context["request"])
+        if not all(roles.is_participant(board_id) for board_id in board_ids):
+            raise serializers.ValidationError("Вы не являетесь участником доски")
+        return board_ids
+
+    def validate(self, attrs):
+        if "boards" not in attrs:
+            attrs["boards"] = get_board_roles(self.context["request"]).board_ids
+        return attrs
+
+
+class ArchiveJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchiveJob
         fields = '__all__'
+        read_only_fields = [field.name for field in ArchiveJob._meta.fields]
@@ -0,0 +1,79 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from goals.events import publish_changes
+from goals.membership import invalidate_board_roles
+from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, Tombstone
+from goals.stats import goals_changed, goals_created, goals_deleted, move_goals
+from goals.sync import bury
+
+
+@receiver(post_save, sender=GoalCategory)
+def sync_category_board(sender, instance: GoalCategory, created: bool, **kwargs):
+    old_board_id, instance._loaded_board_id = getattr(instance, "_loaded_board_id", None), instance.board_id
+    if created:
+        return
+    move_goals(Goal.objects.filter(category=instance), instance.board_id)
+    comments = list(GoalComment.objects.filter(goal__category=instance).exclude(board_id=instance.board_id)
+                    .values_list("id", "board_id"))
+    if comments:
+        GoalComment.objects.filter(id__in=[pk for pk, _ in comments]).update(
+            board_id=instance.board_id, updated=timezone.now())
+        bury(Tombstone.Kind.comment, comments)
+    if old_board_id != instance.board_id:
+        bury(Tombstone.Kind.category, [(instance.id, old_board_id)])
+
+
+@receiver(post_save, sender=Goal)
+def count_goal(sender, instance: Goal, created: bool, **kwargs):
+    if created:
+        goals_created([instance])
+    else:
+        goals_changed([instance])
+
+
+@receiver(post_delete, sender=Goal)
+def uncount_goal(sender, instance: Goal, **kwargs):
+    goals_deleted([instance])
+
+
+@receiver(post_delete, sender=GoalComment)
+def bury_comment(sender, instance: GoalComment, **kwargs):
+    # comments are deleted for real, delta sync reports them from here
+    if instance.board_id:
+        Tombstone.objects.create(kind=Tombstone.Kind.comment, object_id=instance.pk, board_id=instance.board_id)
+
+
+EVENT_KINDS = {GoalCategory: "category", Goal: "goal", GoalComment: "comment"}
+
+
+def change_action(instance, created: bool) -> str:
+    if created:
+        return "created"
+    if getattr(instance, "is_deleted", False) or getattr(instance, "status", None) == Goal.Status.archived:
+        return "archived"
+    return "updated"
+
+
+@receiver(post_save, sender=Board)
+def push_board(sender, instance: Board, created: bool, **kwargs):
+    publish_changes("board", change_action(instance, created), [(instance.id, instance.id)])
+
+
+@receiver(post_save, sender=GoalCategory)
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=GoalComment)
+def push_change(sender, instance, created: bool, **kwargs):
+    publish_changes(EVENT_KINDS[sender], change_action(instance, created), [(instance.board_id, instance.id)])
+
+
+@receiver(post_delete, sender=GoalComment)
+def push_comment_delete(sender, instance: GoalComment, **kwargs):
+    publish_changes("comment", "deleted", [(instance.board_id, instance.pk)])
+
+
+@receiver(post_save, sender=BoardParticipant)
+@receiver(post_delete, sender=BoardParticipant)
+def drop_cached_roles(sender, instance: BoardParticipant, **kwargs):
+    invalidate_board_roles(instance.user_id)
@@ -0,0 +1,146 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, QuerySet
+from django.utils import timezone
+
+from goals.events import publish_changes
+from goals.models import BoardGoalCounter, Goal, Tombstone
+from goals.sync import bury
+
+OPEN_STATUSES = (Goal.Status.to_do, Goal.Status.in_progress)
+
+
+def apply_deltas(deltas: Counter):
+    """Add ``{(board_id, status, priority): delta}`` to the counters in one upsert.
+
+    Rows are written in key order so concurrent upserts lock them in the same order.
+    """
+    rows = sorted((key, delta) for key, delta in deltas.items() if delta and key and key[0] is not None)
+    if not rows:
+        return
+    table = BoardGoalCounter._meta.db_table
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+    params = [value for (board_id, status, priority), delta in rows for value in (board_id, status, priority, delta)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO "{table}" (board_id, status, priority, count) VALUES {values} '
+            f'ON CONFLICT (board_id, status, priority) DO UPDATE SET count = "{table}".count + EXCLUDED.count',
+            params,
+        )
+
+
+def count_goals(queryset: QuerySet) -> Counter:
+    rows = queryset.values("board_id", "status", "priority").annotate(goals=Count("id")).order_by()
+    return Counter({(row["board_id"], row["status"], row["priority"]): row["goals"] for row in rows})
+
+
+def goals_created(goals):
+    apply_deltas(Counter(goal.stats_key() for goal in goals))
+    for goal in goals:
+        goal._stats_key = goal.stats_key()
+
+
+def goals_changed(goals):
+    """Move saved goals from their stored (board, status, priority) to the current one.
+
+    ``_stats_key`` must be read with ``Goal.objects.locked_stats_keys`` in the
+    transaction of the write, ``Goal.save`` does that for single saves.
+    """
+    deltas = Counter()
+    for goal in goals:
+        old = getattr(goal, "_stats_key", None)
+        new = goal.stats_key(stored=old)
+        if old is not None and old != new:
+            deltas[old] -= 1
+            deltas[new] += 1
+        goal._stats_key = new
+    apply_deltas(deltas)
+
+
+def goals_deleted(goals):
+    deltas = Counter()
+    for goal in goals:
+        deltas[getattr(goal, "_stats_key", None) or goal.stats_key()] -= 1
+    apply_deltas(deltas)
+
+
+def archive_goals(queryset: QuerySet, **fields) -> int:
+    """``queryset.update(status=archived)`` that moves the archived goals in the counters too.
+
+    The rows are locked first, so a goal archived concurrently is never counted twice.
+    ``updated`` is set to now unless given, and subscribers of the boards are told.
+    """
+    fields.setdefault("updated", timezone.now())
+    with transaction.atomic():
+        rows = list(queryset.exclude(status=Goal.Status.archived).select_for_update()
+                    .values_list("id", "board_id", "status", "priority"))
+        if not rows:
+            return 0
+        Goal.objects.filter(id__in=[row[0] for row in rows]).update(status=Goal.Status.archived, **fields)
+        deltas = Counter()
+        for _, board_id, status, priority in rows:
+            deltas[board_id, status, priority] -= 1
+            deltas[board_id, Goal.Status.archived, priority] += 1
+        apply_deltas(deltas)
+        publish_changes("goal", "archived", [(board_id, goal_id) for goal_id, board_id, _, _ in rows])
+    return len(rows)
+
+
+def move_goals(queryset: QuerySet, board_id: int) -> int:
+    """``queryset.update(board_id=...)`` that moves the goals' counts to the new board.
+
+    As in ``archive_goals`` the rows are locked first and the counts come from
+    the locked rows, so a goal changed concurrently is never moved twice.
+    The goals are tombstoned on the boards they left, for delta sync.
+    """
+    with transaction.atomic():
+        rows = list(queryset.exclude(board_id=board_id).select_for_update()
+                    .values_list("id", "board_id", "status", "priority"))
+        if not rows:
+            return 0
+        Goal.objects.filter(id__in=[row[0] for row in rows]).update(board_id=board_id, updated=timezone.now())
+        deltas = Counter()
+        for _, old_board_id, status, priority in rows:
+            deltas[old_board_id, status, priority] -= 1
+            deltas[board_id, status, priority] += 1
+        apply_deltas(deltas)
+        bury(Tombstone.Kind.goal, [(goal_id, old_board_id) for goal_id, old_board_id, _, _ in rows])
+    return len(rows)
+
+
+def rebuild_counters(board_ids=None) -> int:
+    """Recount goals from scratch, for all boards or only ``board_ids``."""
+    goals = Goal.objects.filter(board_id__isnull=False)
+    counters = BoardGoalCounter.objects.all()
+    if board_ids is not None:
+        goals = goals.filter(board_id__in=board_ids)
+        counters = counters.filter(board_id__in=board_ids)
+    with transaction.atomic():
+        counters.delete()
+        rows = count_goals(goals)
+        BoardGoalCounter.objects.bulk_create(
+            [BoardGoalCounter(board_id=board_id, status=status, priority=priority, count=count)
+             for (board_id, status, priority), count in rows.items()],
+            batch_size=5000,
+        )
+    return len(rows)
+
+
+def board_stats(board_id: int) -> dict:
+    """Counts by status, by priority (archived goals excluded) and of overdue goals, in two queries."""
+    by_status = Counter({status: 0 for status in Goal.Status.values})
+    by_priority = Counter({priority: 0 for priority in Goal.Priority.values})
+    rows = BoardGoalCounter.objects.filter(board_id=board_id).values_list("status", "priority", "count")
+    for status, priority, count in rows:
+        by_status[status] += count
+        if status != Goal.Status.archived:
+            by_priority[priority] += count
+    overdue = Goal.objects.filter(board_id=board_id, status__in=OPEN_STATUSES,
+                                  due_date__lt=timezone.localdate()).count()
+    return {
+        "total": sum(count for status, count in by_status.items() if status != Goal.Status.archived),
+        "by_status": [{"status": status, "count": count} for status, count in sorted(by_status.items())],
+        "by_priority": [{"priority": priority, "count": count} for priority, count in sorted(by_priority.items())],
+        "overdue": overdue,
+    }
@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from goals.models import Board, Goal, GoalCategory, GoalComment, Tombstone
+
+INVALID_CURSOR_MESSAGE = "Invalid cursor"
+EXPIRED_CURSOR_MESSAGE = "Cursor expired, sync from the start"
+STREAMS = ("boards", "categories", "goals", "comments", "tombstones")
+
+Position = tuple[datetime, int]
+
+
+def sync_querysets(board_ids: list[int]) -> dict[str, QuerySet]:
+    """Rows of the boards that delta sync reports, by stream name."""
+    return {
+        "boards": Board.objects.filter(id__in=board_ids),
+        "categories": GoalCategory.objects.filter(board_id__in=board_ids).select_related("user"),
+        "goals": Goal.objects.filter(board_id__in=board_ids).select_related("user"),
+        "comments": GoalComment.objects.filter(board_id__in=board_ids).select_related("user"),
+        "tombstones": Tombstone.objects.filter(board_id__in=board_ids),
+    }
+
+
+def bury(kind: int, rows: Iterable[tuple[int, int | None]]):
+    """Tombstones for the ``(id, board_id)`` rows that left their board, moved or deleted."""
+    Tombstone.objects.bulk_create([Tombstone(kind=kind, object_id=pk, board_id=board_id)
+                                   for pk, board_id in rows if board_id is not None])
+
+
+TOMBSTONE_MODELS = {Tombstone.Kind.category: GoalCategory, Tombstone.Kind.goal: Goal,
+                    Tombstone.Kind.comment: GoalComment}
+
+
+def deleted_ids(rows: dict[str, list], board_ids: list[int]) -> dict[str, list[int]]:
+    """Ids the client drops: deleted boards and categories, and tombstoned rows.
+
+    A row moved to another board is tombstoned on the board it left. It is
+    left out while it is on one of ``board_ids``, where it comes as a row.
+    """
+    buried = defaultdict(set)
+    for tombstone in rows["tombstones"]:
+        buried[tombstone.kind].add(tombstone.object_id)
+    for kind, ids in buried.items():
+        ids -= set(TOMBSTONE_MODELS[kind].objects.filter(id__in=ids, board_id__in=board_ids)
+                   .values_list("id", flat=True))
+    return {
+        "boards": [board.id for board in rows["boards"] if board.is_deleted],
+        "categories": sorted({category.id for category in rows["categories"] if category.is_deleted} |
+                             buried[Tombstone.Kind.category]),
+        "goals": sorted(buried[Tombstone.Kind.goal]),
+        "comments": sorted(buried[Tombstone.Kind.comment]),
+    }
+
+
+def changed_since(queryset: QuerySet, position: Position | None) -> QuerySet:
+    """Rows after ``position`` in (updated, id) order."""
+    if position is not None:
+        updated, pk = position
+        queryset = queryset.filter(Q(updated__gt=updated) | Q(updated=updated, id__gt=pk))
+    return queryset.order_by("updated", "id")
+
+
+@dataclass
+class Changes:
+    rows: dict[str, list]
+    positions: dict[str, Position]
+    has_more: bool
+
+
+def read_changes(board_ids: list[int], positions: dict[str, Position], limit: int) -> Changes:
+    """Up to ``limit`` rows of every stream changed after its position.
+
+    Rows updated in the last ``SYNC_LAG_SECONDS`` are left for a later call,
+    so a transaction committing rows stamped before the returned positions
+    can't be skipped by a client that already moved past them.
+    """
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+    rows, positions, has_more = {}, dict(positions), False
+    for name, queryset in sync_querysets(board_ids).items():
+        page = list(changed_since(queryset.filter(updated__lt=horizon), positions.get(name))[:limit + 1])
+        has_more |= len(page) > limit
+        rows[name] = page = page[:limit]
+        if page:
+            positions[name] = page[-1].updated, page[-1].pk
+    return Changes(rows, positions, has_more)
+
+
+@dataclass
+class SyncCursor:
+    positions: dict[str, Position] = field(default_factory=dict)
+    # boards the positions cover, None before the first sync
+    board_ids: list[int] | None = None
+    # boards joined since, read from the start before the others go on
+    joining: list[int] = field(default_factory=list)
+    joining_positions: dict[str, Position] = field(default_factory=dict)
+
+
+def sync_changes(board_ids: list[int], cursor: SyncCursor, limit: int) -> tuple[Changes, SyncCursor]:
+    """Next changes of the user's boards and the cursor to continue from.
+
+    A board the user joined after the cursor was made has rows older than
+    its positions, so it is read from the start first, on its own positions.
+    """
+    current = set(board_ids)
+    known = current if cursor.board_ids is None else current & set(cursor.board_ids)
+    joining, positions = current & set(cursor.joining), cursor.joining_positions
+    if not joining:
+        joining, positions = current - known, {}
+    if joining:
+        changes = read_changes(sorted(joining), positions, limit)
+        if changes.has_more:
+            cursor = SyncCursor(cursor.positions, sorted(known), sorted(joining), changes.positions)
+        else:
+            cursor = SyncCursor(cursor.positions, sorted(known | joining))
+        # changes of the other boards come next
+        changes.has_more = True
+        return changes, cursor
+    changes = read_changes(sorted(known), cursor.positions, limit)
+    return changes, SyncCursor(changes.positions, sorted(known))
+
+
+def _encode_positions(positions: dict[str, Position]) -> dict:
+    return {name: [updated.isoformat(), pk] for name, (updated, pk) in sorted(positions.items())}
+
+
+def _decode_positions(positions: dict) -> dict[str, Position]:
+    decoded = {name: (parse_datetime(updated), int(pk)) for name, (updated, pk) in positions.items()}
+    if any(name not in STREAMS or updated is None for name, (updated, _) in decoded.items()):
+        raise ValueError("unknown stream or date")
+    return decoded
+
+
+def encode_cursor(cursor: SyncCursor) -> str:
+    # issued at, tombstones older than SYNC_TOMBSTONE_DAYS are purged and a cursor that old would miss them
+    encoded = {"p": _encode_positions(cursor.positions), "b": cursor.board_ids, "t": int(timezone.now().timestamp())}
+    if cursor.joining:
+        encoded.update(j=cursor.joining, jp=_encode_positions(cursor.joining_positions))
+    return base64.urlsafe_b64encode(json.dumps(encoded, separators=(",", ":")).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(encoded: str | None) -> SyncCursor:
+    if not encoded:
+        return SyncCursor()
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        board_ids = cursor["b"]
+        issued = int(cursor["t"])
+        sync_cursor = SyncCursor(
+            positions=_decode_positions(cursor["p"]),
+            board_ids=None if board_ids is None else [int(board_id) for board_id in board_ids],
+            joining=[int(board_id) for board_id in cursor.get("j", [])],
+            joining_positions=_decode_positions(cursor.get("jp", {})),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError, UnicodeEncodeError):
+        raise NotFound(INVALID_CURSOR_MESSAGE)
+    if issued < (timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)).timestamp():
+        raise NotFound(EXPIRED_CURSOR_MESSAGE)
+    return sync_cursor
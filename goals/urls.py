@@ -9,11 +9,18 @@ urlpatterns = [
     path("goal_category/<pk>", views.GoalCategoryView.as_view(), name='category_pk'),
     path("goal/create", views.GoalCreateView.as_view(), name='goal_create'),
     path("goal/list", views.GoalListView.as_view(), name='goal_list'),
+    path("goal/bulk_create", views.GoalBulkCreateView.as_view(), name='goal_bulk_create'),
+    path("goal/bulk_update", views.GoalBulkUpdateView.as_view(), name='goal_bulk_update'),
+    path("goal/bulk_archive", views.GoalBulkArchiveView.as_view(), name='goal_bulk_archive'),
     path("goal/<pk>", views.GoalView.as_view(), name='goal_pk'),
     path("goal_comment/create", views.CommentCreateView.as_view(), name='comment_create'),
     path("goal_comment/list", views.CommentListView.as_view(), name='comment_list'),
     path("goal_comment/<pk>", views.CommentView.as_view(), name='comment_pk'),
+    path("archive_job/<pk>", views.ArchiveJobView.as_view(), name='archive_job_pk'),
     path("board/create", views.BoardCreateView.as_view(), name='board_create'),
     path("board/list", views.BoardListView.as_view(), name='board_list'),
+    path("board/events", views.BoardEventsView.as_view(), name='board_events'),
+    path("board/<pk>/stats", views.BoardStatsView.as_view(), name='board_stats'),
     path("board/<pk>", views.BoardView.as_view(), name='board_pk'),
+    path("sync", views.SyncView.as_view(), name='sync'),
     ]
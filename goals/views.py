@@ -1,15 +1,36 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db import transaction
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework import permissions, filters
+from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView, \
+    GenericAPIView
+from rest_framework import permissions, filters, status
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
+from core.conditional import etag_matches, make_etag, not_modified
+from goals.events import EventStreamRenderer, format_event, get_broker
 from goals.filters import GoalDateFilter
-from goals.models import GoalCategory, Goal, GoalComment, Board
+from goals.generics import AsyncDispatchMixin, AsyncListAPIView, CachedListMixin, ConditionalListMixin, \
+    ConditionalRetrieveMixin
+from goals.membership import get_board_roles
+from goals.jobs import start_archive_job
+from goals.models import GoalCategory, Goal, GoalComment, Board, ArchiveJob
+from goals.pagination import AsyncLimitOffsetPagination, LimitOffsetOrKeysetPagination
 from goals.permissions import BoardPermissions, GoalCategoryPermissions, GoalPermissions, CommentPermissions
+from goals.search import GoalSearchFilter
+from goals.sync import decode_cursor, deleted_ids, encode_cursor, sync_changes
+from goals.stats import archive_goals, board_stats
 from goals.serializers import GoalCreateSerializer, GoalCategorySerializer, GoalSerializer, CommentSerializer, \
-    CommentCreateSerializer, GoalCategoryCreateSerializer, BoardSerializer, BoardCreateSerializer, BoardListSerializer
+    CommentCreateSerializer, GoalCategoryCreateSerializer, BoardSerializer, BoardCreateSerializer, BoardListSerializer, \
+    GoalBulkCreateSerializer, GoalBulkUpdateSerializer, GoalBulkArchiveSerializer, ArchiveJobSerializer, \
+    BoardEventsSerializer
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -18,7 +39,7 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(CachedListMixin, ConditionalListMixin, ListAPIView):
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategorySerializer
@@ -30,23 +51,28 @@ class GoalCategoryListView(ListAPIView):
     search_fields = ["title"]
 
     def get_queryset(self):
-        return GoalCategory.objects.filter(board__participants__user=self.request.user, is_deleted=False)
+        return GoalCategory.objects.filter(
+            board_id__in=get_board_roles(self.request).board_ids, is_deleted=False).select_related("user")
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = GoalCategory
     serializer_class = GoalCategorySerializer
     permission_classes = [permissions.IsAuthenticated, GoalCategoryPermissions]
 
     def get_queryset(self) -> QuerySet[GoalCategory]:
-        return GoalCategory.objects.filter(board__participants__user=self.request.user).exclude(is_deleted=True)
+        return GoalCategory.objects.filter(
+            board_id__in=get_board_roles(self.request).board_ids).exclude(is_deleted=True).select_related("user")
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.perform_destroy(self.get_object())
+        return Response(ArchiveJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
     def perform_destroy(self, instance):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            Goal.objects.filter(category=instance).update(status=Goal.Status.archived)
-        return instance
+            return start_archive_job(instance.board, category=instance)
 
 
 class GoalCreateView(CreateAPIView):
@@ -55,28 +81,69 @@ class GoalCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class GoalListView(ListAPIView):
+class GoalBulkCreateView(CreateAPIView):
+    model = Goal
+    serializer_class = GoalBulkCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+
+class GoalBulkUpdateView(GenericAPIView):
+    model = Goal
+    serializer_class = GoalBulkUpdateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            goals = serializer.update(None, serializer.validated_data)
+        return Response(GoalSerializer(goals, many=True).data)
+
+
+class GoalBulkArchiveView(GenericAPIView):
+    model = Goal
+    serializer_class = GoalBulkArchiveSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        with transaction.atomic():
+            archive_goals(Goal.objects.filter(id__in=ids))
+        return Response({"ids": ids})
+
+
+class GoalListView(CachedListMixin, ConditionalListMixin, AsyncListAPIView):
     model = Goal
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, ]
+    pagination_class = LimitOffsetOrKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, GoalSearchFilter, ]
     filterset_class = GoalDateFilter
-    search_fields = ["title", "description"]
     ordering_fields = ["due_date", "priority"]
     ordering = ["priority", "due_date"]
+    keyset_ordering = ["priority", "due_date", "id"]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        return Goal.objects.filter(board_id__in=get_board_roles(self.request).board_ids).select_related("user")
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = Goal
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated, GoalPermissions]
 
     def get_queryset(self):
-        return Goal.objects.filter(category__board__participants__user=self.request.user)
+        return Goal.objects.filter(board_id__in=get_board_roles(self.request).board_ids).select_related("user")
 
     def perform_destroy(self, instance):
         instance.status = Goal.Status.archived
@@ -90,44 +157,74 @@ class CommentCreateView(CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class CommentView(RetrieveUpdateDestroyAPIView):
+class CommentView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = GoalComment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, CommentPermissions]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.filter(board_id__in=get_board_roles(self.request).board_ids).select_related("user")
 
 
-class CommentListView(ListAPIView):
+class CommentListView(ConditionalListMixin, AsyncListAPIView):
     model = GoalComment
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
     filterset_fields = ["goal"]
     ordering = "-id"
+    keyset_ordering = ["-id"]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user=self.request.user)
+        return GoalComment.objects.filter(board_id__in=get_board_roles(self.request).board_ids).select_related("user")
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = Board
     permission_classes = [permissions.IsAuthenticated, BoardPermissions]
     serializer_class = BoardSerializer
 
     def get_queryset(self):
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(
+            id__in=get_board_roles(self.request).board_ids, is_deleted=False).prefetch_related("participants__user")
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.perform_destroy(self.get_object())
+        return Response(ArchiveJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
     def perform_destroy(self, instance: Board):
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
+            instance.categories.update(is_deleted=True, updated=timezone.now())
+            return start_archive_job(instance)
 
-        return instance
+
+class BoardStatsView(GenericAPIView):
+    model = Board
+    permission_classes = [permissions.IsAuthenticated, BoardPermissions]
+
+    def get_queryset(self):
+        return Board.objects.filter(id__in=get_board_roles(self.request).board_ids, is_deleted=False)
+
+    def get(self, request, *args, **kwargs):
+        board = self.get_object()
+        # counters change with the board version, overdue goals with the date
+        etag = make_etag(type(self).__name__, request.accepted_media_type, board.id, board.version,
+                         timezone.localdate())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response({"board": board.id, **board_stats(board.id)}, headers={"ETag": etag})
+
+
+class ArchiveJobView(ConditionalRetrieveMixin, RetrieveAPIView):
+    model = ArchiveJob
+    serializer_class = ArchiveJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ArchiveJob.objects.filter(board_id__in=get_board_roles(self.request).board_ids)
 
 
 class BoardCreateView(CreateAPIView):
@@ -136,13 +233,90 @@ class BoardCreateView(CreateAPIView):
     serializer_class = BoardCreateSerializer
 
 
-class BoardListView(ListAPIView):
+class BoardListView(CachedListMixin, ConditionalListMixin, AsyncListAPIView):
     model = Board
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = LimitOffsetPagination
+    pagination_class = AsyncLimitOffsetPagination
     serializer_class = BoardListSerializer
     filter_backends = [filters.OrderingFilter, ]
     ordering = ["title"]
 
     def get_queryset(self):
-        return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
+        return Board.objects.filter(id__in=get_board_roles(self.request).board_ids, is_deleted=False)
+
+
+class BoardEventsView(AsyncDispatchMixin, GenericAPIView):
+    """Server-Sent Events of changes on the user's boards, or on ``?boards=1,2`` of them.
+
+    Events name the changed rows only, e.g. ``{"kind": "goal", "action":
+    "archived", "board": 1, "ids": [5, 6]}``; a ``resync`` event means some
+    were dropped and the client should catch up through goals/sync. Streams
+    hold no database connection, but need ASGI: under WSGI Django buffers them.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BoardEventsSerializer
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    async def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        response = StreamingHttpResponse(self.stream(serializer.validated_data["boards"]),
+                                         content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # nginx would hold the events back in its buffer
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    async def stream(board_ids: list[int]):
+        loop = asyncio.get_running_loop()
+        # closed after a while, so the client reconnects and its boards are checked again
+        deadline = loop.time() + settings.GOALS_EVENTS_STREAM_SECONDS
+        subscription = get_broker().subscribe(board_ids)
+        try:
+            yield ": subscribed\n\n"
+            while (left := deadline - loop.time()) > 0:
+                event = await subscription.get(min(left, settings.GOALS_EVENTS_KEEPALIVE_SECONDS))
+                yield ": keepalive\n\n" if event is None else format_event(event)
+        finally:
+            subscription.close()
+
+
+class SyncView(GenericAPIView):
+    """Boards, categories, goals and comments changed since ``?cursor=``, see goals.sync.
+
+    Archived goals come as rows. Deleted boards, categories and comments, and
+    rows moved to a board the user isn't on, come as ids under ``deleted``.
+    ``board_ids`` lists the boards the user still participates in. Clients
+    call again with ``cursor`` while ``has_more`` is true. A row may come
+    more than once, the last copy wins. A cursor older than
+    ``SYNC_TOMBSTONE_DAYS`` is refused, the client syncs from the start.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 200
+    max_limit = 1000
+
+    def get(self, request, *args, **kwargs):
+        board_ids = get_board_roles(request).board_ids
+        changes, cursor = sync_changes(board_ids, decode_cursor(request.query_params.get("cursor")),
+                                       self.get_limit())
+        rows, context = changes.rows, self.get_serializer_context()
+        return Response({
+            "cursor": encode_cursor(cursor),
+            "has_more": changes.has_more,
+            "board_ids": sorted(board_ids),
+            "boards": BoardListSerializer([board for board in rows["boards"] if not board.is_deleted],
+                                          many=True, context=context).data,
+            "categories": GoalCategorySerializer([category for category in rows["categories"]
+                                                  if not category.is_deleted], many=True, context=context).data,
+            "goals": GoalSerializer(rows["goals"], many=True, context=context).data,
+            "comments": CommentSerializer(rows["comments"], many=True, context=context).data,
+            "deleted": deleted_ids(rows, board_ids),
+        })
+
+    def get_limit(self) -> int:
+        try:
+            limit = int(self.request.query_params["limit"])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
@@ -0,0 +1,32 @@
+# Production serving profile: gunicorn managing uvicorn workers that run todolist.asgi.
+#   gunicorn todolist.asgi:application
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+# One event loop per process, so processes are what scale with cores. Every worker has its own
+# copy of the in-process state: the bot outbox and its rate limits, the webhook dispatcher, the
+# board event broker and the local memory cache. Run more than one only with the shared backends
+# described in the README, or set WEB_CONCURRENCY=1.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# only used by the threaded sync worker (GUNICORN_WORKER_CLASS=gthread with todolist.wsgi)
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# recycle workers now and then so a leak in one of them can't grow forever
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+
+def on_starting(server):
+    """Refuse to start several workers that would each keep state meant to be shared."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todolist.settings")
+    from core.deployment import shared_state_problems
+
+    problems = shared_state_problems(server.cfg.workers)
+    if problems:
+        raise RuntimeError(f"{server.cfg.workers} workers, but " + "; ".join(problems) +
+                           ". Fix the settings or set WEB_CONCURRENCY=1.")
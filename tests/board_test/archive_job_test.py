@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.jobs import run_archive_job
+from goals.models import ArchiveJob, Board, Goal, GoalCategory
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestArchiveJob:
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_board_delete_returns_before_archiving(self, auth_client, category) -> None:
+        GoalFactory.create_batch(size=3, category=category)
+
+        response = auth_client.delete(reverse("goals:board_pk", args=[category.board_id]))
+
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.data
+        assert response.data["status"] == ArchiveJob.Status.pending
+        assert Board.objects.get(pk=category.board_id).is_deleted, "board not marked deleted right away"
+        assert GoalCategory.objects.get(pk=category.id).is_deleted
+        assert Goal.objects.exclude(status=Goal.Status.archived).count() == 3, "goals archived in the request"
+
+    def test_board_goals_archived_in_batches(self, auth_client, category, inline_jobs, settings) -> None:
+        settings.GOALS_ARCHIVE_BATCH_SIZE = 2
+        GoalFactory.create_batch(size=5, category=category)
+        untouched = GoalFactory(category=CategoryFactory())
+
+        with inline_jobs():
+            response = auth_client.delete(reverse("goals:board_pk", args=[category.board_id]))
+        progress = auth_client.get(reverse("goals:archive_job_pk", args=[response.data["id"]]))
+
+        assert progress.status_code == status.HTTP_200_OK, progress.data
+        assert progress.data["status"] == ArchiveJob.Status.done
+        assert progress.data["total"] == progress.data["processed"] == 5
+        assert not Goal.objects.filter(board=category.board).exclude(status=Goal.Status.archived).exists()
+        assert Goal.objects.get(pk=untouched.pk).status != Goal.Status.archived, "foreign goal archived"
+
+    def test_category_delete_archives_only_its_goals(self, auth_client, category, inline_jobs) -> None:
+        sibling = GoalFactory(category=CategoryFactory(board=category.board))
+        GoalFactory.create_batch(size=2, category=category)
+
+        with inline_jobs():
+            response = auth_client.delete(reverse("goals:category_pk", args=[category.id]))
+
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.data
+        assert Goal.objects.filter(category=category, status=Goal.Status.archived).count() == 2
+        assert Goal.objects.get(pk=sibling.pk).status != Goal.Status.archived
+
+    def test_job_runs_once(self, category) -> None:
+        GoalFactory.create_batch(size=2, category=category)
+        job = ArchiveJob.objects.create(board=category.board)
+
+        run_archive_job(job.id)
+        run_archive_job(job.id)
+
+        job.refresh_from_db()
+        assert job.status == ArchiveJob.Status.done and job.processed == 2
+
+    def test_abandoned_job_resumed(self, category) -> None:
+        GoalFactory.create_batch(size=2, category=category)
+        job = ArchiveJob.objects.create(board=category.board, status=ArchiveJob.Status.running)
+
+        call_command("run_archive_jobs", stale_after=0)
+
+        job.refresh_from_db()
+        assert job.status == ArchiveJob.Status.done, "abandoned job left running"
+
+    def test_foreign_job_hidden(self, auth_client) -> None:
+        job = ArchiveJob.objects.create(board=BoardFactory())
+
+        response = auth_client.get(reverse("goals:archive_job_pk", args=[job.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.urls import reverse
+from rest_framework import status
+
+from goals.events import RESYNC_EVENT, MemoryBroker, PostgresBroker, get_broker
+from goals.models import Goal
+from goals.stats import archive_goals
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory
+
+SSE = {"HTTP_ACCEPT": "text/event-stream"}
+
+
+def next_event(async_client, params: dict, change=None) -> str:
+    """First message of the board event stream after subscribing and running ``change``."""
+    async def read():
+        response = await async_client.get(reverse("goals:board_events"), params, **SSE)
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response["Content-Type"] == "text/event-stream", "wrong content type"
+        chunks = aiter(response.streaming_content)
+        assert await anext(chunks) == b": subscribed\n\n", "not subscribed"
+        if change is not None:
+            await sync_to_async(change)()
+        return (await anext(chunks)).decode()
+    return async_to_sync(read)()
+
+
+def event_data(message: str) -> dict:
+    return json.loads(message.split("data: ", 1)[1])
+
+
+@pytest.mark.django_db
+class TestBoardEvents:
+    @pytest.fixture(autouse=True)
+    def broker(self, settings):
+        settings.GOALS_EVENTS_KEEPALIVE_SECONDS = 1
+        get_broker.cache_clear()
+        yield get_broker()
+        get_broker.cache_clear()
+
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+
+    @pytest.fixture()
+    def async_client(self, async_client, user):
+        async_client.force_login(user)
+        return async_client
+
+    def test_goal_change(self, async_client, goal, django_capture_on_commit_callbacks) -> None:
+        def change():
+            with django_capture_on_commit_callbacks(execute=True):
+                goal.title = "Renamed"
+                goal.save()
+
+        message = next_event(async_client, {"boards": goal.board_id}, change)
+
+        assert message.startswith("event: goal\n"), message
+        expected = {"kind": "goal", "action": "updated", "board": goal.board_id, "ids": [goal.id]}
+        assert event_data(message) == expected, message
+
+    def test_bulk_archive_is_one_event(self, async_client, goal, django_capture_on_commit_callbacks) -> None:
+        other = GoalFactory(category=goal.category)
+
+        def change():
+            with django_capture_on_commit_callbacks(execute=True):
+                archive_goals(Goal.objects.filter(id__in=[goal.id, other.id]))
+
+        data = event_data(next_event(async_client, {}, change))
+
+        assert data == {"kind": "goal", "action": "archived", "board": goal.board_id,
+                        "ids": sorted([goal.id, other.id])}, data
+
+    def test_comment_delete(self, async_client, goal, django_capture_on_commit_callbacks) -> None:
+        comment = GoalCommentFactory(goal=goal)
+        comment_id = comment.id
+
+        def change():
+            with django_capture_on_commit_callbacks(execute=True):
+                comment.delete()
+
+        data = event_data(next_event(async_client, {"boards": goal.board_id}, change))
+
+        assert data == {"kind": "comment", "action": "deleted", "board": goal.board_id, "ids": [comment_id]}, data
+
+    def test_other_boards_not_sent(self, async_client, goal, django_capture_on_commit_callbacks) -> None:
+        other = GoalFactory()
+
+        def change():
+            with django_capture_on_commit_callbacks(execute=True):
+                other.save()
+
+        assert next_event(async_client, {"boards": goal.board_id}, change) == ": keepalive\n\n", "event leaked"
+
+    def test_not_participant(self, async_client, goal) -> None:
+        board = BoardFactory()
+
+        async def get():
+            return await async_client.get(reverse("goals:board_events"), {"boards": board.id}, **SSE)
+
+        response = async_to_sync(get)()
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.content
+        assert response.content.startswith(b"event: error\n"), response.content
+
+    def test_anonymous(self, client) -> None:
+        response = client.get(reverse("goals:board_events"), **SSE)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, response.content
+
+
+class TestMemoryBroker:
+    def test_overflow_sends_resync(self) -> None:
+        async def run():
+            broker = MemoryBroker(max_queued=2)
+            subscription = broker.subscribe([1])
+            for pk in range(3):
+                broker.publish(1, {"kind": "goal", "ids": [pk]})
+            broker.publish(2, {"kind": "goal", "ids": [9]})
+            events = [await subscription.get(0.1), await subscription.get(0.1)]
+            subscription.close()
+            return events, broker.subscriptions
+
+        events, subscriptions = async_to_sync(run)()
+
+        assert events == [RESYNC_EVENT, None], events
+        assert not subscriptions, "subscription left"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostgresBroker:
+    def test_events_reach_other_processes(self) -> None:
+        publisher, listener = PostgresBroker(), PostgresBroker()
+
+        async def run():
+            subscription = listener.subscribe([1])
+            assert await asyncio.to_thread(listener.listening.wait, 5), "not listening"
+            await sync_to_async(publisher.publish)(1, {"kind": "goal", "ids": [7]})
+            await sync_to_async(publisher.publish)(2, {"kind": "goal", "ids": [8]})
+            await sync_to_async(publisher.publish)(1, {"kind": "goal", "ids": list(range(5000))})
+            events = [await subscription.get(5), await subscription.get(5), await subscription.get(0.2)]
+            subscription.close()
+            return events
+
+        try:
+            events = async_to_sync(run)()
+        finally:
+            listener.close()
+
+        assert events == [{"kind": "goal", "ids": [7]}, RESYNC_EVENT, None], events
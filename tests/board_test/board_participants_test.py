@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from goals.serializers import BoardSerializer
+from tests.factories import BoardFactory, BoardParticipantFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestBoardParticipantsUpdate:
+    @pytest.fixture()
+    def board(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return board
+
+    def share(self, auth_client, board, users, role=BoardParticipant.Role.writer):
+        data = {"title": board.title, "participants": [{"user": user.username, "role": role} for user in users]}
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.put(reverse("goals:board_pk", args=[board.id]), data=data, format="json")
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return response, len(ctx)
+
+    def test_participants_synced(self, auth_client, user, board) -> None:
+        kept, removed, changed = UserFactory(), UserFactory(), UserFactory()
+        BoardParticipantFactory(board=board, user=kept, role=BoardParticipant.Role.writer)
+        BoardParticipantFactory(board=board, user=removed, role=BoardParticipant.Role.writer)
+        BoardParticipantFactory(board=board, user=changed, role=BoardParticipant.Role.writer)
+        added = UserFactory()
+        data = {"title": "Team", "participants": [
+            {"user": kept.username, "role": BoardParticipant.Role.writer},
+            {"user": changed.username, "role": BoardParticipant.Role.reader},
+            {"user": added.username, "role": BoardParticipant.Role.reader},
+        ]}
+
+        response = auth_client.put(reverse("goals:board_pk", args=[board.id]), data=data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        roles = dict(BoardParticipant.objects.filter(board=board).values_list("user_id", "role"))
+        assert roles == {user.id: BoardParticipant.Role.owner, kept.id: BoardParticipant.Role.writer,
+                         changed.id: BoardParticipant.Role.reader, added.id: BoardParticipant.Role.reader}
+        board.refresh_from_db()
+        assert response.data == BoardSerializer(board).data, "response differs from the stored board"
+
+    def test_query_count_independent_of_team_size(self, auth_client, user, board) -> None:
+        other_board = BoardFactory()
+        BoardParticipantFactory(board=other_board, user=user)
+
+        _, small = self.share(auth_client, board, UserFactory.create_batch(size=3))
+        _, large = self.share(auth_client, other_board, UserFactory.create_batch(size=40))
+
+        assert large == small, "participant sync queries grow with the team"
+
+    def test_unknown_username(self, auth_client, board) -> None:
+        data = {"title": board.title, "participants": [{"user": "nobody", "role": BoardParticipant.Role.writer}]}
+
+        response = auth_client.put(reverse("goals:board_pk", args=[board.id]), data=data, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "user" in response.data["participants"][0]
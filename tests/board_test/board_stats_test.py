@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import BoardGoalCounter, Goal
+from goals.stats import archive_goals, count_goals
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+def assert_counters_match():
+    counters = {(row.board_id, row.status, row.priority): row.count
+                for row in BoardGoalCounter.objects.all() if row.count}
+    assert counters == dict(count_goals(Goal.objects.all())), "counters drifted from goals"
+
+
+@pytest.mark.django_db
+class TestBoardStats:
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_stats(self, auth_client, category, django_assert_max_num_queries) -> None:
+        yesterday = timezone.localdate() - timedelta(days=1)
+        GoalFactory.create_batch(size=2, category=category, priority=Goal.Priority.high, due_date=yesterday)
+        GoalFactory(category=category, status=Goal.Status.done, due_date=yesterday)
+        GoalFactory(category=category, status=Goal.Status.archived)
+
+        with django_assert_max_num_queries(6):
+            response = auth_client.get(reverse("goals:board_stats", args=[category.board_id]))
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response.data["total"] == 3, "archived goal counted"
+        assert response.data["overdue"] == 2, "done goal counted as overdue"
+        by_status = {row["status"]: row["count"] for row in response.data["by_status"]}
+        assert by_status == {1: 2, 2: 0, 3: 1, 4: 1}
+        assert {row["priority"]: row["count"] for row in response.data["by_priority"]}[Goal.Priority.high] == 2
+
+    def test_stats_of_foreign_board(self, auth_client) -> None:
+        response = auth_client.get(reverse("goals:board_stats", args=[BoardFactory().id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_counters_follow_every_write_path(self, auth_client, category, inline_jobs) -> None:
+        other = CategoryFactory(board=category.board)
+        goals = GoalFactory.create_batch(size=4, category=category)
+        assert_counters_match()
+
+        auth_client.post(reverse("goals:goal_bulk_create"),
+                         data=[{"category": other.id, "title": f"Goal {i}"} for i in range(3)])
+        auth_client.patch(reverse("goals:goal_pk", args=[goals[0].id]), data={"status": Goal.Status.in_progress})
+        auth_client.patch(reverse("goals:goal_bulk_update"),
+                          data=[{"id": goals[1].id, "priority": Goal.Priority.critical}])
+        auth_client.post(reverse("goals:goal_bulk_archive"), data={"ids": [goals[2].id]})
+        auth_client.delete(reverse("goals:goal_pk", args=[goals[3].id]))
+        assert_counters_match()
+
+        with inline_jobs():
+            auth_client.delete(reverse("goals:category_pk", args=[other.id]))
+        assert_counters_match()
+        with inline_jobs():
+            auth_client.delete(reverse("goals:board_pk", args=[category.board_id]))
+        assert_counters_match()
+        assert not Goal.objects.exclude(status=Goal.Status.archived).exists()
+
+    def test_category_moved_to_another_board(self, category) -> None:
+        GoalFactory.create_batch(size=3, category=category)
+        GoalFactory(category=category, status=Goal.Status.done)
+        board = BoardFactory()
+
+        category.board = board
+        category.save()
+
+        assert_counters_match()
+        assert set(Goal.objects.values_list("board_id", flat=True)) == {board.id}, "goals left on the old board"
+
+    def test_stale_instances_counted_from_stored_row(self, category) -> None:
+        goal = GoalFactory(category=category)
+        first, second, third = (Goal.objects.get(pk=goal.pk) for _ in range(3))
+
+        first.status = Goal.Status.done
+        first.save()
+        second.status = Goal.Status.in_progress
+        second.save()
+        assert_counters_match()
+
+        archive_goals(Goal.objects.filter(pk=goal.pk))
+        third.priority = Goal.Priority.high
+        third.save()
+        assert_counters_match()
+
+        partial = Goal.objects.only("id", "category", "title").get(pk=goal.pk)
+        partial.title = "renamed"
+        partial.save()
+        assert_counters_match()
+
+    def test_rebuild(self, category) -> None:
+        GoalFactory.create_batch(size=3, category=category)
+        BoardGoalCounter.objects.update(count=100)
+
+        call_command("rebuild_goal_stats", board=[category.board_id])
+
+        assert_counters_match()
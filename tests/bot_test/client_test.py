@@ -0,0 +1,102 @@
+import time
+
+import pytest
+import requests
+
+from bot.management.commands.bench_updates import sample_updates
+from bot.tg.batching import batch_lines
+from bot.tg.client import RetryAfter, TgClient
+from bot.tg.dc import DecodeError, GetUpdatesResponse, UpdateObj
+from tests.bot_test.fake_telegram import FakeTelegram
+
+
+class TestBatchLines:
+    def test_lines_coalesced_under_limit(self) -> None:
+        batches = batch_lines(["a" * 40, "b" * 40, "c" * 40], limit=90)
+
+        assert batches == ["a" * 40 + "\n" + "b" * 40, "c" * 40]
+
+    def test_long_line_split(self) -> None:
+        batches = batch_lines(["x", "y" * 25], limit=10)
+
+        assert batches == ["x", "y" * 10, "y" * 10, "y" * 5]
+        assert all(len(batch) <= 10 for batch in batches)
+
+
+class TestTgClient:
+    def test_retry_after_respected(self) -> None:
+        with FakeTelegram() as fake:
+            fake.failures = [(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}})]
+            client = TgClient("token", base_url=fake.url)
+            started = time.monotonic()
+            response = client.send_message(1, "hello")
+
+        assert response.ok, "message not sent"
+        assert time.monotonic() - started >= 0.2, "retry_after ignored"
+        assert [message["text"] for message in fake.sent] == ["hello"]
+
+    def test_retry_after_passed_to_caller(self) -> None:
+        with FakeTelegram() as fake:
+            fake.failures = [(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 30}})]
+            client = TgClient("token", base_url=fake.url, wait_flood=False)
+
+            with pytest.raises(RetryAfter) as e:
+                client.send_message(1, "hello")
+
+        assert e.value.retry_after == 30 and not fake.sent
+
+    def test_html_error_page_retried(self) -> None:
+        with FakeTelegram() as fake:
+            fake.failures = [(502, "<html><body>502 Bad Gateway</body></html>")]
+            client = TgClient("token", base_url=fake.url, backoff=0.01)
+            response = client.send_message(1, "hello")
+
+        assert response.ok, "gateway error page not retried"
+        assert [message["text"] for message in fake.sent] == ["hello"]
+
+    def test_html_error_page_raises_after_retries(self) -> None:
+        with FakeTelegram() as fake:
+            fake.failures = [(503, "<html>unavailable</html>")] * 2
+            client = TgClient("token", base_url=fake.url, retries=1, backoff=0.01)
+
+            with pytest.raises(requests.HTTPError):
+                client.send_message(1, "hello")
+
+    def test_send_not_repeated_after_read_timeout(self) -> None:
+        with FakeTelegram() as fake:
+            fake.delays = [0.5]
+            client = TgClient("token", base_url=fake.url, timeout=0.2, backoff=0.01)
+
+            with pytest.raises(requests.Timeout):
+                client.send_message(1, "hello")
+            time.sleep(0.5)
+
+        assert len(fake.sent) == 1, "message sent twice"
+
+    def test_send_messages_batches(self) -> None:
+        with FakeTelegram() as fake:
+            client = TgClient("token", base_url=fake.url)
+            client.send_messages(1, [f"goal {i}" for i in range(500)])
+
+        assert len(fake.sent) == 2, "items not coalesced into 4096-character messages"
+
+
+class TestDecoding:
+    def test_every_kind_of_update_decoded(self) -> None:
+        updates = GetUpdatesResponse.from_dict(sample_updates(4)).result
+
+        assert [update.update_id for update in updates] == [0, 1, 2, 3], "updates dropped"
+        assert updates[0].message.text == "/goals" and updates[0].message.from_.username == "user101"
+        assert updates[1].callback_query.data == "goals:n10"
+        assert updates[1].callback_query.message.chat.id == 101
+        assert all(update.message is None and update.callback_query is None for update in updates[2:]), \
+            "unsupported update decoded as a message"
+
+    def test_broken_message_keeps_update(self) -> None:
+        update = UpdateObj.from_dict({"update_id": 5, "message": {"message_id": 1, "chat": {"id": 1}}})
+
+        assert update.update_id == 5 and update.message is None
+
+    def test_update_id_required(self) -> None:
+        with pytest.raises(DecodeError):
+            UpdateObj.from_dict({"message": {}})
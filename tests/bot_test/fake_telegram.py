@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": chat_id, "first_name": "Test", "last_name": None, "username": f"user{chat_id}"},
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        },
+    }
+
+
+class FakeTelegram:
+    """Local stand-in for the Bot API: serves queued updates and records sent messages."""
+
+    def __init__(self):
+        self.updates: list[dict] = []
+        self.sent: list[dict] = []
+        self.edited: list[dict] = []
+        # (status, payload) answered instead of sending, a str payload is sent as an HTML page
+        self.failures: list[tuple[int, dict | str]] = []
+        # seconds to wait before answering a sent message
+        self.delays: list[float] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def wait_sent(self, count: int, timeout: float = 10) -> list[dict]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and len(self.sent) < count:
+            time.sleep(0.02)
+        return self.sent
+
+    def make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, payload: dict | str, status: int = 200):
+                html = isinstance(payload, str)
+                body = payload.encode() if html else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html" if html else "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_method(self):
+                url = urlparse(self.path)
+                method = url.path.rsplit("/", 1)[-1]
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params.update(json.loads(self.rfile.read(length)))
+                if method == "getUpdates":
+                    offset = int(params.get("offset", 0))
+                    with fake.lock:
+                        result = [update for update in fake.updates if update["update_id"] >= offset]
+                    if not result:
+                        time.sleep(0.05)
+                    return self.reply({"ok": True, "result": result})
+                if method in ("sendMessage", "editMessageText"):
+                    with fake.lock:
+                        failure = fake.failures.pop(0) if fake.failures else None
+                    if failure:
+                        return self.reply(failure[1], status=failure[0])
+                    with fake.lock:
+                        if method == "editMessageText":
+                            fake.edited.append(params)
+                            message_id = int(params["message_id"])
+                        else:
+                            fake.sent.append(params)
+                            message_id = len(fake.sent)
+                        delay = fake.delays.pop(0) if fake.delays else 0
+                    time.sleep(delay)
+                    chat_id = int(params["chat_id"])
+                    return self.reply({"ok": True, "result": {
+                        "message_id": message_id,
+                        "from": {"id": 1, "first_name": "bot", "last_name": None, "username": "bot"},
+                        "chat": {"id": chat_id, "type": "private"},
+                        "text": params.get("text"),
+                    }})
+                return self.reply({"ok": True, "result": True})
+
+            do_GET = handle_method
+            do_POST = handle_method
+
+        return Handler
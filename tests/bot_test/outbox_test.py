@@ -0,0 +1,180 @@
+import threading
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from bot.tg.client import RetryAfter
+from bot.tg.outbox import Outbox, Priority, RateLimiter
+from core.metrics import registry
+from tests.factories import TuserFactory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingClient:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None):
+        self.sent.append((chat_id, text))
+
+    def edit_message_text(self, chat_id: int, message_id: int, text: str, reply_markup: dict | None = None):
+        self.sent.append((chat_id, text))
+
+    def answer_callback_query(self, callback_query_id: str, text: str | None = None):
+        self.sent.append((None, callback_query_id))
+
+
+class ThrottledClient(RecordingClient):
+    """Answers the first message of ``chat_id`` with flood control."""
+
+    def __init__(self, chat_id: int, retry_after: float):
+        super().__init__()
+        self.chat_id = chat_id
+        self.retry_after = retry_after
+
+    def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None):
+        if chat_id == self.chat_id and self.retry_after:
+            retry_after, self.retry_after = self.retry_after, 0
+            raise RetryAfter("sendMessage", retry_after)
+        super().send_message(chat_id, text)
+
+
+class BlockingClient(RecordingClient):
+    """Holds sends to ``chat_id`` until ``release`` is set."""
+
+    def __init__(self, chat_id: int):
+        super().__init__()
+        self.chat_id = chat_id
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None):
+        if chat_id == self.chat_id:
+            self.release.wait(timeout=10)
+        with self.lock:
+            super().send_message(chat_id, text)
+
+
+def drain(outbox: Outbox) -> list:
+    while True:
+        message, _ = outbox.next_message()
+        if message is None:
+            return outbox.client.sent
+        outbox.deliver(message)
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def outbox(clock):
+    limiter = RateLimiter(global_rate=30, chat_rate=1, chat_burst=1, clock=clock)
+    return Outbox(RecordingClient(), limiter, clock=clock)
+
+
+class TestOutbox:
+    def test_high_priority_first(self, outbox) -> None:
+        outbox.enqueue(1, "goals list", priority=Priority.low)
+        outbox.enqueue(2, "verified", priority=Priority.high)
+
+        assert drain(outbox) == [(2, "verified"), (1, "goals list")]
+
+    def test_chat_limit_does_not_block_other_chats(self, outbox, clock) -> None:
+        outbox.enqueue(1, "first")
+        outbox.enqueue(1, "second")
+        outbox.enqueue(2, "other")
+
+        assert drain(outbox) == [(1, "first"), (2, "other")]
+        assert outbox.stats()["depth"] == 1, "limited message dropped"
+
+        clock.now = 1.0
+        assert drain(outbox)[-1] == (1, "second")
+        assert outbox.stats()["sent"] == 3
+
+    def test_update_replies_by_kind(self, outbox) -> None:
+        outbox.submit_calls([
+            ("edit_message_text", {"chat_id": 1, "message_id": 5, "text": "page 2", "reply_markup": {}}),
+            ("send_message", {"chat_id": 2, "text": "created", "reply_markup": None}),
+            ("answer_callback_query", {"callback_query_id": "42", "text": None}),
+        ])
+
+        assert drain(outbox) == [(None, "42"), (2, "created"), (1, "page 2")], "wrong priorities"
+
+    def test_callback_answers_not_limited(self, outbox) -> None:
+        outbox.enqueue(1, "first")
+        outbox.submit_calls([("answer_callback_query", {"callback_query_id": str(i)}) for i in range(3)])
+
+        assert len(drain(outbox)) == 4, "callback answers held back by the chat limit"
+
+    def test_flood_control_pauses_only_its_chat(self, clock) -> None:
+        limiter = RateLimiter(global_rate=30, chat_rate=1, chat_burst=1, clock=clock)
+        outbox = Outbox(ThrottledClient(chat_id=1, retry_after=10), limiter, clock=clock)
+        outbox.enqueue(1, "first")
+        outbox.enqueue(2, "other")
+        outbox.enqueue(1, "second")
+
+        assert drain(outbox) == [(2, "other")], "throttled chat held back other chats"
+        assert outbox.stats()["depth"] == 2 and outbox.stats()["failed"] == 0, "throttled messages dropped"
+
+        clock.now = 10.0
+        drain(outbox)
+        clock.now = 11.0
+        assert drain(outbox) == [(2, "other"), (1, "first"), (1, "second")], "throttled chat out of order"
+
+    def test_slow_chat_does_not_block_others(self) -> None:
+        client = BlockingClient(chat_id=1)
+        outbox = Outbox(client, RateLimiter(1e9, 1e9, 1e9), workers=2)
+        outbox.start()
+        outbox.enqueue(1, "slow")
+        outbox.enqueue(1, "after slow")
+        outbox.enqueue(2, "other")
+
+        assert not outbox.join(timeout=0.5), "slow send finished early"
+        assert client.sent == [(2, "other")], "slow chat held back other chats"
+        client.release.set()
+        assert outbox.join(timeout=5), "outbox not drained"
+        assert client.sent[1:] == [(1, "slow"), (1, "after slow")], "chat replies sent concurrently or out of order"
+
+    def test_global_limit(self, clock) -> None:
+        limiter = RateLimiter(global_rate=2, chat_rate=10, chat_burst=10, clock=clock)
+
+        waits = [limiter.reserve(chat_id) for chat_id in range(3)]
+
+        assert waits[:2] == [0, 0] and waits[2] > 0, "global rate exceeded"
+
+
+class TestOutboxMetrics:
+    def test_exported(self, outbox, monkeypatch) -> None:
+        monkeypatch.setattr(registry, "collectors", [])
+        registry.add_collector(outbox.metrics)
+        outbox.enqueue(1, "first")
+        outbox.enqueue(1, "second")
+        drain(outbox)
+
+        body = registry.render()
+
+        assert "todolist_bot_outbox_depth 1" in body, body
+        assert "todolist_bot_outbox_sent_total 1" in body and "todolist_bot_outbox_failed_total 0" in body
+
+
+@pytest.mark.django_db
+class TestVerificationView:
+    def test_verification_enqueued(self, auth_client, outbox, monkeypatch) -> None:
+        monkeypatch.setattr("bot.views.get_outbox", lambda: outbox)
+        tg_user = TuserFactory(user=None)
+
+        response = auth_client.patch(reverse("bot:verify"), data={"verification_code": tg_user.verification_code})
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert outbox.stats()["depth"] == 1 and outbox.queue[0].priority == Priority.high
+        assert outbox.queue[0].chat_id == tg_user.chat_id
@@ -0,0 +1,98 @@
+import pytest
+
+from bot.handlers import BotHandler
+from bot.runner import CollectingSender
+from bot.tg.batching import MESSAGE_LIMIT
+from bot.tg.dc import CallbackQuery, UpdateObj
+from tests.bot_test.state_test import make_message
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, TuserFactory
+
+
+def press(handler: BotHandler, tg_user, message_id: int, data: str):
+    message = make_message(tg_user.chat_id, "")
+    message.message_id = message_id
+    callback = CallbackQuery(id="1", from_=message.from_, message=message, data=data)
+    handler.handle_update(UpdateObj(update_id=1, callback_query=callback))
+
+
+def buttons(reply_markup: dict | None) -> dict:
+    if reply_markup is None:
+        return {}
+    return {button["text"]: button["callback_data"] for button in reply_markup["inline_keyboard"][0]}
+
+
+@pytest.mark.django_db
+class TestGoalsListing:
+    @pytest.fixture()
+    def tg_user(self, settings):
+        settings.BOT_PAGE_SIZE = 10
+        tg_user = TuserFactory(chat_id=7, user_ud=7)
+        category = CategoryFactory(user=tg_user.user)
+        GoalFactory.create_batch(25, user=tg_user.user, category=category, title="goal")
+        return tg_user
+
+    def test_first_page_is_one_message(self, tg_user, django_assert_max_num_queries) -> None:
+        sender = CollectingSender()
+
+        with django_assert_max_num_queries(3):
+            BotHandler(sender).handle_message(make_message(tg_user.chat_id, "/goals"))
+
+        assert len(sender.calls) == 1, "goals sent one message each"
+        method, kwargs = sender.calls[0]
+        assert method == "send_message" and kwargs["text"].count("Название:") == 10
+        assert list(buttons(kwargs["reply_markup"])) == ["Далее »"], "first page offers going back"
+
+    def test_pages_edited_in_place(self, tg_user) -> None:
+        sender = CollectingSender()
+        handler = BotHandler(sender)
+        handler.handle_message(make_message(tg_user.chat_id, "/goals"))
+
+        next_data = buttons(sender.calls[-1][1]["reply_markup"])["Далее »"]
+        press(handler, tg_user, 50, next_data)
+        method, kwargs = sender.calls[-1]
+        assert sender.calls[-2][0] == "answer_callback_query", "callback not answered"
+        assert method == "edit_message_text" and kwargs["message_id"] == 50
+        assert set(buttons(kwargs["reply_markup"])) == {"« Назад", "Далее »"}
+
+        press(handler, tg_user, 50, buttons(kwargs["reply_markup"])["Далее »"])
+        last_page = sender.calls[-1][1]
+        assert last_page["text"].count("Название:") == 5
+        assert list(buttons(last_page["reply_markup"])) == ["« Назад"], "last page offers more"
+
+        press(handler, tg_user, 50, buttons(last_page["reply_markup"])["« Назад"])
+        assert sender.calls[-1][1]["text"] == kwargs["text"], "previous page differs"
+
+    def test_long_titles_split_into_more_pages(self, settings) -> None:
+        settings.BOT_PAGE_SIZE = 50
+        tg_user = TuserFactory(chat_id=8, user_ud=8)
+        category = CategoryFactory(user=tg_user.user, title="c" * 255)
+        GoalFactory.create_batch(12, user=tg_user.user, category=category, title="g" * 255)
+        sender = CollectingSender()
+        handler = BotHandler(sender)
+
+        handler.handle_message(make_message(tg_user.chat_id, "/goals"))
+        first_page = sender.calls[-1][1]
+        press(handler, tg_user, 50, buttons(first_page["reply_markup"])["Далее »"])
+        second_page = sender.calls[-1][1]
+
+        assert len(first_page["text"]) <= MESSAGE_LIMIT, "page longer than a message"
+        shown = first_page["text"].count("Название:") + second_page["text"].count("Название:")
+        assert shown == 12, "goals lost between pages"
+        assert list(buttons(second_page["reply_markup"])) == ["« Назад"], "last page offers more"
+
+
+@pytest.mark.django_db
+class TestCategoryList:
+    def test_categories_batched_into_messages(self) -> None:
+        tg_user = TuserFactory(chat_id=9, user_ud=9)
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=tg_user.user)
+        CategoryFactory.create_batch(50, board=board, user=tg_user.user, title="c" * 200)
+        sender = CollectingSender()
+
+        BotHandler(sender).handle_message(make_message(tg_user.chat_id, "/goal_category"))
+
+        texts = [kwargs["text"] for method, kwargs in sender.calls if method == "send_message"]
+        assert len(texts) == 3, "categories not coalesced into 4096-character messages"
+        assert all(len(text) <= MESSAGE_LIMIT for text in texts), "message longer than the limit"
+        assert sum(text.count("c" * 200) for text in texts) == 50, "categories lost between messages"
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from bot.models import TgUser
+from bot.runner import BotRunner
+from bot.tg.async_client import AsyncTgClient
+from bot.tg.client import TgClient
+from bot.tg.outbox import Outbox, build_rate_limiter
+from tests.bot_test.fake_telegram import FakeTelegram, make_update
+
+
+async def run_until_sent(fake: FakeTelegram, count: int):
+    async with AsyncTgClient("token", base_url=fake.url) as client:
+        outbox = Outbox(TgClient("token", base_url=fake.url), build_rate_limiter())
+        outbox.start()
+        runner = BotRunner(client, workers=2, poll_timeout=0, outbox=outbox)
+        task = asyncio.create_task(runner.run())
+        await asyncio.to_thread(fake.wait_sent, count)
+        runner.stop()
+        await asyncio.wait_for(task, timeout=10)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBotRunner:
+    def test_runner_answers_every_chat_in_order(self) -> None:
+        with FakeTelegram() as fake:
+            fake.updates = [make_update(1, 101, "/start"), make_update(2, 202, "/start"),
+                            make_update(3, 101, "hello")]
+            asyncio.run(run_until_sent(fake, 8))
+
+        assert TgUser.objects.filter(chat_id__in=[101, 202]).count() == 2, "tg users not created"
+        first_chat = [message["text"] for message in fake.sent if message["chat_id"] == 101]
+        assert len(first_chat) == 5, first_chat
+        assert first_chat[0].startswith("Привет!"), "chat replies out of order"
+        assert first_chat[3].startswith("Добро пожаловать!"), "second update handled before the first"
@@ -0,0 +1,66 @@
+import pytest
+
+from bot.handlers import BotHandler
+from bot.runner import CollectingSender
+from bot.state import MemoryStateStore
+from bot.tg.dc import Message, MessageFrom, Chat
+from goals.models import Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, TuserFactory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_message(chat_id: int, text: str) -> Message:
+    return Message(message_id=1, from_=MessageFrom(id=chat_id, first_name="Test", last_name=None,
+                                                  username=f"user{chat_id}"),
+                   chat=Chat(id=chat_id, type="private"), text=text)
+
+
+class TestMemoryStateStore:
+    def test_state_expires(self) -> None:
+        clock = FakeClock()
+        store = MemoryStateStore(ttl=60, clock=clock)
+        store.set(1, {"step": "category"})
+
+        clock.now = 59
+        assert store.get(1) == {"step": "category"}, "state lost before ttl"
+        clock.now = 60
+        assert store.get(1) is None, "abandoned dialog kept"
+
+    def test_least_recently_used_evicted(self) -> None:
+        store = MemoryStateStore(ttl=60, max_size=2)
+        store.set(1, {"step": "category"})
+        store.set(2, {"step": "category"})
+        store.get(1)
+        store.set(3, {"step": "category"})
+
+        assert store.get(2) is None, "recently used state evicted"
+        assert store.get(1) is not None and store.get(3) is not None
+
+
+@pytest.mark.django_db
+class TestCreateDialog:
+    def test_concurrent_dialogs_do_not_mix(self) -> None:
+        store = MemoryStateStore(ttl=60)
+        first, second = TuserFactory(chat_id=1, user_ud=1), TuserFactory(chat_id=2, user_ud=2)
+        categories = {}
+        for tg_user in (first, second):
+            board = BoardFactory()
+            BoardParticipantFactory(board=board, user=tg_user.user)
+            categories[tg_user.chat_id] = CategoryFactory(board=board, user=tg_user.user)
+
+        sender = CollectingSender()
+        handler = BotHandler(sender, states=store)
+        for chat_id, text in [(1, "/create"), (2, "/create"), (2, str(categories[2].id)),
+                              (1, str(categories[1].id)), (1, "Goal one"), (2, "Goal two")]:
+            handler.handle_message(make_message(chat_id, text))
+
+        assert Goal.objects.get(title="Goal one").category == categories[1], "dialogs mixed"
+        assert Goal.objects.get(title="Goal two").category == categories[2], "dialogs mixed"
+        assert store.get(1) is None and store.get(2) is None, "finished dialog kept"
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from bot.handlers import BotHandler
+from bot.models import TgUser
+from bot.runner import CollectingSender
+from tests.bot_test.state_test import make_message
+from tests.factories import TuserFactory
+
+
+class NullOutbox:
+    def enqueue(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture()
+def outbox(monkeypatch):
+    monkeypatch.setattr("bot.views.get_outbox", NullOutbox)
+
+
+@pytest.mark.django_db
+class TestVerification:
+    def test_code_reused_while_valid(self, django_assert_num_queries) -> None:
+        handler = BotHandler(CollectingSender())
+        handler.handle_message(make_message(301, "hello"))
+        code = TgUser.objects.get(user_ud=301).verification_code
+
+        with django_assert_num_queries(1):
+            handler.handle_message(make_message(301, "hello again"))
+
+        assert TgUser.objects.get(user_ud=301).verification_code == code, "code regenerated on every message"
+        assert handler.tg_client.calls[-1][1]["text"].endswith(code)
+
+    def test_expired_code_replaced(self) -> None:
+        tg_user = TuserFactory(user=None, verification_code_expires=timezone.now() - timedelta(seconds=1))
+
+        expired_code = tg_user.verification_code
+
+        assert tg_user.issue_verification_code() != expired_code, "expired code reused"
+        assert TgUser.objects.get(pk=tg_user.pk).verification_code_expires > timezone.now()
+
+    def test_expired_code_rejected(self, auth_client, outbox) -> None:
+        tg_user = TuserFactory(user=None, verification_code_expires=timezone.now() - timedelta(seconds=1))
+
+        response = auth_client.patch(reverse("bot:verify"), data={"verification_code": tg_user.verification_code})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "expired code accepted"
+
+    def test_code_single_use(self, auth_client, outbox) -> None:
+        tg_user = TuserFactory(user=None)
+        data = {"verification_code": tg_user.verification_code}
+
+        assert auth_client.patch(reverse("bot:verify"), data=data).status_code == status.HTTP_200_OK
+        assert auth_client.patch(reverse("bot:verify"), data=data).status_code == status.HTTP_400_BAD_REQUEST
+        assert TgUser.objects.get(pk=tg_user.pk).verification_code is None
+
+    def test_purge(self) -> None:
+        expired = TuserFactory(user=None, verification_code_expires=timezone.now() - timedelta(seconds=1))
+        valid = TuserFactory(user=None)
+
+        call_command("purge_verification_codes", batch_size=1)
+
+        assert TgUser.objects.get(pk=expired.pk).verification_code is None, "expired code kept"
+        assert TgUser.objects.get(pk=valid.pk).verification_code == valid.verification_code
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from bot.models import TgUser
+from bot.runner import CollectingSender
+from bot.tg.outbox import Outbox, RateLimiter
+from bot.webhook import WebhookDispatcher
+from tests.bot_test.fake_telegram import make_update
+
+SECRET = "webhook-secret"
+
+
+@pytest.fixture()
+def webhook(client, settings):
+    settings.BOT_WEBHOOK_SECRET = SECRET
+    cache.clear()
+
+    def post(payload: dict, secret: str = SECRET):
+        return client.post(reverse("bot:webhook"), data=json.dumps(payload), content_type="application/json",
+                           HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+    return post
+
+
+@pytest.fixture()
+def outbox():
+    outbox = Outbox(CollectingSender(), RateLimiter(1e9, 1e9, 1e9))
+    outbox.start()
+    return outbox
+
+
+@pytest.fixture()
+def sender(outbox, monkeypatch):
+    monkeypatch.setattr("bot.views.get_dispatcher", lambda: WebhookDispatcher(outbox, workers=0))
+    return outbox.client
+
+
+@pytest.mark.django_db
+class TestWebhook:
+    def test_wrong_secret_rejected(self, webhook, sender) -> None:
+        response = webhook(make_update(1, 101, "/start"), secret="guess")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not sender.calls, "update from an unknown sender processed"
+
+    def test_redelivered_update_processed_once(self, webhook, sender, outbox) -> None:
+        first = webhook(make_update(1, 101, "/start"))
+        outbox.join(timeout=5)
+        replies = len(sender.calls)
+        second = webhook(make_update(1, 101, "/start"))
+        outbox.join(timeout=5)
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert replies and len(sender.calls) == replies, "duplicate update processed again"
+        assert TgUser.objects.filter(chat_id=101).exists()
+
+    def test_unsupported_update_acknowledged(self, webhook, sender) -> None:
+        response = webhook({"update_id": 2, "edited_message": {"message_id": 1}})
+
+        assert response.status_code == status.HTTP_200_OK, "Telegram would redeliver it forever"
+        assert not sender.calls
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWebhookDispatcher:
+    def test_chat_updates_processed_in_order(self, webhook, outbox, monkeypatch) -> None:
+        dispatcher = WebhookDispatcher(outbox, workers=2)
+        monkeypatch.setattr("bot.views.get_dispatcher", lambda: dispatcher)
+
+        for update in [make_update(1, 101, "/start"), make_update(2, 202, "/start"),
+                       make_update(3, 101, "hello")]:
+            assert webhook(update).status_code == status.HTTP_200_OK
+        dispatcher.join()
+        assert outbox.join(timeout=5), "replies not sent"
+
+        sender = outbox.client
+        first_chat = [kwargs["text"] for _, kwargs in sender.calls if kwargs["chat_id"] == 101]
+        assert len(first_chat) == 5, first_chat
+        assert first_chat[0].startswith("Привет!") and first_chat[3].startswith("Добро пожаловать!")
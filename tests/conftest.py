@@ -24,4 +24,13 @@ def another_user(user_factory):
 @pytest.fixture()
 def due_date():
     due_date: datetime = datetime.date.today() + datetime.timedelta(days=7)
-    return due_date.strftime("%Y-%m-%d")
\ No newline at end of file
+    return due_date.strftime("%Y-%m-%d")
+
+
+@pytest.fixture()
+def inline_jobs(monkeypatch, django_capture_on_commit_callbacks):
+    """Background jobs run in the test thread, on leaving the returned on-commit context."""
+    from goals.jobs import InlineJobRunner
+
+    monkeypatch.setattr("goals.jobs.get_job_runner", InlineJobRunner)
+    return lambda: django_capture_on_commit_callbacks(execute=True)
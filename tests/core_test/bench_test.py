@@ -0,0 +1,51 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from goals.management.commands._bench import seed_dataset
+from goals.management.commands.bench_api import SCENARIOS, route_names
+from goals.models import Board, BoardGoalCounter, Goal
+from goals.stats import count_goals
+
+
+def test_every_route_has_scenario() -> None:
+    missing = route_names() - {scenario.route for scenario in SCENARIOS}
+    assert not missing, f"routes without a benchmark scenario: {sorted(missing)}"
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+    def test_seed_is_reproducible(self) -> None:
+        shapes = []
+        for _ in range(2):
+            dataset = seed_dataset(users=10, boards=4, participants=3, categories=2, goals=50, comments=80,
+                                   member_boards=2, seed=7)
+            goals = Goal.objects.filter(board_id__in=dataset.boards).order_by("id")
+            shapes.append(list(goals.values_list("title", "status", "priority")))
+
+        assert shapes[0] == shapes[1], "same seed gave different goals"
+        assert Board.objects.filter(participants__user=dataset.user).count() == 2, "bench user boards"
+        counters = {(row.board_id, row.status, row.priority): row.count
+                    for row in BoardGoalCounter.objects.filter(board_id__in=dataset.boards)}
+        assert counters == dict(count_goals(goals)), "counters not rebuilt"
+
+    def test_bench_api_report(self, tmp_path) -> None:
+        output = tmp_path / "report.json"
+        call_command("bench_api", "--users", "10", "--boards", "3", "--goals", "100", "--comments", "100",
+                     "--repeat", "2", "--warmup", "0", "--bot-seconds", "0.01", "--output", str(output),
+                     "--only", "goals:goal_list", "goals:comment_pk", stdout=StringIO())
+
+        report = json.loads(output.read_text())
+        assert set(report["routes"]) == {
+            "GET goals:goal_list offset", "GET goals:goal_list deep offset", "GET goals:goal_list keyset",
+            "GET goals:goal_list search", "GET goals:comment_pk", "PATCH goals:comment_pk", "DELETE goals:comment_pk",
+        }, "routes measured"
+        assert all(result["status"] < 300 for result in report["routes"].values()), report["routes"]
+        assert report["bot"]["/goals"]["updates_per_second"] > 0, "bot throughput"
+        assert not Goal.objects.exists(), "bench data not rolled back"
+
+        call_command("bench_api", "--users", "10", "--boards", "3", "--goals", "100", "--comments", "100",
+                     "--repeat", "2", "--warmup", "0", "--bot-seconds", "0.01", "--compare", str(output),
+                     "--threshold", "100", "--only", "goals:comment_pk", stdout=StringIO())
@@ -0,0 +1,37 @@
+import pytest
+
+from core.deployment import shared_state_problems
+
+
+class TestSharedStateProblems:
+    @pytest.fixture()
+    def webhook(self, settings):
+        settings.BOT_WEBHOOK_SECRET = "secret"
+        settings.BOARD_ROLES_CACHE_TIMEOUT = 0
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.BOT_STATE_STORE = "bot.state.MemoryStateStore"
+        settings.GOALS_EVENTS_BROKER = "goals.events.PostgresBroker"
+        return settings
+
+    def test_one_worker_allowed(self, webhook) -> None:
+        assert shared_state_problems(1) == [], "single process refused"
+
+    def test_webhook_needs_shared_state(self, webhook) -> None:
+        problems = shared_state_problems(3)
+
+        assert len(problems) == 2 and "CACHE_URL" in problems[0] and "CacheStateStore" in problems[1], problems
+
+    def test_memory_broker_refused(self, webhook) -> None:
+        webhook.BOT_WEBHOOK_SECRET = ""
+        webhook.GOALS_EVENTS_BROKER = "goals.events.MemoryBroker"
+
+        problems = shared_state_problems(3)
+
+        assert len(problems) == 1 and "PostgresBroker" in problems[0], problems
+
+    def test_shared_cache_accepted(self, webhook) -> None:
+        webhook.CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                                      "LOCATION": "django_cache"}}
+        webhook.BOT_STATE_STORE = "bot.state.CacheStateStore"
+
+        assert shared_state_problems(3) == [], "shared backends refused"
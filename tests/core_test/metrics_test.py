@@ -0,0 +1,57 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.metrics import registry
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.fixture()
+def metrics(settings):
+    settings.METRICS_SAMPLE_RATE = 1
+    settings.METRICS_TOKEN = ""
+    registry.reset()
+    return registry
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+    def test_sampled_request_measured(self, auth_client, user, metrics) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        GoalFactory.create_batch(size=3, category=CategoryFactory(board=board))
+
+        response = auth_client.get(reverse("goals:goal_list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        timing = response["Server-Timing"]
+        assert timing.startswith("db;dur=") and "serializer;dur=" in timing, timing
+        stats = metrics.views["goals:goal_list", "GET"]
+        assert stats.sampled == 1 and stats.queries >= 3 and stats.serializer_seconds > 0
+        assert stats.response_bytes == len(response.content)
+
+    def test_unsampled_request_only_counted(self, auth_client, metrics, settings) -> None:
+        settings.METRICS_SAMPLE_RATE = 0
+
+        response = auth_client.get(reverse("goals:board_list"))
+
+        assert "Server-Timing" not in response, "unsampled request measured"
+        stats = metrics.views["goals:board_list", "GET"]
+        assert stats.requests[200] == 1 and stats.sampled == 0
+
+    def test_prometheus_endpoint(self, auth_client, client, metrics) -> None:
+        auth_client.get(reverse("goals:board_list"))
+
+        response = client.get(reverse("metrics"))
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.content.decode()
+        assert 'todolist_http_requests_total{view="goals:board_list",method="GET",status="200"} 1' in body
+        assert 'todolist_http_duration_seconds_count{view="goals:board_list",method="GET"} 1' in body
+
+    def test_prometheus_endpoint_token(self, client, metrics, settings) -> None:
+        settings.METRICS_TOKEN = "scrape"
+
+        assert client.get(reverse("metrics")).status_code == status.HTTP_403_FORBIDDEN
+        response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape")
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,23 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestProfileEtag:
+    def test_not_modified(self, auth_client) -> None:
+        first = auth_client.get(reverse("core:profile"))
+
+        response = auth_client.get(reverse("core:profile"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+        assert response["ETag"] == first["ETag"], "wrong etag"
+
+    def test_changed_after_patch(self, auth_client) -> None:
+        first = auth_client.get(reverse("core:profile"))
+        auth_client.patch(reverse("core:profile"), {"first_name": "Renamed"})
+
+        response = auth_client.get(reverse("core:profile"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["first_name"] == "Renamed", "stale profile"
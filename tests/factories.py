@@ -1,7 +1,10 @@
+from datetime import timedelta
+
 import factory
 from pytest_factoryboy import register
 
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from core.models import User
 from goals.models import GoalCategory, Board, Goal, GoalComment, BoardParticipant
@@ -84,7 +87,8 @@ class TuserFactory(factory.django.DjangoModelFactory):
     chat_id = factory.Faker('pyint')
     user_ud = chat_id
     username = user,
-    verification_code = 'correct'
+    verification_code = factory.Sequence(lambda n: f'correct{n}')
+    verification_code_expires = factory.LazyFunction(lambda: timezone.now() + timedelta(minutes=10))
 
     class Meta:
         model = TgUser
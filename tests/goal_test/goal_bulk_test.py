@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalBulkViews:
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_bulk_create(self, auth_client, user, category) -> None:
+        data = [{"category": category.id, "title": f"Goal {i}"} for i in range(20)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.post(reverse("goals:goal_bulk_create"), data=data)
+
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+        assert Goal.objects.filter(category=category, user=user, board=category.board).count() == 20
+        assert len(ctx) < 10, "queries grow with batch size"
+
+    def test_bulk_create_per_item_errors(self, auth_client, category) -> None:
+        foreign = CategoryFactory()
+        data = [{"category": category.id, "title": "Ok"}, {"category": foreign.id, "title": "Foreign"}]
+
+        response = auth_client.post(reverse("goals:goal_bulk_create"), data=data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "foreign category accepted"
+        assert response.data[0] == {} and "category" in response.data[1], "errors not per item"
+        assert not Goal.objects.exists(), "partial batch written"
+
+    def test_bulk_update(self, auth_client, category) -> None:
+        goals = GoalFactory.create_batch(size=3, category=category)
+        data = [{"id": goal.id, "status": Goal.Status.done, "priority": Goal.Priority.high} for goal in goals]
+
+        response = auth_client.patch(reverse("goals:goal_bulk_update"), data=data)
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert set(Goal.objects.values_list("status", "priority")) == {(Goal.Status.done, Goal.Priority.high)}
+
+    def test_bulk_archive_reader_denied(self, auth_client, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+
+        response = auth_client.post(reverse("goals:goal_bulk_archive"), data={"ids": [goal.id]})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "reader archived goals"
+        assert 0 in response.data["ids"], "error not reported per item"
+
+    def test_bulk_archive(self, auth_client, category) -> None:
+        goals = GoalFactory.create_batch(size=3, category=category)
+
+        response = auth_client.post(reverse("goals:goal_bulk_archive"), data={"ids": [goal.id for goal in goals]})
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert set(Goal.objects.values_list("status", flat=True)) == {Goal.Status.archived}
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal
+from goals.stats import move_goals
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory
+
+LISTS = ["goals:goal_list", "goals:category_list", "goals:board_list", "goals:comment_list"]
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+        GoalCommentFactory(goal=goal, user=user)
+        return goal
+
+    @pytest.mark.parametrize("url_name", LISTS)
+    def test_list_not_modified(self, auth_client, goal, settings, url_name) -> None:
+        settings.LIST_CACHE_TIMEOUT = 0
+        first = auth_client.get(reverse(url_name), {"limit": 10})
+
+        response = auth_client.get(reverse(url_name), {"limit": 10}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+        assert response["ETag"] == first["ETag"], "wrong etag"
+        assert not response.content, "304 with a body"
+
+    @pytest.mark.parametrize("url_name", LISTS)
+    def test_list_changed(self, auth_client, goal, url_name) -> None:
+        first = auth_client.get(reverse(url_name), {"limit": 10})
+        goal.user.first_name = "Renamed"
+        goal.user.save()
+
+        response = auth_client.get(reverse(url_name), {"limit": 10}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response["ETag"] != first["ETag"], "etag not changed"
+
+    def test_cached_list_not_modified(self, auth_client, goal) -> None:
+        first = auth_client.get(reverse("goals:goal_list"), {"limit": 10})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse("goals:goal_list"), {"limit": 10}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+        tables = " ".join(query["sql"] for query in ctx.captured_queries)
+        assert "goals_goal" not in tables, tables
+
+    def test_cursor_page_not_modified(self, auth_client, goal, settings) -> None:
+        settings.LIST_CACHE_TIMEOUT = 0
+        params = {"limit": 10, "pagination": "cursor"}
+        first = auth_client.get(reverse("goals:goal_list"), params)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse("goals:goal_list"), params, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+        assert not [q for q in ctx.captured_queries if "COUNT(" in q["sql"]], "count query issued"
+
+    def test_detail_not_modified(self, auth_client, goal) -> None:
+        url = reverse("goals:goal_pk", args=[goal.pk])
+        first = auth_client.get(url)
+
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+
+        auth_client.patch(url, {"title": "Renamed"})
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.data["title"] == "Renamed", "stale goal"
+
+    def test_board_detail_changed(self, auth_client, goal) -> None:
+        url = reverse("goals:board_pk", args=[goal.board_id])
+        first = auth_client.get(url)
+        GoalCommentFactory(goal=goal)
+
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+
+    def test_stats_not_modified(self, auth_client, goal) -> None:
+        url = reverse("goals:board_stats", args=[goal.board_id])
+        first = auth_client.get(url)
+
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.content
+
+    def test_move_goals_touches_updated(self, goal, user) -> None:
+        board = BoardFactory()
+        before = goal.updated
+
+        move_goals(Goal.objects.filter(id=goal.id), board.id)
+
+        goal.refresh_from_db()
+        assert goal.board_id == board.id, "goal not moved"
+        assert goal.updated > before, "updated not touched"
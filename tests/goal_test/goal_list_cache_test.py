@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Board, BoardParticipant, Goal, GoalCategory
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory, UserFactory
+
+CACHED_LISTS = ["goals:goal_list", "goals:category_list", "goals:board_list"]
+
+
+def rename_goals(goal: Goal):
+    Goal.objects.filter(board_id=goal.board_id).update(title="Renamed")
+
+
+def archive_category(goal: Goal):
+    GoalCategory.objects.filter(id=goal.category_id).update(is_deleted=True)
+
+
+def comment(goal: Goal):
+    GoalCommentFactory(goal=goal)
+
+
+def add_participant(goal: Goal):
+    BoardParticipantFactory(board_id=goal.board_id, role=BoardParticipant.Role.reader)
+
+
+def rename_author(goal: Goal):
+    goal.user.first_name = "Renamed"
+    goal.user.save()
+
+
+def rename_board(goal: Goal):
+    board = Board.objects.get(id=goal.board_id)
+    board.title = "Renamed"
+    board.save()
+
+
+@pytest.mark.django_db
+class TestListCache:
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return GoalFactory(category=CategoryFactory(board=board, user=user))
+
+    @pytest.mark.parametrize("url_name", CACHED_LISTS)
+    def test_hit_skips_goal_tables(self, auth_client, goal, url_name) -> None:
+        first = auth_client.get(reverse(url_name), {"limit": 10})
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = auth_client.get(reverse(url_name), {"limit": 10})
+
+        assert second.status_code == status.HTTP_200_OK, second.data
+        assert second.data == first.data, "cached page differs"
+        tables = " ".join(query["sql"] for query in ctx.captured_queries)
+        assert "goals_goal" not in tables, tables
+
+    def test_params_and_users_kept_apart(self, auth_client, goal) -> None:
+        other = UserFactory()
+        BoardParticipantFactory(board_id=goal.board_id, user=other, role=BoardParticipant.Role.reader)
+        GoalFactory(category=goal.category, priority=Goal.Priority.critical)
+        url = reverse("goals:goal_list")
+
+        assert auth_client.get(url, {"limit": 1}).data["count"] == 2, "first page"
+        assert len(auth_client.get(url, {"limit": 1, "offset": 1}).data["results"]) == 1, "offset ignored"
+        auth_client.force_login(other)
+        assert auth_client.get(url, {"limit": 1}).data["count"] == 2, "other user"
+
+    @pytest.mark.parametrize("write", [rename_goals, archive_category, comment, add_participant, rename_author,
+                                       rename_board])
+    def test_write_bumps_version(self, auth_client, goal, write) -> None:
+        version = Board.objects.get(id=goal.board_id).version
+        auth_client.get(reverse("goals:goal_list"))
+
+        write(goal)
+
+        assert Board.objects.get(id=goal.board_id).version > version, f"{write.__name__} kept the version"
+
+    def test_api_write_invalidates(self, auth_client, goal) -> None:
+        url = reverse("goals:goal_list")
+        assert auth_client.get(url).data[0]["title"] == goal.title, "first page"
+
+        response = auth_client.patch(reverse("goals:goal_pk", args=[goal.id]), {"title": "Changed"})
+        assert response.status_code == status.HTTP_200_OK, response.data
+
+        assert auth_client.get(url).data[0]["title"] == "Changed", "stale page served"
+
+    def test_destroy_cascade_invalidates(self, auth_client, goal, inline_jobs) -> None:
+        url = reverse("goals:category_list")
+        assert len(auth_client.get(url).data) == 1, "first page"
+
+        with inline_jobs():
+            response = auth_client.delete(reverse("goals:board_pk", args=[goal.board_id]))
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.data
+
+        assert auth_client.get(url).data == [], "deleted board categories served from the cache"
+        assert auth_client.get(reverse("goals:goal_list")).data[0]["status"] == Goal.Status.archived, "stale goals"
+
+    def test_stale_board_save_never_lowers_version(self, goal) -> None:
+        stale = Board.objects.get(id=goal.board_id)
+        GoalFactory(category=goal.category)
+        current = Board.objects.get(id=goal.board_id).version
+
+        stale.save()
+
+        assert Board.objects.get(id=goal.board_id).version > current, "version went back"
@@ -0,0 +1,51 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalListView:
+    url: str = reverse("goals:goal_list")
+
+    def test_goal_board_denormalized(self) -> None:
+        goal = GoalFactory()
+        comment = GoalCommentFactory(goal=goal)
+
+        assert goal.board_id == goal.category.board_id, "goal board not synced"
+        assert comment.board_id == goal.board_id, "comment board not synced"
+
+    def test_goal_board_follows_category(self) -> None:
+        goal = GoalFactory()
+        new_board = BoardFactory()
+        category = goal.category
+        category.board = new_board
+        category.save()
+
+        goal.refresh_from_db()
+        assert goal.board_id == new_board.id, "goal board not moved with category"
+
+    def test_goal_list_participant_only(self, auth_client, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        own_goals = GoalFactory.create_batch(size=3, category=CategoryFactory(board=board))
+        GoalFactory.create_batch(size=2)
+
+        response: Response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert sorted(item["id"] for item in response.data) == sorted(goal.id for goal in own_goals)
+
+    def test_goal_list_board_filter(self, auth_client, user) -> None:
+        boards = BoardFactory.create_batch(size=2)
+        for board in boards:
+            BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=CategoryFactory(board=boards[0]))
+        GoalFactory(category=CategoryFactory(board=boards[1]))
+
+        response: Response = auth_client.get(self.url, {"category__board": boards[0].id})
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert [item["id"] for item in response.data] == [goal.id], "board filter mismatch"
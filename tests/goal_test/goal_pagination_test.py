@@ -0,0 +1,76 @@
+import base64
+import datetime
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalKeysetPagination:
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def goals(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board)
+        today = datetime.date.today()
+        for i in range(11):
+            due_date = None if i % 3 == 0 else today + datetime.timedelta(days=i % 4)
+            GoalFactory(category=category, priority=i % 2 + 1, due_date=due_date)
+        return list(Goal.objects.order_by("priority", "due_date", "id").values_list("id", flat=True))
+
+    def test_cursor_pages_follow_ordering(self, auth_client, goals) -> None:
+        seen, url, params = [], self.url, {"pagination": "cursor", "limit": 3}
+        while url:
+            response = auth_client.get(url, params)
+            assert response.status_code == status.HTTP_200_OK, "failed"
+            seen.extend(item["id"] for item in response.data["results"])
+            url, params = response.data["next"], None
+
+        assert seen == goals, "cursor pages skip or repeat goals"
+
+    def test_cursor_previous_pages(self, auth_client, goals) -> None:
+        response = auth_client.get(self.url, {"pagination": "cursor", "limit": 4})
+        while response.data["next"]:
+            response = auth_client.get(response.data["next"])
+
+        seen = [item["id"] for item in response.data["results"]]
+        while response.data["previous"]:
+            response = auth_client.get(response.data["previous"])
+            seen = [item["id"] for item in response.data["results"]] + seen
+
+        assert seen == goals, "previous pages skip or repeat goals"
+
+    def test_cursor_mode_skips_count(self, auth_client, goals) -> None:
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(self.url, {"pagination": "cursor", "limit": 3})
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert not [q for q in ctx.captured_queries if "COUNT(" in q["sql"]], "count query issued"
+
+    def test_invalid_cursor(self, auth_client) -> None:
+        response = auth_client.get(self.url, {"cursor": "broken"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, "invalid cursor accepted"
+
+    @pytest.mark.parametrize("position", [["high", None, 1], [1, "yesterday", 1], [1, None, {"id": 1}]])
+    def test_cursor_with_wrong_values(self, auth_client, position) -> None:
+        cursor = base64.urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+
+        response = auth_client.get(self.url, {"cursor": cursor})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.data
+
+    def test_cursor_with_ordering_rejected(self, auth_client, goals) -> None:
+        response = auth_client.get(self.url, {"pagination": "cursor", "ordering": "-priority"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, response.data
+        assert "ordering" in response.data, response.data
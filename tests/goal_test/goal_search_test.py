@@ -0,0 +1,44 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalSearch:
+    url: str = reverse("goals:goal_list")
+
+    @pytest.fixture()
+    def category(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return CategoryFactory(board=board)
+
+    def test_search_matches_word_forms(self, auth_client, category) -> None:
+        goal = GoalFactory(category=category, title="Купить молоко", description="В магазине у дома")
+        GoalFactory(category=category, title="Прочитать книгу", description="Толстую")
+
+        response: Response = auth_client.get(self.url, {"search": "молока"})
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert [item["id"] for item in response.data] == [goal.id], "stemmed search mismatch"
+
+    def test_search_prefix_and_rank(self, auth_client, category) -> None:
+        in_description = GoalFactory(category=category, title="Отпуск", description="Взять книги в дорогу",
+                                     priority=1)
+        in_title = GoalFactory(category=category, title="Книги на лето", description=None, priority=4)
+
+        response: Response = auth_client.get(self.url, {"search": "кни"})
+
+        assert [item["id"] for item in response.data] == [in_title.id, in_description.id], "rank order mismatch"
+
+    def test_search_vector_follows_updates(self, auth_client, category) -> None:
+        goal = GoalFactory(category=category, title="Старое название")
+        goal.title = "Новое название"
+        goal.save()
+
+        response: Response = auth_client.get(self.url, {"search": "новое"})
+
+        assert [item["id"] for item in response.data] == [goal.id], "search vector not refreshed"
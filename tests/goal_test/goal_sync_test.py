@@ -0,0 +1,182 @@
+import base64
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal, Tombstone
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory
+
+
+def sync(client, cursor: str | None = None, **params):
+    if cursor is not None:
+        params["cursor"] = cursor
+    response = client.get(reverse("goals:sync"), params)
+    assert response.status_code == status.HTTP_200_OK, response.data
+    return response.data
+
+
+def sync_all(client, cursor: str | None = None, **params) -> tuple[list[dict], str]:
+    pages = []
+    while True:
+        page = sync(client, cursor, **params)
+        pages.append(page)
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return pages, cursor
+
+
+def ids(pages: list[dict], key: str) -> list[int]:
+    return [row["id"] for page in pages for row in page[key]]
+
+
+@pytest.mark.django_db
+class TestSync:
+    @pytest.fixture(autouse=True)
+    def no_lag(self, settings):
+        settings.SYNC_LAG_SECONDS = 0
+
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        return GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+
+    def test_first_sync(self, auth_client, goal) -> None:
+        comment = GoalCommentFactory(goal=goal)
+        GoalFactory()
+
+        data = sync(auth_client)
+
+        assert not data["has_more"], "more pages"
+        assert data["board_ids"] == [goal.board_id], "wrong boards"
+        assert [board["id"] for board in data["boards"]] == [goal.board_id], "wrong boards"
+        assert [category["id"] for category in data["categories"]] == [goal.category_id], "wrong categories"
+        assert [row["id"] for row in data["goals"]] == [goal.id], "wrong goals"
+        assert [row["id"] for row in data["comments"]] == [comment.id], "wrong comments"
+
+    def test_only_changes_after_cursor(self, auth_client, goal) -> None:
+        other = GoalFactory(category=goal.category)
+        cursor = sync(auth_client)["cursor"]
+
+        auth_client.patch(reverse("goals:goal_pk", args=[other.id]), {"title": "Renamed"})
+        data = sync(auth_client, cursor)
+
+        assert [row["id"] for row in data["goals"]] == [other.id], "wrong goals"
+        assert data["goals"][0]["title"] == "Renamed", "stale goal"
+        assert not data["categories"] and not data["comments"], "unchanged rows sent"
+        assert not sync(auth_client, data["cursor"])["goals"], "change sent twice"
+
+    def test_pages(self, auth_client, goal) -> None:
+        GoalFactory.create_batch(size=4, category=goal.category)
+
+        pages, _ = sync_all(auth_client, limit=2)
+
+        assert len(pages) == 3, "wrong pages"
+        assert sorted(ids(pages, "goals")) == sorted(Goal.objects.values_list("id", flat=True)), "goals missed"
+
+    def test_tombstones(self, auth_client, goal, user, inline_jobs) -> None:
+        comment = GoalCommentFactory(goal=goal, user=user)
+        cursor = sync(auth_client)["cursor"]
+
+        auth_client.delete(reverse("goals:comment_pk", args=[comment.id]))
+        with inline_jobs():
+            auth_client.delete(reverse("goals:board_pk", args=[goal.board_id]))
+        pages, _ = sync_all(auth_client, cursor)
+
+        deleted = pages[-1]["deleted"]
+        expected = {"boards": [goal.board_id], "categories": [goal.category_id], "goals": [],
+                    "comments": [comment.id]}
+        assert deleted == expected, "wrong tombstones"
+        assert not ids(pages, "boards") and not ids(pages, "categories"), "deleted rows sent as live"
+        assert [row["status"] for page in pages for row in page["goals"]] == [Goal.Status.archived], "not archived"
+
+    def test_bulk_archive(self, auth_client, goal) -> None:
+        cursor = sync(auth_client)["cursor"]
+
+        auth_client.post(reverse("goals:goal_bulk_archive"), {"ids": [goal.id]}, format="json")
+        data = sync(auth_client, cursor)
+
+        assert [row["status"] for row in data["goals"]] == [Goal.Status.archived], "archived goal not sent"
+
+    def test_joined_board_read_from_start(self, auth_client, goal, user) -> None:
+        shared = GoalFactory()
+        cursor = sync(auth_client)["cursor"]
+        GoalFactory(category=goal.category)
+
+        BoardParticipantFactory(board_id=shared.board_id, user=user, role=BoardParticipant.Role.reader)
+        pages, cursor = sync_all(auth_client, cursor)
+
+        # rows of a joined board may come again with the other boards' changes
+        assert set(ids(pages, "goals")) == set(Goal.objects.exclude(id=goal.id).values_list("id", flat=True))
+        assert pages[-1]["board_ids"] == sorted([goal.board_id, shared.board_id]), "wrong boards"
+        assert not sync(auth_client, cursor)["goals"], "changes sent twice"
+
+    def test_left_board(self, auth_client, goal, user) -> None:
+        cursor = sync(auth_client)["cursor"]
+
+        BoardParticipant.objects.filter(user=user).delete()
+        data = sync(auth_client, cursor)
+
+        assert data["board_ids"] == [], "left board listed"
+        assert not data["goals"], "goals of a left board sent"
+
+    def test_recent_rows_left_for_later(self, auth_client, goal, settings) -> None:
+        settings.SYNC_LAG_SECONDS = 60
+
+        data = sync(auth_client)
+
+        assert not data["goals"], "rows inside the lag sent"
+
+    def test_invalid_cursor(self, auth_client, goal) -> None:
+        response = auth_client.get(reverse("goals:sync"), {"cursor": "garbage"})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, response.data
+
+    def test_category_moved_off_board(self, auth_client, goal, user) -> None:
+        comment = GoalCommentFactory(goal=goal)
+        cursor = sync(auth_client)["cursor"]
+
+        goal.category.board = BoardFactory()
+        goal.category.save()
+        pages, _ = sync_all(auth_client, cursor)
+
+        deleted = pages[-1]["deleted"]
+        assert deleted == {"boards": [], "categories": [goal.category_id], "goals": [goal.id],
+                           "comments": [comment.id]}, "moved rows not reported"
+
+    def test_category_moved_to_other_board_of_user(self, auth_client, goal, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        cursor = sync(auth_client)["cursor"]
+
+        goal.category.board = board
+        goal.category.save()
+        pages, _ = sync_all(auth_client, cursor)
+
+        assert not any(pages[-1]["deleted"].values()), "rows still visible reported as deleted"
+        assert ids(pages, "goals") == [goal.id], "moved goal not sent"
+
+    def test_expired_cursor(self, auth_client, goal, settings) -> None:
+        cursor = json.loads(base64.urlsafe_b64decode(sync(auth_client)["cursor"]))
+        cursor["t"] -= (settings.SYNC_TOMBSTONE_DAYS + 1) * 24 * 60 * 60
+        expired = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+        response = auth_client.get(reverse("goals:sync"), {"cursor": expired})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND, "cursor older than the tombstones accepted"
+
+    def test_purge_tombstones(self, goal, settings) -> None:
+        old = Tombstone.objects.create(kind=Tombstone.Kind.comment, object_id=1, board_id=goal.board_id,
+                                       updated=timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1))
+        recent = Tombstone.objects.create(kind=Tombstone.Kind.comment, object_id=2, board_id=goal.board_id)
+
+        call_command("purge_tombstones", batch_size=1)
+
+        assert not Tombstone.objects.filter(pk=old.pk).exists(), "expired tombstone kept"
+        assert Tombstone.objects.filter(pk=recent.pk).exists(), "recent tombstone purged"
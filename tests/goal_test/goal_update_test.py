@@ -0,0 +1,36 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalUpdateView:
+    def test_goal_update_single_membership_lookup(self, auth_client, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        category = CategoryFactory(board=board)
+        goal = GoalFactory(category=category)
+        url: str = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.patch(url, data={"title": "Updated", "category": category.id})
+
+        participant_table = BoardParticipant._meta.db_table
+        lookups = [q for q in ctx.captured_queries if f'FROM "{participant_table}"' in q["sql"]]
+        assert response.status_code == status.HTTP_200_OK, "goal not updated"
+        assert len(lookups) == 1, "membership looked up more than once"
+
+    def test_goal_update_reader_denied(self, auth_client, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+        goal = GoalFactory(category=CategoryFactory(board=board))
+        url: str = reverse("goals:goal_pk", kwargs={"pk": goal.id})
+
+        response = auth_client.patch(url, data={"title": "Updated"})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "reader can write"
@@ -0,0 +1,59 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory
+from tests.query_count_test.list_queries_test import EXPECTED_QUERIES
+
+ASYNC_LISTS = ["goals:goal_list", "goals:comment_list", "goals:board_list"]
+
+
+def get(client: AsyncClient, path: str, data=None):
+    async def request():
+        return await client.get(path, data)
+    return async_to_sync(request)()
+
+
+@pytest.fixture()
+def async_client(user):
+    client = AsyncClient()
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestAsyncLists:
+    """The ASGI handler serves these lists without a thread per request, with the same queries."""
+
+    @pytest.fixture()
+    def goal(self, user):
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        goal = GoalFactory(category=CategoryFactory(board=board, user=user), user=user)
+        GoalCommentFactory(goal=goal, user=user)
+        return goal
+
+    @pytest.mark.parametrize("url_name", ASYNC_LISTS)
+    def test_list(self, async_client, goal, settings, url_name) -> None:
+        settings.METRICS_SAMPLE_RATE = 1
+
+        response = get(async_client, reverse(url_name), {"limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert response.json()["count"] == 1, "wrong rows"
+        assert f'desc="{EXPECTED_QUERIES[url_name]} queries"' in response["Server-Timing"], response["Server-Timing"]
+
+    @pytest.mark.parametrize("url_name", ["goals:goal_list", "goals:comment_list"])
+    def test_keyset_page(self, async_client, goal, url_name) -> None:
+        response = get(async_client, reverse(url_name), {"pagination": "cursor", "limit": 10})
+
+        assert response.status_code == status.HTTP_200_OK, response.content
+        assert len(response.json()["results"]) == 1, "wrong rows"
+
+    def test_anonymous(self, goal) -> None:
+        response = get(AsyncClient(), reverse("goals:goal_list"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN, "anonymous user got goals"
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from tests.factories import BoardFactory, BoardParticipantFactory, CategoryFactory, GoalFactory, \
+    GoalCommentFactory, UserFactory
+
+# one query reads the board versions behind the list ETag and cache key
+EXPECTED_QUERIES = {
+    "goals:goal_list": 6,
+    "goals:category_list": 6,
+    "goals:comment_list": 6,
+    "goals:board_list": 6,
+}
+
+
+def fill_board(board, size: int) -> None:
+    for _ in range(size):
+        author = UserFactory()
+        BoardParticipantFactory(board=board, user=author)
+        category = CategoryFactory(board=board, user=author)
+        goal = GoalFactory(category=category, user=author)
+        GoalCommentFactory(goal=goal, user=author)
+
+
+@pytest.mark.django_db
+class TestListQueryCount:
+    @pytest.mark.parametrize("url_name", EXPECTED_QUERIES)
+    @pytest.mark.parametrize("size", [1, 10])
+    def test_list_query_count_fixed(self, auth_client, user, url_name, size) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        fill_board(board, size)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse(url_name), {"limit": 100})
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert len(ctx) == EXPECTED_QUERIES[url_name], "\n".join(q["sql"] for q in ctx.captured_queries)
+
+    def test_board_retrieve_query_count_fixed(self, auth_client, user) -> None:
+        board = BoardFactory()
+        BoardParticipantFactory(board=board, user=user)
+        fill_board(board, 10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = auth_client.get(reverse("goals:board_pk", kwargs={"pk": board.id}))
+
+        assert response.status_code == status.HTTP_200_OK, "failed"
+        assert len(ctx) == 6, "\n".join(q["sql"] for q in ctx.captured_queries)
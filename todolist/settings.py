@@ -57,6 +57,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -96,10 +97,26 @@ DATABASES = {
         "USER": env.str('DB_USER'),
         "PASSWORD": env.str('DB_PASSWORD'),
         "HOST": env('DB_HOST', default='127.0.0.1'),
-        "PORT": "5432",
+        "PORT": env.int('DB_PORT', default=5432),
+        # Seconds a connection is reused across requests. Leave 0 under ASGI: each request
+        # gets its own sync thread there, so persistent connections are never reused.
+        # The compose files put PgBouncer in front of the api and point DB_HOST/DB_PORT at it.
+        "CONN_MAX_AGE": env.int('DB_CONN_MAX_AGE', default=0),
+        "CONN_HEALTH_CHECKS": True,
+        # PgBouncer in transaction pooling mode can't keep server-side cursors open
+        "DISABLE_SERVER_SIDE_CURSORS": env.bool('DB_DISABLE_SERVER_SIDE_CURSORS', default=False),
     }
 }
 
+# Cache
+# The default local memory cache is kept per process. Webhook deduplication, bot dialogs in bot.state.CacheStateStore
+# and board roles only hold across processes with a shared cache, e.g. CACHE_URL=dbcache://django_cache
+# (after `python manage.py createcachetable`) or a Redis URL.
+
+CACHES = {
+    "default": env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -165,12 +182,73 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Share of requests measured by core.middleware.InstrumentationMiddleware, all of them are still counted
+METRICS_SAMPLE_RATE = env.float('METRICS_SAMPLE_RATE', default=0.01)
+# Bearer token required by /metrics when set
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'todolist.metrics': {'handlers': ['console'], 'level': env.str('METRICS_LOG_LEVEL', default='INFO'),
+                             'propagate': False},
+    },
+}
+
+# Seconds to keep a user's board roles in the cache between requests, 0 disables it
+BOARD_ROLES_CACHE_TIMEOUT = env.int('BOARD_ROLES_CACHE_TIMEOUT', default=0)
+# Seconds to keep goal, category and board list pages, keyed by the versions of the user's boards; 0 disables it
+LIST_CACHE_TIMEOUT = env.int('LIST_CACHE_TIMEOUT', default=300)
+# goals/sync leaves out rows updated less than this many seconds ago: a transaction still open may commit rows
+# stamped earlier than the ones a client has already seen
+SYNC_LAG_SECONDS = env.int('SYNC_LAG_SECONDS', default=5)
+# tombstones of deleted and moved rows are purged after this many days (purge_tombstones),
+# goals/sync refuses older cursors so their clients sync from the start
+SYNC_TOMBSTONE_DAYS = env.int('SYNC_TOMBSTONE_DAYS', default=30)
+# board and category deletion archive their goals in background jobs of this many goals per transaction,
+# goals.jobs.ThreadJobRunner runs them in the web process, goals.jobs.InlineJobRunner right away
+GOALS_JOB_RUNNER = env.str('GOALS_JOB_RUNNER', default='goals.jobs.ThreadJobRunner')
+GOALS_JOB_RUNNER_OPTIONS = {}
+GOALS_ARCHIVE_BATCH_SIZE = env.int('GOALS_ARCHIVE_BATCH_SIZE', default=1000)
+# board change events for goals/board/events: goals.events.MemoryBroker reaches the subscribers of the publishing
+# process only, goals.events.PostgresBroker every process through LISTEN/NOTIFY. Its options may override the
+# connection parameters of the listening connection, e.g. {"host": "db", "port": 5432} to bypass PgBouncer
+GOALS_EVENTS_BROKER = env.str('GOALS_EVENTS_BROKER', default='goals.events.MemoryBroker')
+GOALS_EVENTS_BROKER_OPTIONS = env.json('GOALS_EVENTS_BROKER_OPTIONS', default={})
+# an event stream is closed after this many seconds, the client reconnects and its boards are checked again
+GOALS_EVENTS_STREAM_SECONDS = env.int('GOALS_EVENTS_STREAM_SECONDS', default=300)
+GOALS_EVENTS_KEEPALIVE_SECONDS = env.int('GOALS_EVENTS_KEEPALIVE_SECONDS', default=15)
+
 SOCIAL_AUTH_JSONFIELD_ENABLED = True
 SOCIAL_AUTH_POSTGRES_ENABLED = True
 SOCIAL_AUTH_VK_OAUTH2_SCOPE = ['email', 'photos', 'notify']
 SOCIAL_AUTH_URL_NAMESPACE = 'social'
 
 BOT_TOKEN = '6039372805:AAGnSq8yNkMIoP4usvqQ0LuG4pztR6YyUmc'
+BOT_API_URL = env.str('BOT_API_URL', default='https://api.telegram.org')
+# bot.state.MemoryStateStore keeps dialogs per process, bot.state.CacheStateStore shares them through CACHES
+BOT_STATE_STORE = env.str('BOT_STATE_STORE', default='bot.state.MemoryStateStore')
+BOT_STATE_STORE_OPTIONS = {}
+BOT_STATE_TTL = env.int('BOT_STATE_TTL', default=15 * 60)
+# outgoing messages per second, Telegram allows about 30 overall and 1 per chat with short bursts.
+# The limits are enforced per process: with several sending processes (web workers and runbot) divide them
+BOT_SEND_GLOBAL_RATE = env.float('BOT_SEND_GLOBAL_RATE', default=30)
+BOT_SEND_CHAT_RATE = env.float('BOT_SEND_CHAT_RATE', default=1)
+BOT_SEND_CHAT_BURST = env.float('BOT_SEND_CHAT_BURST', default=3)
+# threads sending from the outbox, a slow or throttled call holds back only its own chat
+BOT_SEND_WORKERS = env.int('BOT_SEND_WORKERS', default=4)
+BOT_PAGE_SIZE = env.int('BOT_PAGE_SIZE', default=10)
+BOT_VERIFICATION_CODE_TTL = env.int('BOT_VERIFICATION_CODE_TTL', default=10 * 60)
+# webhook mode: Telegram must send this value in X-Telegram-Bot-Api-Secret-Token, the endpoint is closed while empty
+BOT_WEBHOOK_SECRET = env.str('BOT_WEBHOOK_SECRET', default='')
+BOT_WEBHOOK_WORKERS = env.int('BOT_WEBHOOK_WORKERS', default=4)
+BOT_WEBHOOK_QUEUE_SIZE = env.int('BOT_WEBHOOK_QUEUE_SIZE', default=100)
+# accepted update ids are remembered in the default cache, share it between processes (CACHE_URL) to dedupe across them
+BOT_WEBHOOK_DEDUPE_TTL = env.int('BOT_WEBHOOK_DEDUPE_TTL', default=24 * 60 * 60)
 
 SOCIAL_AUTH_PIPELINE = [
     'social_core.pipeline.social_auth.social_details',
@@ -18,6 +18,8 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import MetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,5 +29,6 @@ urlpatterns = [
     path("bot/", include(('bot.urls', 'bot'), namespace="bot")),
 
     path('accounts/', include('rest_framework.urls', namespace="rest_framework")),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 